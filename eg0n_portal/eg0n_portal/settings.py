@@ -175,6 +175,75 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 10,
 }
 
+# ==============================================================================
+# IOC MANAGEMENT: MATCH API
+# ==============================================================================
+
+IOC_MATCH_MAX_ITEMS = 10000  # Maximum observables accepted by a single match request
+
+# ==============================================================================
+# IOC MANAGEMENT: BULK OPERATIONS
+# ==============================================================================
+
+IOC_BULK_BATCH_SIZE = 1000  # Rows written by a single query
+IOC_BULK_MAX_ITEMS = 50000  # Maximum items accepted by a single bulk request
+
+# ==============================================================================
+# IOC MANAGEMENT: CORRELATIONS
+# ==============================================================================
+
+IOC_RELATED_EVENTS_MAX_ITEMS = 1000  # Maximum related events returned by a single request
+IOC_RELATED_EVENTS_PAGE_SIZE = 20  # Related events returned by default (and shown by event pages)
+
+# ==============================================================================
+# IOC MANAGEMENT: SEARCH
+# ==============================================================================
+
+IOC_SEARCH_MAX_ITEMS = 1000  # Maximum results returned by a single global search
+IOC_SEARCH_PAGE_SIZE = 50  # Global search results returned by default (and shown by the search page)
+
+# ==============================================================================
+# IOC MANAGEMENT: FILTER SNAPSHOTS
+# ==============================================================================
+
+IOC_SNAPSHOT_DIR = BASE_DIR / "snapshots"  # Where the Bloom filter snapshot is stored
+IOC_SNAPSHOT_ERROR_RATE = 0.001  # False positive rate of the Bloom filter
+IOC_SNAPSHOT_HEADROOM = 2  # Capacity / indicators ratio, leaving room for incremental updates
+IOC_SNAPSHOT_RESCAN = 300  # Seconds rescanned before each incremental update (longest write transaction)
+
+# ==============================================================================
+# IOC MANAGEMENT: CHANGE LOG
+# ==============================================================================
+
+IOC_CHANGES_MAX_ITEMS = 5000  # Maximum changes returned by a single request
+IOC_CHANGES_PAGE_SIZE = 1000  # Changes returned by default
+IOC_CHANGES_RETENTION_DAYS = 90  # Changes older than this are removed by prune_changes
+
+# ==============================================================================
+# IOC MANAGEMENT: TAXII 2.1 SERVER
+# ==============================================================================
+
+IOC_TAXII_MAX_PAGE_SIZE = 1000  # Maximum objects returned by a single request
+IOC_TAXII_PAGE_SIZE = 100  # Objects returned by default
+
+# ==============================================================================
+# IOC MANAGEMENT: SURICATA RULES
+# ==============================================================================
+
+IOC_RULES_DIR = BASE_DIR / "rules"  # Where the generated rules and lists are cached
+IOC_RULES_SID_BASE = 9100000  # First Suricata signature id used by generated rules (static: +0-99, FQDN: +100 on)
+
+# ==============================================================================
+# IOC MANAGEMENT: DNS RESPONSE POLICY ZONE
+# ==============================================================================
+
+IOC_RPZ_CONFIDENCE = ["medium", "high"]  # FQDN confidence levels listed in the zone
+IOC_RPZ_DIR = BASE_DIR / "rpz"  # Where the zone and its differences are stored
+IOC_RPZ_MAX_DIFFS = 100  # Differences kept for incremental transfers
+IOC_RPZ_ORIGIN = "eg0n.rpz"  # Zone name
+IOC_RPZ_TTL = 300  # Records and negative caching TTL
+IOC_RPZ_VALIDATION_STATUS = ["approved"]  # FQDN validation statuses listed in the zone
+
 # ==============================================================================
 # UI: DJANGO TABLES2 SETTINGS
 # ==============================================================================
@@ -205,6 +274,11 @@ SITE_NAVBAR = [
         "svg": '<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="icon icon-1"><path d="M5 12l-2 0l9 -9l9 9l-2 0"></path><path d="M5 12v7a2 2 0 0 0 2 2h10a2 2 0 0 0 2 -2v-7"></path><path d="M9 21v-6a2 2 0 0 1 2 -2h2a2 2 0 0 1 2 2v6"></path></svg>',
         "view": "home",
     },
+    {
+        "text": "Search",
+        "svg": '<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="icon icon-1"><path d="M10 10m-7 0a7 7 0 1 0 14 0a7 7 0 1 0 -14 0"></path><path d="M21 21l-6 -6"></path></svg>',
+        "view": "search",
+    },
     {
         "text": "System",
         "svg": '<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2" stroke-linecap="round" stroke-linejoin="round" class="icon icon-1"><path d="M12 3l8 4.5l0 9l-8 4.5l-8 -4.5l0 -9l8 -4.5"></path><path d="M12 12l8 -4.5"></path><path d="M12 12l0 9"></path><path d="M12 12l-8 -4.5"></path><path d="M16 5.25l-8 4.5"></path></svg>',
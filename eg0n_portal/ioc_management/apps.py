@@ -6,3 +6,7 @@ from django.apps import AppConfig
 class IocManagementConfig(AppConfig):
     name = 'ioc_management' # Python path to the app
     verbose_name = "IOC Management"  # Human-readable app name
+
+    def ready(self):
+        """Register signal handlers."""
+        import ioc_management.signals  # noqa: F401
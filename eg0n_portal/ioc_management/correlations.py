@@ -0,0 +1,140 @@
+"""Cross-event indicator correlations for IoC Management app."""
+
+from django.db import transaction
+from django.db.models import Count
+from ioc_management.models import FQDN, Correlation, Event, Hash, IpAdd, Vuln, fqdn_labels, hash_digest, ip_networks
+from ioc_management.utils import batches
+
+
+BATCH_SIZE = 1000
+CORRELATION_MODELS = (FQDN, Hash, IpAdd, Vuln)
+INDICATOR_FIELDS = {
+    "fqdn": ["fqdn"],
+    "hash": ["md5", "sha1", "sha256"],
+    "ipadd": ["ip_address", "prefix_length", "ip_address_end"],
+    "vuln": ["cve"],
+}
+
+
+#############################################################################
+# Helpers
+#############################################################################
+
+
+def object_indicators(obj):
+    """
+    Return the set of normalized indicator values of an attribute.
+
+    Values are prefixed by their type (ip, fqdn, md5, sha1, sha256, cve), so
+    the same string in two types never correlates. Only field values are
+    read: historical models (migrations) are supported too.
+    """
+    name = obj._meta.model_name
+    try:
+        if name == "fqdn":
+            labels = fqdn_labels(obj.fqdn)
+            return {"fqdn:" + ".".join(reversed(labels))} if labels else set()
+        if name == "hash":
+            indicators = set()
+            for field in INDICATOR_FIELDS["hash"]:
+                value = getattr(obj, field)
+                if not value:
+                    continue
+                try:
+                    algorithm, digest = hash_digest(value)
+                except ValueError:
+                    continue
+                if algorithm == field:
+                    indicators.add("{}:{}".format(algorithm, digest.hex()))
+            return indicators
+        if name == "ipadd":
+            if not obj.ip_address:
+                return set()
+            networks = ip_networks(obj.ip_address, obj.prefix_length, obj.ip_address_end)
+            return {"ip:{}".format(network) for network in networks}
+        if name == "vuln":
+            cve = (obj.cve or "").strip().upper()
+            return {"cve:" + cve} if cve else set()
+    except ValueError:
+        # Invalid values cannot correlate
+        pass
+    return set()
+
+
+def object_correlations(obj):
+    """Return the unsaved Correlation rows of an attribute."""
+    return [Correlation(indicator=indicator, event_id=obj.event_id, object_id=obj.pk) for indicator in object_indicators(obj)]
+
+
+#############################################################################
+# Incremental updates
+#############################################################################
+
+
+def add_objects(objs):
+    """Index new attributes."""
+    rows = [row for obj in objs for row in object_correlations(obj)]
+    Correlation.objects.bulk_create(rows, batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def remove_objects(object_ids):
+    """Remove attributes from the index."""
+    with transaction.atomic():
+        for batch in batches(object_ids, BATCH_SIZE):
+            Correlation.objects.filter(object_id__in=batch).delete()
+
+
+def sync_object(obj):
+    """Reindex a saved attribute (one query if unchanged)."""
+    rows = object_correlations(obj)
+    current = set(Correlation.objects.filter(object_id=obj.pk).values_list("indicator", "event_id"))
+    if current == {(row.indicator, row.event_id) for row in rows}:
+        return
+    with transaction.atomic():
+        Correlation.objects.filter(object_id=obj.pk).delete()
+        Correlation.objects.bulk_create(rows)
+
+
+#############################################################################
+# Rebuild
+#############################################################################
+
+
+def rebuild_correlations(chunk_size=2000):
+    """Rebuild the index from scratch, return {model name: indexed attributes}."""
+    result = {}
+    with transaction.atomic():
+        Correlation.objects.all().delete()
+        for model in CORRELATION_MODELS:
+            name = model._meta.model_name
+            objs = model.objects.only("pk", "event_id", *INDICATOR_FIELDS[name]).order_by().iterator(chunk_size=chunk_size)
+            result[name] = 0
+            for batch in batches(objs, chunk_size):
+                add_objects(batch)
+                result[name] += len(batch)
+    return result
+
+
+#############################################################################
+# Queries
+#############################################################################
+
+
+def related_events(event, queryset=None):
+    """
+    Return the events sharing indicators with event, most shared first.
+
+    Events are annotated with shared, the number of distinct shared
+    indicators. The ranking is a single query: the indicators of event are
+    a subquery on the (event, indicator) index, matched on the (indicator,
+    event) index.
+    """
+    if queryset is None:
+        queryset = Event.objects.all()
+    indicators = Correlation.objects.filter(event=event).values("indicator")
+    return (
+        queryset.filter(correlations__indicator__in=indicators)
+        .exclude(pk=event.pk)
+        .annotate(shared=Count("correlations__indicator", distinct=True))
+        .order_by("-shared", "-created_at")
+    )
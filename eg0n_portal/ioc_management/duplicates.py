@@ -0,0 +1,174 @@
+"""Materialized duplicate groups for IoC Management app."""
+
+from itertools import groupby
+from operator import itemgetter
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from ioc_management.models import FQDN, DuplicateGroup, DuplicateMember, Hash, IpAdd, Vuln
+from ioc_management.utils import batches
+
+
+BATCH_SIZE = 500
+DUPLICATE_MODELS = (FQDN, Hash, IpAdd, Vuln)
+
+
+#############################################################################
+# Helpers
+#############################################################################
+
+
+def object_keys(obj):
+    """Return the (field, value) group keys of an object, NULL and empty values excluded."""
+    keys = []
+    for field in obj.duplicated_fields:
+        value = obj._meta.get_field(field).get_prep_value(getattr(obj, field))
+        if value not in (None, ""):
+            keys.append((field, str(value)))
+    return keys
+
+
+def refresh_groups(group_ids):
+    """Recount the members of groups, delete the empty ones."""
+    members = (
+        DuplicateMember.objects.filter(group=OuterRef("pk"))
+        .order_by()
+        .values("group")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    for batch in batches(group_ids, BATCH_SIZE):
+        DuplicateGroup.objects.filter(pk__in=batch).update(count=Coalesce(Subquery(members), 0))
+        DuplicateGroup.objects.filter(pk__in=batch, count=0).delete()
+
+
+#############################################################################
+# Incremental updates
+#############################################################################
+
+
+def add_objects(model, objs):
+    """Add objects to the groups of their values, creating missing groups."""
+    name = model._meta.model_name
+    keys = [(obj.pk, field, value) for obj in objs for field, value in object_keys(obj)]
+    group_ids = set()
+    with transaction.atomic():
+        for batch in batches(keys, BATCH_SIZE):
+            wanted = {(field, value) for _, field, value in batch}
+            DuplicateGroup.objects.bulk_create(
+                [DuplicateGroup(model=name, field=field, value=value) for field, value in wanted],
+                ignore_conflicts=True,
+            )
+            groups = {}
+            for field in {field for field, _ in wanted}:
+                values = [value for key_field, value in wanted if key_field == field]
+                for group in DuplicateGroup.objects.filter(model=name, field=field, value__in=values):
+                    groups[(group.field, group.value)] = group.pk
+            DuplicateMember.objects.bulk_create(
+                [DuplicateMember(group_id=groups[(field, value)], object_id=pk) for pk, field, value in batch],
+                ignore_conflicts=True,
+            )
+            group_ids.update(groups.values())
+        refresh_groups(group_ids)
+
+
+def remove_objects(model, object_ids):
+    """Remove objects from their groups."""
+    name = model._meta.model_name
+    group_ids = set()
+    with transaction.atomic():
+        for batch in batches(object_ids, BATCH_SIZE):
+            members = DuplicateMember.objects.filter(group__model=name, object_id__in=batch)
+            group_ids.update(members.values_list("group_id", flat=True))
+            members.delete()
+        refresh_groups(group_ids)
+
+
+def sync_object(obj):
+    """Move a saved object to the groups of its current values (one query if unchanged)."""
+    name = obj._meta.model_name
+    keys = set(object_keys(obj))
+    members = {
+        (member.group.field, member.group.value): member
+        for member in DuplicateMember.objects.filter(group__model=name, object_id=obj.pk).select_related("group")
+    }
+    if set(members) == keys:
+        return
+    with transaction.atomic():
+        stale = [member for key, member in members.items() if key not in keys]
+        if stale:
+            DuplicateMember.objects.filter(pk__in=[member.pk for member in stale]).delete()
+            refresh_groups([member.group_id for member in stale])
+        add_objects(type(obj), [obj])
+
+
+#############################################################################
+# Rebuild
+#############################################################################
+
+
+def create_groups(pending):
+    """Insert pending (group, member ids) pairs, then empty pending."""
+    groups = DuplicateGroup.objects.bulk_create([group for group, _ in pending])
+    DuplicateMember.objects.bulk_create(
+        [DuplicateMember(group=group, object_id=pk) for group, (_, pks) in zip(groups, pending) for pk in pks],
+        batch_size=BATCH_SIZE,
+    )
+    pending.clear()
+
+
+def rebuild_duplicates(models=DUPLICATE_MODELS, chunk_size=2000):
+    """
+    Rebuild the groups of models from scratch, return {model name: duplicated groups}.
+
+    Values are read sorted, so each group is complete when the next value
+    starts: memory usage does not depend on the number of objects.
+    """
+    result = {}
+    for model in models:
+        name = model._meta.model_name
+        with transaction.atomic():
+            DuplicateMember.objects.filter(group__model=name).delete()
+            DuplicateGroup.objects.filter(model=name).delete()
+            for field in model.duplicated_fields:
+                rows = (
+                    model.objects.exclude(**{f"{field}__isnull": True})
+                    .order_by(field)
+                    .values_list(field, "pk")
+                    .iterator(chunk_size=chunk_size)
+                )
+                pending = []
+                for value, items in groupby(rows, key=itemgetter(0)):
+                    pks = [pk for _, pk in items]
+                    if value == "":
+                        # Filtering "" out in SQL breaks on GenericIPAddressField (adapted to NULL)
+                        continue
+                    pending.append((DuplicateGroup(model=name, field=field, value=str(value), count=len(pks)), pks))
+                    if len(pending) >= BATCH_SIZE:
+                        create_groups(pending)
+                if pending:
+                    create_groups(pending)
+        result[name] = DuplicateGroup.objects.filter(model=name, count__gt=1).count()
+    return result
+
+
+#############################################################################
+# Queries
+#############################################################################
+
+
+def duplicated_ids(model):
+    """Return the values() queryset of the primary keys of the duplicated objects of a model."""
+    return DuplicateMember.objects.filter(group__model=model._meta.model_name, group__count__gt=1).values("object_id")
+
+
+def is_duplicated(obj):
+    """Return True if another object shares a duplicated field value with obj."""
+    return duplicated_ids(type(obj)).filter(object_id=obj.pk).exists()
+
+
+def duplicates_of(queryset, pk):
+    """Return the objects of queryset sharing a duplicated field value with the object pk, itself excluded."""
+    groups = DuplicateMember.objects.filter(group__model=queryset.model._meta.model_name, object_id=pk).values("group_id")
+    members = DuplicateMember.objects.filter(group_id__in=groups).exclude(object_id=pk).values("object_id")
+    return queryset.filter(pk__in=members)
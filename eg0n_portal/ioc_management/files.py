@@ -0,0 +1,64 @@
+"""Generated file helpers for IoC Management app."""
+
+import fcntl
+import os
+import tempfile
+from contextlib import contextmanager
+from django.db.models import Count, Max
+
+
+LOCK_NAME = ".lock"
+
+
+@contextmanager
+def file_lock(directory):
+    """
+    Hold the exclusive build lock of a directory of generated files.
+
+    The lock is an flock() on a file of the directory, so it serializes
+    builds across threads, workers and management commands. It is not
+    reentrant: a build must not take the lock of its own directory twice.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, LOCK_NAME), "a") as fd:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def temp_file(directory, name, mode="w"):
+    """Return a new open file with a unique name in directory, removed by the caller."""
+    os.makedirs(directory, exist_ok=True)
+    fd = tempfile.NamedTemporaryFile(mode, dir=directory, prefix=name + ".", suffix=".tmp", delete=False)
+    # Generated files are served as is: not private like the temporary file default
+    os.chmod(fd.name, 0o644)
+    return fd
+
+
+def table_validator(queryset):
+    """
+    Return [row count, latest updated_at] of a queryset, with one aggregate query.
+
+    Inserts and deletions change the count, any other write moves updated_at:
+    files generated from the rows are up to date while the value is unchanged.
+    """
+    result = queryset.order_by().aggregate(count=Count("pk"), updated_at=Max("updated_at"))
+    return [result["count"], result["updated_at"].isoformat() if result["updated_at"] else None]
+
+
+@contextmanager
+def atomic_write(path, mode="w"):
+    """Yield a unique temporary file atomically renamed to path on success, removed on error."""
+    fd = temp_file(os.path.dirname(path), os.path.basename(path), mode)
+    try:
+        with fd:
+            yield fd
+        os.replace(fd.name, path)
+    except BaseException:
+        try:
+            os.remove(fd.name)
+        except OSError:
+            pass
+        raise
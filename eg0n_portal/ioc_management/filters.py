@@ -1,12 +1,19 @@
 """Filter definitions for IoC Management app."""
 
+import ipaddress
 from datetime import timedelta
 from django import forms
-from django.db.models import Count, Q
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_ipv46_address
+from django.db import connections
+from django.db.models import Q
+from django.db.models.functions import Collate
 from django.contrib.auth.models import User
 from django.utils import timezone
 import django_filters
-from ioc_management.models import Event, PLATFORM_CHOICES, LANGUAGES_CHOICES, VALIDATION_CHOICES, CONFIDENCE_CHOICES, CodeSnippet, Hash, IpAdd, FQDN, Vuln
+from ioc_management.duplicates import duplicated_ids
+from ioc_management.models import BINARY_COLLATIONS, Event, PLATFORM_CHOICES, LANGUAGES_CHOICES, VALIDATION_CHOICES, CONFIDENCE_CHOICES, CodeSnippet, Hash, IpAdd, FQDN, Vuln, fqdn_covering_keys, ip_key, ip_network_keys, ip_overlap_q, reverse_fqdn
+from ioc_management.search import search
 from ui.include.filters import SearchFilterSet
 
 
@@ -31,6 +38,14 @@ EXPIRATION_CHOICES = [
 #############################################################################
 
 
+def validate_ip_network(value):
+    """Verify value is a valid IPv4/IPv6 network in CIDR notation."""
+    try:
+        ipaddress.ip_network(value.strip(), strict=False)
+    except ValueError:
+        raise ValidationError("Enter a valid IPv4 or IPv6 network.")
+
+
 class DuplicateFilterMixin:
     """Generic mixin to filter duplicated records on one or more fields."""
 
@@ -38,19 +53,18 @@ class DuplicateFilterMixin:
         """Filters queryset to only include objects with duplicates."""
         if not value or not hasattr(self, "duplicated_fields"):
             return queryset
+        # Indexed join on the materialized duplicate groups
+        return queryset.filter(pk__in=duplicated_ids(queryset.model))
+
+
+class FullTextSearchMixin:
+    """Generic mixin searching through the full-text index (see search.py), best matches first."""
+
+    def search_queryset(self, queryset, value):
+        """Return the queryset searched with the full-text index, None if unavailable."""
+        return search(queryset, value)
 
-        combined_q = Q()
-        for field in self.duplicated_fields:
-            duplicated_values = (
-                queryset.values(field)
-                .annotate(count=Count("id"))
-                .filter(count__gt=1)
-                .values_list(field, flat=True)
-            )
-            combined_q |= Q(**{f"{field}__in": duplicated_values})
 
-        return queryset.filter(combined_q).distinct()
-    
 class UserFilterMixin:
     def filter_user(self, queryset, name, value):
         if not value:
@@ -90,10 +104,10 @@ class ExpirationFilterMixin:
 #############################################################################
 
 
-class EventFilter(UserFilterMixin, SearchFilterSet):
+class EventFilter(FullTextSearchMixin, UserFilterMixin, SearchFilterSet):
     """Filter class for the Event model."""
 
-    search_fields = ("name", "description")
+    search_fields = Event.search_fields
     user = django_filters.ModelChoiceFilter(
         field_name="author",  # placeholder
         queryset=User.objects.all(),
@@ -127,10 +141,10 @@ class EventFilter(UserFilterMixin, SearchFilterSet):
 #############################################################################
 
 
-class CodeSnippetFilter(ExpirationFilterMixin, UserFilterMixin, SearchFilterSet):
+class CodeSnippetFilter(FullTextSearchMixin, ExpirationFilterMixin, UserFilterMixin, SearchFilterSet):
     """Filter class for the CodeSnippet model."""
 
-    search_fields = ("name", "code", "description")
+    search_fields = CodeSnippet.search_fields
     language = django_filters.ChoiceFilter(choices=LANGUAGES_CHOICES)
     confidence = django_filters.ChoiceFilter(choices=CONFIDENCE_CHOICES)
     validation_status = django_filters.ChoiceFilter(choices=VALIDATION_CHOICES)
@@ -177,10 +191,10 @@ class CodeSnippetFilter(ExpirationFilterMixin, UserFilterMixin, SearchFilterSet)
 #############################################################################
 
 
-class FQDNFilter(DuplicateFilterMixin, ExpirationFilterMixin, UserFilterMixin, SearchFilterSet):
+class FQDNFilter(FullTextSearchMixin, DuplicateFilterMixin, ExpirationFilterMixin, UserFilterMixin, SearchFilterSet):
     """Filter class for the FQDN model."""
 
-    search_fields = ("fqdn", "description")
+    search_fields = FQDN.search_fields
     user = django_filters.ModelChoiceFilter(
         field_name="author",  # placeholder
         queryset=User.objects.all(),
@@ -212,6 +226,14 @@ class FQDNFilter(DuplicateFilterMixin, ExpirationFilterMixin, UserFilterMixin, S
         widget=forms.DateInput(attrs={"type": "date"}),
         label="Updated before",
     )
+    contains = django_filters.CharFilter(
+        method="filter_contains",
+        label="Covers name",
+    )
+    within = django_filters.CharFilter(
+        method="filter_within",
+        label="Within domain",
+    )
     duplicated_fields = ["fqdn"]
 
     class Meta:
@@ -222,20 +244,42 @@ class FQDNFilter(DuplicateFilterMixin, ExpirationFilterMixin, UserFilterMixin, S
             "validation_status",
             "expiration",
             "duplicates",
+            "contains",
+            "within",
             "updated_at__gte",
             "updated_at__lte",
         )
 
+    def filter_contains(self, queryset, name, value):
+        """Return FQDNs covering the given name: itself, parent domains and wildcards."""
+        candidates = fqdn_covering_keys(value)
+        if not candidates:
+            return queryset
+        return queryset.filter(fqdn_reversed__in=candidates)
+
+    def filter_within(self, queryset, name, value):
+        """Return FQDNs equal to or under the given domain (reversed-label range scan)."""
+        prefix = reverse_fqdn(value)
+        if not prefix:
+            return queryset
+        # "/" immediately follows "." in ASCII: [prefix + ".", prefix + "/") holds all subdomains,
+        # compared with a binary collation (locale collations may ignore punctuation)
+        key = Collate("fqdn_reversed", BINARY_COLLATIONS[connections[queryset.db].vendor])
+        return queryset.alias(key=key).filter(
+            Q(fqdn_reversed=prefix)
+            | Q(key__gte=prefix + ".", key__lt=prefix + "/")
+        )
+
 
 #############################################################################
 # Hash
 #############################################################################
 
 
-class HashFilter(DuplicateFilterMixin, UserFilterMixin, ExpirationFilterMixin, SearchFilterSet):
+class HashFilter(FullTextSearchMixin, DuplicateFilterMixin, UserFilterMixin, ExpirationFilterMixin, SearchFilterSet):
     """Filter class for the Hash model."""
 
-    search_fields = ("filename", "url", "description", "md5", "sha1", "sha256", "url")
+    search_fields = Hash.search_fields
     user = django_filters.ModelChoiceFilter(
         field_name="author",  # placeholder
         queryset=User.objects.all(),
@@ -289,10 +333,10 @@ class HashFilter(DuplicateFilterMixin, UserFilterMixin, ExpirationFilterMixin, S
 #############################################################################
 
 
-class IpAddFilter(DuplicateFilterMixin, ExpirationFilterMixin, UserFilterMixin, SearchFilterSet):
+class IpAddFilter(FullTextSearchMixin, DuplicateFilterMixin, ExpirationFilterMixin, UserFilterMixin, SearchFilterSet):
     """Filter class for the IpAdd model."""
 
-    search_fields = ("ip_address", "description")
+    search_fields = IpAdd.search_fields
     user = django_filters.ModelChoiceFilter(
         field_name="author",  # placeholder
         queryset=User.objects.all(),
@@ -324,6 +368,16 @@ class IpAddFilter(DuplicateFilterMixin, ExpirationFilterMixin, UserFilterMixin,
         widget=forms.DateInput(attrs={"type": "date"}),
         label="Updated before",
     )
+    contains = django_filters.CharFilter(
+        method="filter_contains",
+        validators=[validate_ipv46_address],
+        label="Contains IP address",
+    )
+    within = django_filters.CharFilter(
+        method="filter_within",
+        validators=[validate_ip_network],
+        label="Within network",
+    )
     duplicated_fields = ["ip_address"]
 
     class Meta:
@@ -334,19 +388,35 @@ class IpAddFilter(DuplicateFilterMixin, ExpirationFilterMixin, UserFilterMixin,
             "validation_status",
             "expiration",
             "duplicates",
+            "contains",
+            "within",
             "updated_at__gte",
             "updated_at__lte",
         )
+
+    def filter_contains(self, queryset, name, value):
+        """Return addresses, networks and ranges including the given IP address."""
+        if not value:
+            return queryset
+        key = ip_key(value)
+        return queryset.filter(ip_overlap_q(key, key))
+
+    def filter_within(self, queryset, name, value):
+        """Return addresses, networks and ranges fully included in the given network."""
+        if not value:
+            return queryset
+        start, end = ip_network_keys(value)
+        return queryset.filter(range_start__gte=start, range_start__lte=end, range_end__lte=end)
     
 #############################################################################
 # Vuln
 #############################################################################
 
 
-class VulnFilter(DuplicateFilterMixin, UserFilterMixin, SearchFilterSet):
+class VulnFilter(FullTextSearchMixin, DuplicateFilterMixin, UserFilterMixin, SearchFilterSet):
     """Filter class for the Vuln model."""
 
-    search_fields = ("name", "cve", "description", "exploitation_details")
+    search_fields = Vuln.search_fields
     user = django_filters.ModelChoiceFilter(
         field_name="author",  # placeholder
         queryset=User.objects.all(),
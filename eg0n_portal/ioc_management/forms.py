@@ -116,7 +116,7 @@ class IpAddForm(AttributeFormMixin, ObjectModelForm):
     class Meta:
         """Meta options."""
 
-        fields = ("ip_address", "confidence", "validation_status", "description", "expired_at")
+        fields = ("ip_address", "prefix_length", "ip_address_end", "confidence", "validation_status", "description", "expired_at")
         model = IpAdd
 
 
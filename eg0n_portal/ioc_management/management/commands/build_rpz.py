@@ -0,0 +1,19 @@
+"""Build the DNS Response Policy Zone of active FQDN objects."""
+
+from django.core.management.base import BaseCommand
+from ioc_management.rpz import build_rpz
+
+
+class Command(BaseCommand):
+    """Rebuild the Response Policy Zone if listed FQDN objects changed."""
+
+    help = "Rebuild the DNS Response Policy Zone and its incremental differences if listed FQDN objects changed."
+
+    def add_arguments(self, parser):
+        """Define command line arguments."""
+        parser.add_argument("--force", action="store_true", help="Regenerate the zone even if nothing seems changed.")
+
+    def handle(self, *args, **options):
+        """Build the zone and print its serial."""
+        metadata = build_rpz(force=options["force"])
+        self.stdout.write(self.style.SUCCESS("Zone serial {}: {} records".format(metadata["serial"], metadata["count"])))
@@ -0,0 +1,21 @@
+"""Build the Suricata rules and lists of active indicators."""
+
+from django.core.management.base import BaseCommand
+from ioc_management.rules import build_rules
+
+
+class Command(BaseCommand):
+    """Rebuild the Suricata rule sets whose attributes changed."""
+
+    help = "Rebuild the cached Suricata rules and lists whose IpAdd, FQDN or Hash objects changed."
+
+    def add_arguments(self, parser):
+        """Define command line arguments."""
+        parser.add_argument("--force", action="store_true", help="Rebuild all the rule sets.")
+
+    def handle(self, *args, **options):
+        """Build the rules and print the build time of each set."""
+        metadata = build_rules(force=options["force"])
+        for set_name, item in sorted(metadata.items()):
+            self.stdout.write("{}: built at {}".format(set_name, item["built_at"]))
+        self.stdout.write(self.style.SUCCESS("Rules are up to date"))
@@ -0,0 +1,29 @@
+"""Build the Bloom filter snapshot of active indicators."""
+
+from django.core.management.base import BaseCommand
+from ioc_management.snapshots import build_snapshot, get_snapshot_paths
+
+
+class Command(BaseCommand):
+    """
+    Build or incrementally update the Bloom filter snapshot used by edge sensors.
+
+    API polls only add new values: schedule this command (e.g. hourly) to run
+    the daily full rebuild dropping deleted and expired values.
+    """
+
+    help = "Build or incrementally update the Bloom filter snapshot of active IpAdd, FQDN and Hash values."
+
+    def add_arguments(self, parser):
+        """Define command line arguments."""
+        parser.add_argument("--full", action="store_true", help="Rebuild the filter from scratch.")
+
+    def handle(self, *args, **options):
+        """Build the snapshot and print its metadata."""
+        metadata = build_snapshot(full=options["full"])
+        filter_path, _ = get_snapshot_paths()
+        self.stdout.write(self.style.SUCCESS(
+            "Snapshot version {} ({} values, {} bytes, false positive rate {}) at {}".format(
+                metadata["version"], metadata["count"], metadata["size"], metadata["error_rate"], filter_path,
+            )
+        ))
@@ -0,0 +1,35 @@
+"""Export events as a STIX 2.1 bundle."""
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from ioc_management.models import Event
+from ioc_management.stix import iter_bundle
+
+
+class Command(BaseCommand):
+    """Stream a STIX 2.1 bundle of one or all events to a file or to stdout."""
+
+    help = "Export one event (--event) or all events as a STIX 2.1 bundle."
+
+    def add_arguments(self, parser):
+        """Define command line arguments."""
+        parser.add_argument("--event", help="Event id, all events if omitted.")
+        parser.add_argument("--output", "-o", help="Output file, stdout if omitted.")
+
+    def handle(self, *args, **options):
+        """Write the bundle chunk by chunk."""
+        events = Event.objects.all()
+        if options["event"]:
+            try:
+                events = events.filter(pk=options["event"])
+                exists = events.exists()
+            except ValidationError:
+                exists = False
+            if not exists:
+                raise CommandError("Event {} does not exist".format(options["event"]))
+        if options["output"]:
+            with open(options["output"], "w") as fd:
+                fd.writelines(iter_bundle(events))
+        else:
+            for chunk in iter_bundle(events):
+                self.stdout.write(chunk, ending="")
@@ -0,0 +1,30 @@
+"""Remove old entries from the change log."""
+
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from ioc_management.models import Change, ChangePrune
+
+
+class Command(BaseCommand):
+    """Remove change log entries older than the retention period."""
+
+    help = "Remove change log entries older than IOC_CHANGES_RETENTION_DAYS (or --days)."
+
+    def add_arguments(self, parser):
+        """Define command line arguments."""
+        parser.add_argument("--days", type=int, default=settings.IOC_CHANGES_RETENTION_DAYS, help="Retention in days.")
+
+    def handle(self, *args, **options):
+        """Delete the expired entries, recording the highest deleted id."""
+        limit = timezone.now() - timedelta(days=options["days"])
+        deleted = 0
+        with transaction.atomic():
+            last_id = Change.objects.filter(created_at__lt=limit).aggregate(last_id=Max("id"))["last_id"]
+            if last_id is not None:
+                deleted, _ = Change.objects.filter(id__lte=last_id).delete()
+                ChangePrune.objects.create(last_id=last_id)
+        self.stdout.write(self.style.SUCCESS(f"Removed {deleted} change log entries"))
@@ -0,0 +1,16 @@
+"""Rebuild the cross-event correlation index."""
+
+from django.core.management.base import BaseCommand
+from ioc_management.correlations import rebuild_correlations
+
+
+class Command(BaseCommand):
+    """Rebuild the correlation index of IpAdd, FQDN, Hash and Vuln objects."""
+
+    help = "Rebuild the cross-event correlation index of IpAdd, FQDN, Hash and Vuln objects from scratch."
+
+    def handle(self, *args, **options):
+        """Rebuild the index and print the number of indexed objects of each model."""
+        for name, count in sorted(rebuild_correlations().items()):
+            self.stdout.write("{}: {} indexed objects".format(name, count))
+        self.stdout.write(self.style.SUCCESS("Correlation index is up to date"))
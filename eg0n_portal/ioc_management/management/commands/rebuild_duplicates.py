@@ -0,0 +1,16 @@
+"""Rebuild the materialized duplicate groups."""
+
+from django.core.management.base import BaseCommand
+from ioc_management.duplicates import rebuild_duplicates
+
+
+class Command(BaseCommand):
+    """Rebuild the duplicate groups of IpAdd, FQDN, Hash and Vuln objects."""
+
+    help = "Rebuild the duplicate groups of IpAdd, FQDN, Hash and Vuln objects from scratch."
+
+    def handle(self, *args, **options):
+        """Rebuild the groups and print the number of duplicated values of each model."""
+        for name, count in sorted(rebuild_duplicates().items()):
+            self.stdout.write("{}: {} duplicated values".format(name, count))
+        self.stdout.write(self.style.SUCCESS("Duplicate groups are up to date"))
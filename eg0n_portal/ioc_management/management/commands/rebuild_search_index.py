@@ -0,0 +1,16 @@
+"""Rebuild the full-text search index."""
+
+from django.core.management.base import BaseCommand
+from ioc_management.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    """Rebuild the search documents of Event, CodeSnippet, FQDN, Hash, IpAdd and Vuln objects."""
+
+    help = "Rebuild the full-text search index of Event, CodeSnippet, FQDN, Hash, IpAdd and Vuln objects from scratch."
+
+    def handle(self, *args, **options):
+        """Rebuild the index and print the number of indexed objects of each model."""
+        for name, count in sorted(rebuild_search_index().items()):
+            self.stdout.write("{}: {} indexed objects".format(name, count))
+        self.stdout.write(self.style.SUCCESS("Search index is up to date"))
@@ -0,0 +1,332 @@
+"""Indicator matchers for IoC Management app."""
+
+import ipaddress
+import threading
+from abc import ABC, abstractmethod
+from django.db.models import Count, Max, Q
+from ioc_management.models import FQDN, HashDigest, IpAdd, fqdn_labels, hash_digest, ip_networks
+
+
+#############################################################################
+# Generic Matcher
+#############################################################################
+
+
+class Matcher(ABC):
+    """
+    Base class for in-memory indexes over an IoC model.
+
+    The index lives in the process memory: it is built lazily on first use,
+    updated by the model save/delete signals and reloaded when the table
+    changed behind our back (e.g. writes from another worker).
+    """
+
+    model = None
+    fields = ()
+
+    def __init__(self):
+        """Create an empty, not yet loaded, index."""
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._validator = None
+        self.clear()
+
+    @abstractmethod
+    def clear(self):
+        """Reset the index data structures."""
+
+    @abstractmethod
+    def _add(self, record):
+        """Index a record (dict with self.fields keys), replacing any previous entry."""
+
+    @abstractmethod
+    def _discard(self, pk):
+        """Remove a record from the index, if present."""
+
+    def get_validator(self):
+        """Return a cheap value changing whenever the table changes."""
+        result = self.model.objects.aggregate(count=Count("id"), updated_at=Max("updated_at"))
+        return result["count"], result["updated_at"]
+
+    def load(self):
+        """(Re)build the whole index from the database."""
+        with self._lock:
+            self.clear()
+            self._validator = self.get_validator()
+            for record in self.model.objects.values(*self.fields).iterator(chunk_size=2000):
+                self._add(record)
+            self._loaded = True
+
+    def refresh(self):
+        """Build the index on first use and reload it if the table changed."""
+        with self._lock:
+            if not self._loaded or self._validator != self.get_validator():
+                self.load()
+
+    def invalidate(self):
+        """Reload the index on next use (after bulk operations skipping signals)."""
+        with self._lock:
+            self._loaded = False
+
+    def update(self, obj, created=False):
+        """Index a saved object (called by the post_save signal)."""
+        with self._lock:
+            if not self._loaded:
+                return
+            self._add({field: getattr(obj, field) for field in self.fields})
+            count, _ = self._validator
+            self._validator = (count + 1 if created else count, obj.updated_at)
+
+    def discard(self, obj):
+        """Remove a deleted object (called by the post_delete signal)."""
+        with self._lock:
+            if not self._loaded:
+                return
+            self._discard(obj.pk)
+            count, updated_at = self._validator
+            self._validator = (count - 1, updated_at)
+
+    @abstractmethod
+    def lookup(self, value):
+        """Return the list of records matching a single value."""
+
+    def match(self, values):
+        """Return a dict mapping each matching value to the matching records."""
+        self.refresh()
+        results = {}
+        with self._lock:
+            for value in values:
+                hits = self.lookup(value)
+                if hits:
+                    results[value] = hits
+        return results
+
+
+#############################################################################
+# FQDN
+#############################################################################
+
+
+class FQDNMatcher(Matcher):
+    """
+    Suffix trie answering "which FQDN objects cover this name?".
+
+    Names are stored label by label, from the TLD down, so a lookup walks at
+    most one node per label of the queried name. A listed domain covers
+    itself and all its subdomains, a listed "*.domain" covers subdomains only.
+    """
+
+    model = FQDN
+    fields = ("id", "fqdn", "event_id", "confidence", "validation_status")
+
+    def clear(self):
+        """Reset the index data structures."""
+        self._root = {}  # label -> [children, {pk: record}, {pk: wildcard record}]
+        self._records = {}  # pk -> (labels, wildcard)
+
+    def _add(self, record):
+        """Index a record (dict with self.fields keys), replacing any previous entry."""
+        pk = record["id"]
+        self._discard(pk)
+        labels = fqdn_labels(record["fqdn"])
+        wildcard = bool(labels) and labels[-1] == "*"
+        if wildcard:
+            labels = labels[:-1]
+        if not labels:
+            return
+        children = self._root
+        for label in labels:
+            node = children.setdefault(label, [{}, {}, {}])
+            children = node[0]
+        node[2 if wildcard else 1][pk] = {
+            "id": pk,
+            "fqdn": record["fqdn"],
+            "event": record["event_id"],
+            "confidence": record["confidence"],
+            "validation_status": record["validation_status"],
+        }
+        self._records[pk] = (labels, wildcard)
+
+    def _discard(self, pk):
+        """Remove a record from the index, if present."""
+        if pk not in self._records:
+            return
+        labels, wildcard = self._records.pop(pk)
+        path = []
+        children = self._root
+        for label in labels:
+            node = children[label]
+            path.append((children, label, node))
+            children = node[0]
+        path[-1][2][2 if wildcard else 1].pop(pk, None)
+        for children, label, node in reversed(path):
+            # Prune empty branches
+            if node[0] or node[1] or node[2]:
+                break
+            del children[label]
+
+    def lookup(self, value):
+        """Return the records covering the given name."""
+        labels = fqdn_labels(value)
+        hits = []
+        children = self._root
+        for depth, label in enumerate(labels, start=1):
+            node = children.get(label)
+            if node is None:
+                break
+            hits.extend(node[1].values())
+            if depth < len(labels):
+                hits.extend(node[2].values())
+            children = node[0]
+        return hits
+
+
+#############################################################################
+# Hash
+#############################################################################
+
+
+class HashMatcher:
+    """
+    Digest lookup answering "which Hash objects have this digest?".
+
+    Digests are answered from the HashDigest (algorithm, binary digest)
+    index, the algorithm being detected from the digest length: a whole batch
+    costs a single query whatever the mix of MD5, SHA1 and SHA256.
+    """
+
+    def match(self, values):
+        """Return a dict mapping each matching digest to the Hash records."""
+        wanted = {}  # (algorithm, binary digest) -> [submitted values]
+        for value in values:
+            try:
+                wanted.setdefault(hash_digest(value), []).append(value)
+            except ValueError:
+                continue
+        if not wanted:
+            return {}
+
+        digests = {}
+        for algorithm, digest in wanted:
+            digests.setdefault(algorithm, []).append(digest)
+        query = Q()
+        for algorithm, chunk in digests.items():
+            query |= Q(algorithm=algorithm, digest__in=chunk)
+
+        results = {}
+        rows = HashDigest.objects.filter(query).values(
+            "algorithm",
+            "digest",
+            "hash_id",
+            "hash__filename",
+            "hash__event_id",
+            "hash__confidence",
+            "hash__validation_status",
+        )
+        for row in rows:
+            record = {
+                "id": row["hash_id"],
+                "filename": row["hash__filename"],
+                "event": row["hash__event_id"],
+                "confidence": row["hash__confidence"],
+                "validation_status": row["hash__validation_status"],
+            }
+            for value in wanted[(row["algorithm"], bytes(row["digest"]))]:
+                results.setdefault(value, []).append(record)
+        return results
+
+
+#############################################################################
+# IpAdd
+#############################################################################
+
+
+class IpAddMatcher(Matcher):
+    """
+    Prefix index answering "which IpAdd objects cover this address?".
+
+    Networks are grouped by IP version and prefix length, each group being a
+    dict keyed by the masked network integer. A lookup masks the queried
+    address once per prefix length in use, so the cost depends on the number
+    of distinct prefix lengths (at most 33 for IPv4, 129 for IPv6), never on
+    the number of indexed objects.
+    """
+
+    model = IpAdd
+    fields = (
+        "id",
+        "ip_address",
+        "prefix_length",
+        "ip_address_end",
+        "event_id",
+        "confidence",
+        "validation_status",
+    )
+
+    @staticmethod
+    def parse(value):
+        """Return (version, prefixlen, network int) for an address or a CIDR."""
+        network = ipaddress.ip_network(str(value).strip(), strict=False)
+        if network.version == 6 and network.prefixlen == 128 and network.network_address.ipv4_mapped:
+            # Keep "unpack_ipv4" semantics used by the model field
+            network = ipaddress.ip_network(network.network_address.ipv4_mapped)
+        return network.version, network.prefixlen, int(network.network_address)
+
+    def clear(self):
+        """Reset the index data structures."""
+        self._networks = {4: {}, 6: {}}  # version -> prefixlen -> network -> {pk: record}
+        self._records = {}  # pk -> [(version, prefixlen, network), ...]
+
+    def _add(self, record):
+        """Index a record (dict with self.fields keys), replacing any previous entry."""
+        pk = record["id"]
+        self._discard(pk)
+        try:
+            networks = ip_networks(record["ip_address"], record["prefix_length"], record["ip_address_end"])
+        except ValueError:
+            # Invalid values cannot match anything
+            return
+        keys = [self.parse(network) for network in networks]
+        entry = {
+            "id": pk,
+            "ip_address": record["ip_address"],
+            "prefix_length": record["prefix_length"],
+            "ip_address_end": record["ip_address_end"],
+            "event": record["event_id"],
+            "confidence": record["confidence"],
+            "validation_status": record["validation_status"],
+        }
+        for version, prefixlen, network in keys:
+            table = self._networks[version].setdefault(prefixlen, {})
+            table.setdefault(network, {})[pk] = entry
+        self._records[pk] = keys
+
+    def _discard(self, pk):
+        """Remove a record from the index, if present."""
+        for version, prefixlen, network in self._records.pop(pk, []):
+            table = self._networks[version][prefixlen]
+            table[network].pop(pk, None)
+            if not table[network]:
+                del table[network]
+            if not table:
+                del self._networks[version][prefixlen]
+
+    def lookup(self, value):
+        """Return the records covering the given address."""
+        try:
+            version, _, address = self.parse(value)
+        except ValueError:
+            return []
+        bits = 32 if version == 4 else 128
+        hits = []
+        for prefixlen, table in self._networks[version].items():
+            mask = ((1 << prefixlen) - 1) << (bits - prefixlen)
+            entries = table.get(address & mask)
+            if entries:
+                hits.extend(entries.values())
+        return hits
+
+
+fqdn_matcher = FQDNMatcher()
+hash_matcher = HashMatcher()
+ipadd_matcher = IpAddMatcher()
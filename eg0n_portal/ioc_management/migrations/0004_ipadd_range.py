@@ -0,0 +1,52 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:14
+
+import ipaddress
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_range(apps, schema_editor):
+    """Compute range bounds of existing single address rows."""
+    IpAdd = apps.get_model('ioc_management', 'IpAdd')
+    for obj in IpAdd.objects.only('pk', 'ip_address').iterator(chunk_size=2000):
+        address = ipaddress.ip_address(obj.ip_address)
+        if address.version == 4:
+            address = ipaddress.IPv6Address((0xFFFF << 32) | int(address))
+        key = '{:032x}'.format(int(address))
+        IpAdd.objects.filter(pk=obj.pk).update(range_start=key, range_end=key)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ioc_management', '0003_alter_fqdn_fqdn_alter_hash_filename_alter_hash_md5_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ipadd',
+            name='ip_address_end',
+            field=models.GenericIPAddressField(blank=True, null=True, unpack_ipv4=True),
+        ),
+        migrations.AddField(
+            model_name='ipadd',
+            name='prefix_length',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ipadd',
+            name='range_end',
+            field=models.CharField(default='', editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='ipadd',
+            name='range_start',
+            field=models.CharField(default='', editable=False, max_length=32),
+        ),
+        migrations.RunPython(populate_range, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='ipadd',
+            index=models.Index(fields=['range_start', 'range_end'], name='ipadd_range_idx'),
+        ),
+    ]
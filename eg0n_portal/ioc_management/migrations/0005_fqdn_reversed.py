@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:18
+
+from django.db import migrations, models
+
+
+def populate_fqdn_reversed(apps, schema_editor):
+    """Compute reversed labels of existing rows."""
+    FQDN = apps.get_model('ioc_management', 'FQDN')
+    for obj in FQDN.objects.only('pk', 'fqdn').iterator(chunk_size=2000):
+        labels = obj.fqdn.strip().lower().rstrip('.').split('.')
+        value = '.'.join(label for label in reversed(labels) if label)
+        FQDN.objects.filter(pk=obj.pk).update(fqdn_reversed=value)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ioc_management', '0004_ipadd_range'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='fqdn',
+            name='fqdn_reversed',
+            field=models.CharField(db_index=True, default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(populate_fqdn_reversed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:19
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_hash_digest(apps, schema_editor):
+    """Fill the digest lookup table from existing hashes."""
+    Hash = apps.get_model('ioc_management', 'Hash')
+    HashDigest = apps.get_model('ioc_management', 'HashDigest')
+    lengths = {'md5': 32, 'sha1': 40, 'sha256': 64}
+    batch = []
+    for obj in Hash.objects.only('pk', 'md5', 'sha1', 'sha256').iterator(chunk_size=2000):
+        for algorithm, length in lengths.items():
+            value = (getattr(obj, algorithm) or '').strip().lower()
+            if len(value) != length:
+                continue
+            try:
+                digest = bytes.fromhex(value)
+            except ValueError:
+                continue
+            batch.append(HashDigest(hash_id=obj.pk, algorithm=algorithm, digest=digest))
+        if len(batch) >= 2000:
+            HashDigest.objects.bulk_create(batch)
+            batch = []
+    HashDigest.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ioc_management', '0005_fqdn_reversed'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='hash',
+            name='md5',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AlterField(
+            model_name='hash',
+            name='sha1',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AlterField(
+            model_name='hash',
+            name='sha256',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.CreateModel(
+            name='HashDigest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('algorithm', models.CharField(choices=[('md5', 'MD5'), ('sha1', 'SHA1'), ('sha256', 'SHA256')], max_length=8)),
+                ('digest', models.BinaryField(max_length=32)),
+                ('hash', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='digests', to='ioc_management.hash')),
+            ],
+            options={
+                'db_table': 'hash_digest',
+                'indexes': [models.Index(fields=['algorithm', 'digest'], name='hash_digest_idx')],
+            },
+        ),
+        migrations.RunPython(populate_hash_digest, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-17 19:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ioc_management', '0008_change'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='codesnippet',
+            index=models.Index(fields=['created_at', 'id'], name='codesnippet_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['created_at', 'id'], name='event_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fqdn',
+            index=models.Index(fields=['created_at', 'id'], name='fqdn_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hash',
+            index=models.Index(fields=['created_at', 'id'], name='hash_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ipadd',
+            index=models.Index(fields=['created_at', 'id'], name='ipadd_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vuln',
+            index=models.Index(fields=['created_at', 'id'], name='vuln_created_idx'),
+        ),
+    ]
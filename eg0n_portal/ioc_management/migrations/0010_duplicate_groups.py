@@ -0,0 +1,73 @@
+# Generated by Django 5.2.7 on 2026-10-17 20:43
+
+import django.db.models.deletion
+from itertools import groupby
+from operator import itemgetter
+from django.db import migrations, models
+
+
+DUPLICATED_FIELDS = {
+    'fqdn': ['fqdn'],
+    'hash': ['md5', 'sha1', 'sha256', 'filename'],
+    'ipadd': ['ip_address'],
+    'vuln': ['cve'],
+}
+
+
+def populate_duplicates(apps, schema_editor):
+    """Group existing objects by duplicated field values."""
+    DuplicateGroup = apps.get_model('ioc_management', 'DuplicateGroup')
+    DuplicateMember = apps.get_model('ioc_management', 'DuplicateMember')
+    for model_name, fields in DUPLICATED_FIELDS.items():
+        model = apps.get_model('ioc_management', model_name)
+        for field in fields:
+            rows = (
+                model.objects.exclude(**{f'{field}__isnull': True})
+                .order_by(field)
+                .values_list(field, 'pk')
+                .iterator(chunk_size=2000)
+            )
+            for value, items in groupby(rows, key=itemgetter(0)):
+                pks = [pk for _, pk in items]
+                if value == '':
+                    continue
+                group = DuplicateGroup.objects.create(model=model_name, field=field, value=str(value), count=len(pks))
+                DuplicateMember.objects.bulk_create([DuplicateMember(group=group, object_id=pk) for pk in pks])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ioc_management', '0009_created_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DuplicateGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=64)),
+                ('field', models.CharField(max_length=64)),
+                ('value', models.CharField(max_length=64)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'duplicate_groups',
+                'indexes': [models.Index(fields=['model', 'count'], name='duplicate_group_count_idx')],
+                'constraints': [models.UniqueConstraint(fields=('model', 'field', 'value'), name='duplicate_group_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='DuplicateMember',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.UUIDField()),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='members', to='ioc_management.duplicategroup')),
+            ],
+            options={
+                'db_table': 'duplicate_members',
+                'constraints': [models.UniqueConstraint(fields=('object_id', 'group'), name='duplicate_member_key')],
+            },
+        ),
+        migrations.RunPython(populate_duplicates, migrations.RunPython.noop),
+    ]
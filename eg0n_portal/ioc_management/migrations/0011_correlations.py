@@ -0,0 +1,47 @@
+# Generated by Django 5.2.7 on 2026-10-17 21:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+from ioc_management.correlations import INDICATOR_FIELDS, object_indicators
+
+
+def populate_correlations(apps, schema_editor):
+    """Index the indicators of existing attributes."""
+    Correlation = apps.get_model('ioc_management', 'Correlation')
+    for model_name, fields in INDICATOR_FIELDS.items():
+        model = apps.get_model('ioc_management', model_name)
+        rows = []
+        for obj in model.objects.only('pk', 'event_id', *fields).order_by().iterator(chunk_size=2000):
+            rows.extend(
+                Correlation(indicator=indicator, event_id=obj.event_id, object_id=obj.pk)
+                for indicator in object_indicators(obj)
+            )
+            if len(rows) >= 2000:
+                Correlation.objects.bulk_create(rows)
+                rows = []
+        Correlation.objects.bulk_create(rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ioc_management', '0010_duplicate_groups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Correlation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('indicator', models.CharField(max_length=128)),
+                ('object_id', models.UUIDField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='correlations', to='ioc_management.event')),
+            ],
+            options={
+                'db_table': 'correlations',
+                'indexes': [models.Index(fields=['indicator', 'event'], name='correlation_indicator_idx'), models.Index(fields=['event', 'indicator'], name='correlation_event_idx')],
+                'constraints': [models.UniqueConstraint(fields=('object_id', 'indicator'), name='correlation_key')],
+            },
+        ),
+        migrations.RunPython(populate_correlations, migrations.RunPython.noop),
+    ]
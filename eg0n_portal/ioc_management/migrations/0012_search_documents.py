@@ -0,0 +1,95 @@
+# Generated by Django 5.2.7 on 2026-10-17 21:24
+
+from django.db import migrations, models
+from django.db.utils import OperationalError
+
+
+FTS_TABLE = 'search_documents_fts'
+SEARCH_FIELDS = {
+    'codesnippet': ['name', 'code', 'description'],
+    'event': ['name', 'description'],
+    'fqdn': ['fqdn', 'description'],
+    'hash': ['filename', 'url', 'description', 'md5', 'sha1', 'sha256'],
+    'ipadd': ['ip_address', 'description'],
+    'vuln': ['name', 'cve', 'description', 'exploitation_details'],
+}
+# External content FTS5 table, kept in sync with search_documents by triggers
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE {0} USING fts5(content, content='search_documents', content_rowid='id')",
+    """CREATE TRIGGER {0}_insert AFTER INSERT ON search_documents BEGIN
+        INSERT INTO {0}(rowid, content) VALUES (new.id, new.content);
+    END""",
+    """CREATE TRIGGER {0}_delete AFTER DELETE ON search_documents BEGIN
+        INSERT INTO {0}({0}, rowid, content) VALUES ('delete', old.id, old.content);
+    END""",
+    """CREATE TRIGGER {0}_update AFTER UPDATE ON search_documents BEGIN
+        INSERT INTO {0}({0}, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO {0}(rowid, content) VALUES (new.id, new.content);
+    END""",
+]
+
+
+def create_search_index(apps, schema_editor):
+    """Create the full-text index of search documents: FTS5 on SQLite, GIN on PostgreSQL."""
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        try:
+            schema_editor.execute(SQLITE_FTS[0].format(FTS_TABLE))
+        except OperationalError:
+            # SQLite built without FTS5, searches fall back to icontains
+            return
+        for sql in SQLITE_FTS[1:]:
+            schema_editor.execute(sql.format(FTS_TABLE))
+    elif connection.vendor == 'postgresql':
+        from django.contrib.postgres.indexes import GinIndex
+        from django.contrib.postgres.search import SearchVector
+
+        SearchDocument = apps.get_model('ioc_management', 'SearchDocument')
+        index = GinIndex(SearchVector('content', config='simple'), name='search_document_content_idx')
+        schema_editor.add_index(SearchDocument, index)
+
+
+def drop_search_index(apps, schema_editor):
+    """Drop the FTS5 table, triggers and the GIN index go with search_documents."""
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE IF EXISTS {}'.format(FTS_TABLE))
+
+
+def populate_search_documents(apps, schema_editor):
+    """Index the searchable text of existing objects."""
+    SearchDocument = apps.get_model('ioc_management', 'SearchDocument')
+    for model_name, fields in SEARCH_FIELDS.items():
+        model = apps.get_model('ioc_management', model_name)
+        documents = []
+        for obj in model.objects.only('pk', *fields).order_by().iterator(chunk_size=2000):
+            values = (getattr(obj, field) for field in fields)
+            content = '\n'.join(str(value) for value in values if value not in (None, ''))
+            documents.append(SearchDocument(model=model_name, object_id=obj.pk, content=content))
+            if len(documents) >= 2000:
+                SearchDocument.objects.bulk_create(documents)
+                documents = []
+        SearchDocument.objects.bulk_create(documents)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ioc_management', '0011_correlations'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=64)),
+                ('object_id', models.UUIDField(unique=True)),
+                ('content', models.TextField()),
+            ],
+            options={
+                'db_table': 'search_documents',
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(populate_search_documents, migrations.RunPython.noop),
+    ]
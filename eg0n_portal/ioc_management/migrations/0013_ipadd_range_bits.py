@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_range_bits(apps, schema_editor):
+    """Compute the span class of existing networks and ranges."""
+    IpAdd = apps.get_model('ioc_management', 'IpAdd')
+    objs = IpAdd.objects.exclude(range_start=models.F('range_end')).only('pk', 'range_start', 'range_end')
+    batch = []
+    for obj in objs.iterator(chunk_size=2000):
+        obj.range_bits = (int(obj.range_end, 16) - int(obj.range_start, 16)).bit_length()
+        batch.append(obj)
+        if len(batch) == 2000:
+            IpAdd.objects.bulk_update(batch, ['range_bits'])
+            batch = []
+    IpAdd.objects.bulk_update(batch, ['range_bits'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ioc_management', '0012_search_documents'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ipadd',
+            name='range_bits',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_range_bits, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='ipadd',
+            index=models.Index(fields=['range_bits', 'range_start', 'range_end'], name='ipadd_span_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:17
+
+from django.db import migrations, models
+
+
+def populate_watermark(apps, schema_editor):
+    """Record the changes pruned before watermarks: ids below the oldest kept change."""
+    Change = apps.get_model('ioc_management', 'Change')
+    ChangePrune = apps.get_model('ioc_management', 'ChangePrune')
+    first = Change.objects.order_by('id').values_list('id', flat=True).first()
+    if first is not None and first > 1:
+        ChangePrune.objects.create(last_id=first - 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ioc_management', '0013_ipadd_range_bits'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChangePrune',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_id', models.BigIntegerField(db_index=True)),
+                ('pruned_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'change_prunes',
+            },
+        ),
+        migrations.RunPython(populate_watermark, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-17 22:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ioc_management', '0014_change_prunes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RuleSid',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('object_id', models.UUIDField(unique=True)),
+                ('name', models.CharField(max_length=64)),
+                ('rev', models.PositiveIntegerField(default=1)),
+            ],
+            options={
+                'db_table': 'rule_sids',
+            },
+        ),
+    ]
@@ -1,8 +1,11 @@
 """Define ORM models for IoC Management app."""
 
+import ipaddress
 import uuid
 from datetime import timedelta
-from django.db import models
+from django.core.exceptions import ValidationError
+from django.db import connection, models
+from django.db.models import Q
 from django.urls import reverse
 from django.contrib.auth.models import User
 from django.utils import timezone
@@ -30,6 +33,121 @@ VALIDATION_CHOICES = [
 ]
 
 
+HASH_ALGORITHM_CHOICES = [("md5", "MD5"), ("sha1", "SHA1"), ("sha256", "SHA256")]
+HASH_ALGORITHM_LENGTHS = {32: "md5", 40: "sha1", 64: "sha256"}
+# Database vendor -> collation ordering strings by code point, like Python
+BINARY_COLLATIONS = {"mysql": "utf8mb4_bin", "oracle": "BINARY", "postgresql": "C", "sqlite": "BINARY"}
+
+
+def hash_digest(value):
+    """
+    Return (algorithm, binary digest) for an hex digest, detecting the algorithm from the length.
+
+    Raise ValueError if value is not a MD5, SHA1 or SHA256 hex digest.
+    """
+    value = str(value).strip().lower()
+    algorithm = HASH_ALGORITHM_LENGTHS.get(len(value))
+    if algorithm is None:
+        raise ValueError("Unknown digest length")
+    return algorithm, bytes.fromhex(value)
+
+
+def fqdn_labels(fqdn):
+    """Return the normalized labels of a FQDN, from the TLD down."""
+    labels = str(fqdn).strip().lower().rstrip(".").split(".")
+    return [label for label in reversed(labels) if label]
+
+
+def reverse_fqdn(fqdn):
+    """Return the reversed-label form of a FQDN (a.b.evil.com -> com.evil.b.a)."""
+    return ".".join(fqdn_labels(fqdn))
+
+
+def fqdn_covering_keys(fqdn):
+    """Return the reversed-label forms of the FQDNs covering a name: itself, parent domains and wildcards."""
+    labels = fqdn_labels(fqdn)
+    keys = []
+    for depth in range(1, len(labels) + 1):
+        prefix = ".".join(labels[:depth])
+        keys.append(prefix)
+        if depth < len(labels):
+            keys.append(prefix + ".*")
+    return keys
+
+
+def ip_key(address):
+    """
+    Return the sortable range key of an IP address.
+
+    IPv4 addresses are mapped into ::ffff:0:0/96, so IPv4 and IPv6 bounds share
+    the same 128-bit space. The integer is stored as 32 hex digits: fixed width
+    strings compare like the integers on every database backend.
+    """
+    address = ipaddress.ip_address(str(address).strip())
+    if address.version == 4:
+        address = ipaddress.IPv6Address((0xFFFF << 32) | int(address))
+    return "{:032x}".format(int(address))
+
+
+def ip_networks(ip_address, prefix_length=None, ip_address_end=None):
+    """Return the list of CIDR networks covered by an address, a CIDR or a range."""
+    start = ipaddress.ip_address(str(ip_address).strip())
+    if prefix_length is not None:
+        return [ipaddress.ip_network((start, prefix_length), strict=False)]
+    if ip_address_end:
+        end = ipaddress.ip_address(str(ip_address_end).strip())
+        return list(ipaddress.summarize_address_range(start, end))
+    return [ipaddress.ip_network(start)]
+
+
+def ip_network_keys(network):
+    """Return the (start, end) range keys of a CIDR network."""
+    network = ipaddress.ip_network(str(network).strip(), strict=False)
+    return ip_key(network.network_address), ip_key(network.broadcast_address)
+
+
+def ip_range_bits(range_start, range_end):
+    """Return the span class of range keys: the bit length of end - start, 0 for a single address."""
+    return (int(range_end, 16) - int(range_start, 16)).bit_length()
+
+
+def ip_range_classes():
+    """
+    Return the span classes (range_bits values) in use, in one query.
+
+    The recursive query seeks the next greater value on the (range_bits, ...)
+    index for each class, instead of scanning the table for DISTINCT.
+    """
+    table, column = connection.ops.quote_name(IpAdd._meta.db_table), connection.ops.quote_name("range_bits")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "WITH RECURSIVE classes(bits) AS ("
+            "SELECT MIN({column}) FROM {table} "
+            "UNION ALL "
+            "SELECT (SELECT MIN({column}) FROM {table} WHERE {column} > classes.bits) FROM classes "
+            "WHERE classes.bits IS NOT NULL"
+            ") SELECT bits FROM classes WHERE bits IS NOT NULL".format(table=table, column=column)
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def ip_overlap_q(range_start, range_end):
+    """
+    Return the Q object selecting the IpAdd objects overlapping the given range keys.
+
+    An object of span class n spans less than 2 ** n addresses, so it starts
+    less than 2 ** n addresses before range_start: each span class in use is
+    a bounded seek on the (range_bits, range_start) index, instead of a scan
+    of every object starting before range_end.
+    """
+    start = int(range_start, 16)
+    bounds = Q(pk__in=[])
+    for bits in ip_range_classes():
+        lowest = "{:032x}".format(max(start - (1 << bits) + 1, 0))
+        bounds |= Q(range_bits=bits, range_start__gte=lowest, range_start__lte=range_end)
+    return bounds & Q(range_end__gte=range_start)
+
+
 #############################################################################
 # Event
 #############################################################################
@@ -56,12 +174,17 @@ class Event(models.Model):
     )
     name = models.CharField(max_length=DEFAULT_MAX_LENGTH, unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    search_fields = ["name", "description"]
 
     class Meta:
         """Database metadata."""
 
         db_table = "event"
+        indexes = [
+            # Keyset pagination, see CustomPagination
+            models.Index(fields=["created_at", "id"], name="event_created_idx"),
+        ]
         ordering = ("-created_at",)
         verbose_name = "00 :: Event"
         verbose_name_plural = "00 :: Events"
@@ -115,7 +238,8 @@ class CodeSnippet(models.Model):
         max_length=32, choices=VALIDATION_CHOICES, default="new"
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    search_fields = ["name", "code", "description"]
 
     class Meta:
         """Database metadata."""
@@ -123,6 +247,10 @@ class CodeSnippet(models.Model):
         verbose_name = "03 :: Code Snippet"
         verbose_name_plural = "03 :: Code Snippets"
         db_table = "codesnippet"
+        indexes = [
+            # Keyset pagination, see CustomPagination
+            models.Index(fields=["created_at", "id"], name="codesnippet_created_idx"),
+        ]
         ordering = ("-created_at",)
 
     def __str__(self):
@@ -220,6 +348,8 @@ class FQDN(models.Model):
         Event, on_delete=models.CASCADE, related_name="fqdns",
     )
     fqdn = models.CharField(max_length=DEFAULT_MAX_LENGTH, db_index=True)
+    # Reversed labels (see reverse_fqdn), maintained on save
+    fqdn_reversed = models.CharField(max_length=DEFAULT_MAX_LENGTH, editable=False, db_index=True, default="")
     contributors = models.ManyToManyField(
         User,
         editable=False,
@@ -229,8 +359,9 @@ class FQDN(models.Model):
         max_length=DEFAULT_MAX_LENGTH, choices=VALIDATION_CHOICES, default="new"
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     duplicated_fields = ["fqdn"]
+    search_fields = ["fqdn", "description"]
 
     class Meta:
         """Database metadata."""
@@ -238,6 +369,10 @@ class FQDN(models.Model):
         verbose_name = "04 :: FQDN"
         verbose_name_plural = "04 :: FQDNs"
         db_table = "fqdn"
+        indexes = [
+            # Keyset pagination, see CustomPagination
+            models.Index(fields=["created_at", "id"], name="fqdn_created_idx"),
+        ]
         ordering = ("-created_at",)
 
     def __str__(self):
@@ -248,6 +383,14 @@ class FQDN(models.Model):
         """Return the absolute url."""
         return reverse("fqdn-detail-view", args=[str(self.pk)])
 
+    def save(self, *args, **kwargs):
+        """Keep the reversed-label column in sync with the FQDN."""
+        self.fqdn_reversed = reverse_fqdn(self.fqdn)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "fqdn_reversed"}
+        super().save(*args, **kwargs)
+
 
 #############################################################################
 # Hash
@@ -279,10 +422,11 @@ class Hash(models.Model):
         editable=False,
         related_name="contributed_hashes",
     )
-    md5 = models.CharField(max_length=DEFAULT_MAX_LENGTH, blank=True, null=True, db_index=True)
+    # Digests are indexed through HashDigest
+    md5 = models.CharField(max_length=DEFAULT_MAX_LENGTH, blank=True, null=True)
     platform = models.CharField(max_length=DEFAULT_MAX_LENGTH, choices=PLATFORM_CHOICES, default="windows")
-    sha1 = models.CharField(max_length=DEFAULT_MAX_LENGTH, blank=True, null=True, db_index=True)
-    sha256 = models.CharField(max_length=DEFAULT_MAX_LENGTH, blank=True, null=True, db_index=True)
+    sha1 = models.CharField(max_length=DEFAULT_MAX_LENGTH, blank=True, null=True)
+    sha256 = models.CharField(max_length=DEFAULT_MAX_LENGTH, blank=True, null=True)
     url = models.URLField(max_length=DEFAULT_MAX_LENGTH, blank=True, null=True)
     description = models.TextField()
     expired_at = models.DateField(default=DEFAULT_EXPIRED_AT)
@@ -290,8 +434,9 @@ class Hash(models.Model):
         max_length=32, choices=VALIDATION_CHOICES, default="new"
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     duplicated_fields = ["md5", "sha1", "sha256", "filename"]
+    search_fields = ["filename", "url", "description", "md5", "sha1", "sha256"]
 
     class Meta:
         """Database metadata."""
@@ -299,6 +444,10 @@ class Hash(models.Model):
         verbose_name = "05 :: File Hash"
         verbose_name_plural = "05 :: File Hashes"
         db_table = "hashes"
+        indexes = [
+            # Keyset pagination, see CustomPagination
+            models.Index(fields=["created_at", "id"], name="hash_created_idx"),
+        ]
         ordering = ("-created_at",)
 
     def __str__(self):
@@ -309,6 +458,72 @@ class Hash(models.Model):
         """Return the absolute url."""
         return reverse("hash-detail-view", args=[str(self.pk)])
 
+    def get_digests(self):
+        """Return the set of valid (algorithm, binary digest) pairs of the object."""
+        digests = set()
+        for field in ("md5", "sha1", "sha256"):
+            value = getattr(self, field)
+            if not value:
+                continue
+            try:
+                algorithm, digest = hash_digest(value)
+            except ValueError:
+                # Invalid digests cannot be looked up
+                continue
+            if algorithm == field:
+                digests.add((algorithm, digest))
+        return digests
+
+    def update_digests(self, created=False):
+        """Create, update or delete the HashDigest rows of the object."""
+        digests = self.get_digests()
+        if not created:
+            existing = {
+                (algorithm, bytes(digest))
+                for algorithm, digest in self.digests.values_list("algorithm", "digest")
+            }
+            if existing == digests:
+                # Nothing changed
+                return
+            self.digests.all().delete()
+        HashDigest.objects.bulk_create([
+            HashDigest(hash=self, algorithm=algorithm, digest=digest)
+            for algorithm, digest in digests
+        ])
+
+    def save(self, *args, **kwargs):
+        """Keep the normalized digest lookup table in sync."""
+        created = self._state.adding
+        super().save(*args, **kwargs)
+        self.update_digests(created=created)
+
+
+class HashDigest(models.Model):
+    """
+    Normalized lookup table for Hash digests.
+
+    A single (algorithm, binary digest) index answers lookups for any digest
+    type, 16 to 32 bytes per key instead of up to 64 characters per text index.
+    """
+
+    hash = models.ForeignKey(
+        Hash, on_delete=models.CASCADE, related_name="digests",
+    )
+    algorithm = models.CharField(max_length=8, choices=HASH_ALGORITHM_CHOICES)
+    digest = models.BinaryField(max_length=32)
+
+    class Meta:
+        """Database metadata."""
+
+        db_table = "hash_digest"
+        indexes = [
+            models.Index(fields=["algorithm", "digest"], name="hash_digest_idx"),
+        ]
+
+    def __str__(self):
+        """Return a human readable name when the object is printed."""
+        return "[{}] {}".format(self.algorithm, bytes(self.digest).hex())
+
 
 #############################################################################
 # IpAdd
@@ -339,6 +554,15 @@ class IpAdd(models.Model):
     )
     expired_at = models.DateField(default=DEFAULT_EXPIRED_AT)
     ip_address = models.GenericIPAddressField(unique=False, unpack_ipv4=True, db_index=True)
+    # Optional CIDR prefix length, ip_address is the network address
+    prefix_length = models.PositiveSmallIntegerField(blank=True, null=True)
+    # Optional last address, ip_address is the first address of the range
+    ip_address_end = models.GenericIPAddressField(blank=True, null=True, unpack_ipv4=True)
+    # Range bounds (see ip_key), maintained on save
+    range_start = models.CharField(max_length=32, editable=False, default="")
+    range_end = models.CharField(max_length=32, editable=False, default="")
+    # Span class of the range (see ip_range_bits), maintained on save
+    range_bits = models.PositiveSmallIntegerField(editable=False, default=0)
     contributors = models.ManyToManyField(
         User,
         editable=False,
@@ -348,8 +572,9 @@ class IpAdd(models.Model):
         max_length=32, choices=VALIDATION_CHOICES, default="new"
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     duplicated_fields = ["ip_address"]
+    search_fields = ["ip_address", "description"]
 
     class Meta:
         """Database metadata."""
@@ -358,11 +583,64 @@ class IpAdd(models.Model):
         ordering = ("-created_at",)
         verbose_name = "02 :: IP Address"
         verbose_name_plural = "02 :: IP Addresses"
+        indexes = [
+            models.Index(fields=["range_start", "range_end"], name="ipadd_range_idx"),
+            models.Index(fields=["range_bits", "range_start", "range_end"], name="ipadd_span_idx"),
+            # Keyset pagination, see CustomPagination
+            models.Index(fields=["created_at", "id"], name="ipadd_created_idx"),
+        ]
 
     def __str__(self):
         """Return a human readable name when the object is printed."""
+        if self.prefix_length is not None:
+            return "{}/{}".format(self.ip_address, self.prefix_length)
+        if self.ip_address_end:
+            return "{}-{}".format(self.ip_address, self.ip_address_end)
         return self.ip_address
 
+    @property
+    def networks(self):
+        """Return the list of CIDR networks covered by the object."""
+        return ip_networks(self.ip_address, self.prefix_length, self.ip_address_end)
+
+    def clean(self):
+        """Validate CIDR and range attributes."""
+        super().clean()
+        if not self.ip_address:
+            return
+        if self.prefix_length is not None and self.ip_address_end:
+            raise ValidationError("Set either a prefix length or a last address, not both.")
+        start = ipaddress.ip_address(str(self.ip_address))
+        if self.prefix_length is not None and self.prefix_length > start.max_prefixlen:
+            raise ValidationError({"prefix_length": "Prefix length is too long for the address."})
+        if self.ip_address_end:
+            end = ipaddress.ip_address(str(self.ip_address_end))
+            if end.version != start.version:
+                raise ValidationError({"ip_address_end": "First and last address must have the same version."})
+            if end < start:
+                raise ValidationError({"ip_address_end": "Last address must follow the first one."})
+
+    def update_range(self):
+        """Normalize the network address and compute range bounds."""
+        if self.prefix_length is not None:
+            network = self.networks[0]
+            self.ip_address = str(network.network_address)
+            self.range_start, self.range_end = ip_network_keys(network)
+        elif self.ip_address_end:
+            self.range_start = ip_key(self.ip_address)
+            self.range_end = ip_key(self.ip_address_end)
+        else:
+            self.range_start = self.range_end = ip_key(self.ip_address)
+        self.range_bits = ip_range_bits(self.range_start, self.range_end)
+
+    def save(self, *args, **kwargs):
+        """Keep range bounds in sync with the address attributes."""
+        self.update_range()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "ip_address", "range_start", "range_end", "range_bits"}
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         """Return the absolute url."""
         return reverse("ipadd-detail-view", args=[str(self.pk)])
@@ -450,8 +728,9 @@ class Vuln(models.Model):
     )
     name = models.CharField(max_length=DEFAULT_MAX_LENGTH)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     duplicated_fields = ["cve"]
+    search_fields = ["name", "cve", "description", "exploitation_details"]
 
     class Meta:
         """Database metadata."""
@@ -459,6 +738,10 @@ class Vuln(models.Model):
         verbose_name = "01 :: Vulnerability"
         verbose_name_plural = "01 :: Vulnerabilities"
         db_table = "vuln"
+        indexes = [
+            # Keyset pagination, see CustomPagination
+            models.Index(fields=["created_at", "id"], name="vuln_created_idx"),
+        ]
         ordering = ("-created_at",)
 
     def __str__(self):
@@ -468,3 +751,247 @@ class Vuln(models.Model):
     def get_absolute_url(self):
         """Return the absolute url."""
         return reverse("vuln-detail-view", args=[str(self.pk)])
+
+
+#############################################################################
+# Change
+#############################################################################
+
+
+CHANGE_ACTION_CHOICES = [("upsert", "Upsert"), ("delete", "Delete")]
+
+
+class Change(models.Model):
+    """
+    Outbox of create/update/delete operations on IoC objects.
+
+    The auto-increment id is the cursor of the changes API: mirrors sync in
+    O(changes) and see deletions as tombstones.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    action = models.CharField(max_length=8, choices=CHANGE_ACTION_CHOICES)
+    model = models.CharField(max_length=DEFAULT_MAX_LENGTH)
+    object_id = models.UUIDField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        """Database metadata."""
+
+        db_table = "changes"
+        ordering = ("id",)
+
+    def __str__(self):
+        """Return a human readable name when the object is printed."""
+        return "[{}] {} {}".format(self.id, self.action, self.model)
+
+    @classmethod
+    def record(cls, model, object_ids, action="upsert"):
+        """Log changes made without model signals (e.g. QuerySet.update() or bulk_create())."""
+        cls.objects.bulk_create(
+            [cls(action=action, model=model._meta.model_name, object_id=pk) for pk in object_ids],
+            batch_size=1000,
+        )
+
+
+class ChangePrune(models.Model):
+    """
+    Prune watermarks of the change log.
+
+    Sequences leave gaps (e.g. rolled back inserts on PostgreSQL), so a
+    missing id does not mean pruned changes: cursors are compared to the
+    highest pruned id instead.
+    """
+
+    last_id = models.BigIntegerField(db_index=True)
+    pruned_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        """Database metadata."""
+
+        db_table = "change_prunes"
+
+    def __str__(self):
+        """Return a human readable name when the object is printed."""
+        return "[{}] {}".format(self.last_id, self.pruned_at)
+
+    @classmethod
+    def watermark(cls):
+        """Return the highest pruned change id, 0 if never pruned."""
+        return cls.objects.order_by("-last_id").values_list("last_id", flat=True).first() or 0
+
+
+#############################################################################
+# Duplicates
+#############################################################################
+
+
+class DuplicateGroup(models.Model):
+    """
+    Objects of a model sharing the value of one of its duplicated_fields.
+
+    Maintained incrementally by signals (see duplicates.py), rebuilt by the
+    rebuild_duplicates command: groups with count > 1 are the duplicates,
+    found with indexed joins instead of a GROUP BY over the whole table.
+    """
+
+    model = models.CharField(max_length=DEFAULT_MAX_LENGTH)
+    field = models.CharField(max_length=DEFAULT_MAX_LENGTH)
+    value = models.CharField(max_length=DEFAULT_MAX_LENGTH)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        """Database metadata."""
+
+        db_table = "duplicate_groups"
+        constraints = [
+            models.UniqueConstraint(fields=["model", "field", "value"], name="duplicate_group_key"),
+        ]
+        indexes = [
+            models.Index(fields=["model", "count"], name="duplicate_group_count_idx"),
+        ]
+
+    def __str__(self):
+        """Return a human readable name when the object is printed."""
+        return "[{}.{}] {} ({})".format(self.model, self.field, self.value, self.count)
+
+
+class DuplicateMember(models.Model):
+    """Membership of an object in a DuplicateGroup."""
+
+    group = models.ForeignKey(
+        DuplicateGroup, on_delete=models.CASCADE, related_name="members",
+    )
+    object_id = models.UUIDField()
+
+    class Meta:
+        """Database metadata."""
+
+        db_table = "duplicate_members"
+        constraints = [
+            models.UniqueConstraint(fields=["object_id", "group"], name="duplicate_member_key"),
+        ]
+
+    def __str__(self):
+        """Return a human readable name when the object is printed."""
+        return "{} in {}".format(self.object_id, self.group_id)
+
+
+#############################################################################
+# Correlations
+#############################################################################
+
+
+class Correlation(models.Model):
+    """
+    Normalized indicator value of an attribute, with the event containing it.
+
+    Maintained incrementally by signals (see correlations.py), rebuilt by the
+    rebuild_correlations command: events sharing indicators are found with a
+    single indexed self-join instead of one query per attribute.
+    """
+
+    indicator = models.CharField(max_length=DEFAULT_MAX_LENGTH * 2)
+    event = models.ForeignKey(
+        Event, on_delete=models.CASCADE, related_name="correlations",
+    )
+    object_id = models.UUIDField()
+
+    class Meta:
+        """Database metadata."""
+
+        db_table = "correlations"
+        constraints = [
+            models.UniqueConstraint(fields=["object_id", "indicator"], name="correlation_key"),
+        ]
+        indexes = [
+            models.Index(fields=["indicator", "event"], name="correlation_indicator_idx"),
+            models.Index(fields=["event", "indicator"], name="correlation_event_idx"),
+        ]
+
+    def __str__(self):
+        """Return a human readable name when the object is printed."""
+        return "{} in {}".format(self.indicator, self.event_id)
+
+
+#############################################################################
+# Search
+#############################################################################
+
+
+class SearchDocument(models.Model):
+    """
+    Searchable text of an object: the values of its search_fields.
+
+    Maintained by signals (see search.py), rebuilt by the rebuild_search_index
+    command. The content is indexed by the database full-text engine (FTS5
+    on SQLite, GIN on PostgreSQL), created by migrations.
+    """
+
+    model = models.CharField(max_length=DEFAULT_MAX_LENGTH)
+    object_id = models.UUIDField(unique=True)
+    content = models.TextField()
+
+    class Meta:
+        """Database metadata."""
+
+        db_table = "search_documents"
+
+    def __str__(self):
+        """Return a human readable name when the object is printed."""
+        return "[{}] {}".format(self.model, self.object_id)
+
+
+#############################################################################
+# Suricata rules
+#############################################################################
+
+
+class RuleSid(models.Model):
+    """
+    Suricata signature id of the rule generated for an object.
+
+    The sid derives from the auto-increment id, allocated on first build and
+    never deleted: a rule keeps its sid for life, whatever is added or removed
+    around it. rev is bumped when the rule content (name) changes.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    object_id = models.UUIDField(unique=True)
+    name = models.CharField(max_length=DEFAULT_MAX_LENGTH)
+    rev = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        """Database metadata."""
+
+        db_table = "rule_sids"
+
+    def __str__(self):
+        """Return a human readable name when the object is printed."""
+        return "[{}] {} rev {}".format(self.id, self.name, self.rev)
+
+
+#############################################################################
+# Bulk operations
+#############################################################################
+
+
+def bulk_create(model, objs, batch_size=1000):
+    """
+    Insert objects with QuerySet.bulk_create(), return them.
+
+    bulk_create() skips save(): columns and tables maintained by save() are
+    computed here. It also skips model signals, callers send bulk_changed.
+    """
+    for obj in objs:
+        if isinstance(obj, FQDN):
+            obj.fqdn_reversed = reverse_fqdn(obj.fqdn)
+        elif isinstance(obj, IpAdd):
+            obj.update_range()
+    objs = model.objects.bulk_create(objs, batch_size=batch_size)
+    if model is Hash:
+        HashDigest.objects.bulk_create(
+            [HashDigest(hash=obj, algorithm=algorithm, digest=digest) for obj in objs for algorithm, digest in obj.get_digests()],
+            batch_size=batch_size,
+        )
+    return objs
@@ -120,6 +120,146 @@ class VulnPermissionPolicy:
         return True
     
 
+#############################################################################
+# Match
+#############################################################################
+
+
+class MatchPermissionPolicy:
+    """DRF (API) permisson policy for bulk match requests."""
+
+    def can(self, user, method, target=None, payload=None):
+        """Defines what the requesting user can do based on their role and HTTP method."""
+
+        # === GUEST RULES ===
+        if not user.is_authenticated:
+            # Guest users are not allowed to do anything
+            return None
+
+        # === COMMON RULES ===
+        return True
+
+
+#############################################################################
+# Search
+#############################################################################
+
+
+class SearchPermissionPolicy:
+    """DRF (API) and UI permisson policy for global searches."""
+
+    def can(self, user, method, target=None, payload=None):
+        """Defines what the requesting user can do based on their role and HTTP method."""
+
+        # === GUEST RULES ===
+        if not user.is_authenticated:
+            # Guest users are not allowed to do anything
+            return None
+
+        # === COMMON RULES ===
+        return True
+
+
+#############################################################################
+# Change
+#############################################################################
+
+
+class ChangePermissionPolicy:
+    """DRF (API) permisson policy for the change log."""
+
+    def can(self, user, method, target=None, payload=None):
+        """Defines what the requesting user can do based on their role and HTTP method."""
+
+        # === GUEST RULES ===
+        if not user.is_authenticated:
+            # Guest users are not allowed to do anything
+            return None
+
+        # === COMMON RULES ===
+        return method in ["GET", "HEAD", "OPTIONS"]
+
+
+#############################################################################
+# RPZ
+#############################################################################
+
+
+class RPZPermissionPolicy:
+    """DRF (API) permisson policy for DNS Response Policy Zone transfers."""
+
+    def can(self, user, method, target=None, payload=None):
+        """Defines what the requesting user can do based on their role and HTTP method."""
+
+        # === GUEST RULES ===
+        if not user.is_authenticated:
+            # Guest users are not allowed to do anything
+            return None
+
+        # === COMMON RULES ===
+        return method in ["GET", "HEAD", "OPTIONS"]
+
+
+#############################################################################
+# Rules
+#############################################################################
+
+
+class RulesPermissionPolicy:
+    """DRF (API) permisson policy for generated Suricata rules."""
+
+    def can(self, user, method, target=None, payload=None):
+        """Defines what the requesting user can do based on their role and HTTP method."""
+
+        # === GUEST RULES ===
+        if not user.is_authenticated:
+            # Guest users are not allowed to do anything
+            return None
+
+        # === COMMON RULES ===
+        return method in ["GET", "HEAD", "OPTIONS"]
+
+
+#############################################################################
+# Snapshot
+#############################################################################
+
+
+class SnapshotPermissionPolicy:
+    """DRF (API) permisson policy for filter snapshot downloads."""
+
+    def can(self, user, method, target=None, payload=None):
+        """Defines what the requesting user can do based on their role and HTTP method."""
+
+        # === GUEST RULES ===
+        if not user.is_authenticated:
+            # Guest users are not allowed to do anything
+            return None
+
+        # === COMMON RULES ===
+        return method in ["GET", "HEAD", "OPTIONS"]
+
+
+#############################################################################
+# TAXII
+#############################################################################
+
+
+class TAXIIPermissionPolicy:
+    """DRF (API) permisson policy for the read only TAXII 2.1 server."""
+
+    def can(self, user, method, target=None, payload=None):
+        """Defines what the requesting user can do based on their role and HTTP method."""
+
+        # === GUEST RULES ===
+        if not user.is_authenticated:
+            # Guest users are not allowed to do anything
+            return None
+
+        # === COMMON RULES ===
+        return method in ["GET", "HEAD", "OPTIONS"]
+
+
 #############################################################################
 # Home
 #############################################################################
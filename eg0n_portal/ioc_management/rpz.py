@@ -0,0 +1,324 @@
+"""DNS Response Policy Zone export for IoC Management app."""
+
+import heapq
+import json
+import os
+import re
+import shutil
+import time
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q, Value
+from django.db.models.functions import Collate, Concat
+from django.utils import timezone
+from ioc_management.files import atomic_write, file_lock, table_validator, temp_file
+from ioc_management.models import BINARY_COLLATIONS, FQDN
+
+
+NAME_RE = re.compile(r"^(\*\.)?([a-z0-9_-]+\.)*[a-z0-9_-]+$")
+ZONE_NAME = "eg0n.rpz"
+
+
+#############################################################################
+# Helpers
+#############################################################################
+
+
+def active_q():
+    """Return the Q object selecting the FQDN objects listed in the zone."""
+    return Q(
+        confidence__in=settings.IOC_RPZ_CONFIDENCE,
+        expired_at__gt=timezone.localdate(),
+        validation_status__in=settings.IOC_RPZ_VALIDATION_STATUS,
+    )
+
+
+def get_rpz_path(name):
+    """Return the path of a generated file."""
+    return os.path.join(str(settings.IOC_RPZ_DIR), name)
+
+
+def get_diff_name(old_serial, new_serial):
+    """Return the file name of the difference sequence between two serials."""
+    return "eg0n-{}-{}.ixfr".format(old_serial, new_serial)
+
+
+def key_owner(key):
+    """Return the owner name of a reversed-label key (com.evil.* -> *.evil.com)."""
+    return ".".join(reversed(key.split(".")))
+
+
+def soa_record(serial):
+    """Return the SOA record line of a serial."""
+    return "@ SOA localhost. hostmaster.localhost. ({} 3600 600 86400 {})\n".format(serial, settings.IOC_RPZ_TTL)
+
+
+def zone_header(serial):
+    """Return the header lines of the zone: origin, default TTL, SOA and NS records."""
+    return [
+        "$ORIGIN {}.\n".format(settings.IOC_RPZ_ORIGIN),
+        "$TTL {}\n".format(settings.IOC_RPZ_TTL),
+        soa_record(serial),
+        "@ NS localhost.\n",
+    ]
+
+
+#############################################################################
+# Zone
+#############################################################################
+
+
+def iter_keys():
+    """
+    Yield the sorted, unique reversed-label keys of the zone records.
+
+    A listed domain covers itself and its subdomains, so it produces two
+    records (evil.com and *.evil.com), a listed "*.domain" only the wildcard.
+    Keys come from two queries sorted on fqdn_reversed by the database and
+    merged on the fly, so memory usage does not depend on the number of names.
+    The merge and the zone differences need the Python string order: the
+    queries sort with a binary collation, not the database default (e.g. a
+    PostgreSQL locale collation ignoring punctuation).
+    """
+    collation = BINARY_COLLATIONS[connection.vendor]
+    qs = FQDN.objects.filter(active_q()).exclude(fqdn_reversed="")
+    exact = qs.order_by(Collate("fqdn_reversed", collation)).values_list("fqdn_reversed", flat=True)
+    wildcards = (
+        qs.exclude(fqdn_reversed__endswith=".*")
+        .annotate(key=Concat("fqdn_reversed", Value(".*")))
+        .order_by(Collate("key", collation))
+        .values_list("key", flat=True)
+    )
+    previous = None
+    for key in heapq.merge(exact.iterator(chunk_size=2000), wildcards.iterator(chunk_size=2000)):
+        if key != previous and NAME_RE.match(key_owner(key)):
+            yield key
+        previous = key
+
+
+def iter_zone_keys(path):
+    """Yield the keys of the records of a zone (or records) file, in file order."""
+    with open(path) as fd:
+        for line in fd:
+            if line[0] in "$@;":
+                # Header
+                continue
+            owner = line.split(" ", 1)[0]
+            yield ".".join(reversed(owner.split(".")))
+
+
+def iter_diff(old, new):
+    """Yield ("delete" | "add", key) merging two sorted key iterators."""
+    old_key, new_key = next(old, None), next(new, None)
+    while old_key is not None or new_key is not None:
+        if new_key is None or (old_key is not None and old_key < new_key):
+            yield "delete", old_key
+            old_key = next(old, None)
+        elif old_key is None or new_key < old_key:
+            yield "add", new_key
+            new_key = next(new, None)
+        else:
+            old_key, new_key = next(old, None), next(new, None)
+
+
+def record_line(key):
+    """Return the zone record line of a key (NXDOMAIN policy)."""
+    return "{} CNAME .\n".format(key_owner(key))
+
+
+#############################################################################
+# Build
+#############################################################################
+
+
+def get_validator():
+    """Return a value changing whenever the zone may change."""
+    # FQDN objects expire without updated_at moving: rebuild at least daily
+    return table_validator(FQDN.objects.all()) + [
+        timezone.localdate().isoformat(),
+        sorted(settings.IOC_RPZ_CONFIDENCE),
+        sorted(settings.IOC_RPZ_VALIDATION_STATUS),
+    ]
+
+
+def load_metadata():
+    """Return the metadata of the current zone, an empty dict if missing."""
+    try:
+        with open(get_rpz_path("rpz.json")) as fd:
+            return json.load(fd)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_metadata(metadata):
+    """Atomically replace the metadata of the current zone."""
+    with atomic_write(get_rpz_path("rpz.json")) as fd:
+        json.dump(metadata, fd)
+
+
+def build_rpz(force=False):
+    """
+    Rebuild the zone if listed names changed, return its metadata.
+
+    The records are written sorted by reversed labels, so the difference
+    between the previous zone and the new records is a single merge pass over
+    two files. When names were added or removed, the serial is bumped
+    (Unix time, or previous + 1 if greater) and the difference sequence is
+    kept as an IXFR-style file: old SOA, deleted records, new SOA, added
+    records. The last IOC_RPZ_MAX_DIFFS differences are kept. A single
+    build runs at a time (zone directory lock), so two polls cannot bump
+    the serial twice for the same changes.
+    """
+    with file_lock(str(settings.IOC_RPZ_DIR)):
+        return update_rpz(force)
+
+
+def update_rpz(force):
+    """Rebuild the zone if listed names changed, the directory lock being held."""
+    zone_path = get_rpz_path(ZONE_NAME)
+    metadata = load_metadata()
+    validator = get_validator()
+    zone = [settings.IOC_RPZ_ORIGIN, settings.IOC_RPZ_TTL]
+    if metadata.get("zone") != zone or not os.path.exists(zone_path):
+        # Previous serials refer to another zone
+        metadata = {"serial": metadata.get("serial", 0), "diffs": metadata.get("diffs", [])}
+        old_path = None
+    else:
+        if not force and metadata["validator"] == validator:
+            # Nothing changed
+            return metadata
+        old_path = zone_path
+
+    with ExitStack() as stack:
+
+        def scratch(name):
+            """Return a new temporary file, removed when the build ends."""
+            fd = temp_file(str(settings.IOC_RPZ_DIR), name)
+            stack.callback(os.remove, fd.name)
+            return fd
+
+        records = scratch("records")
+        count = 0
+        with records:
+            for key in iter_keys():
+                records.write(record_line(key))
+                count += 1
+
+        changes = 0
+        if old_path:
+            deleted, added = scratch("deleted"), scratch("added")
+            with deleted, added:
+                for operation, key in iter_diff(iter_zone_keys(old_path), iter_zone_keys(records.name)):
+                    (deleted if operation == "delete" else added).write(record_line(key))
+                    changes += 1
+            if not changes:
+                # Only unlisted fields changed
+                metadata["validator"] = validator
+                write_metadata(metadata)
+                return metadata
+
+        old_serial = metadata["serial"]
+        serial = max(old_serial + 1, int(time.time()))
+        diffs = metadata["diffs"]
+        if old_path:
+            with atomic_write(get_rpz_path(get_diff_name(old_serial, serial))) as fd:
+                fd.write(soa_record(old_serial))
+                with open(deleted.name) as deleted_fd:
+                    shutil.copyfileobj(deleted_fd, fd)
+                fd.write(soa_record(serial))
+                with open(added.name) as added_fd:
+                    shutil.copyfileobj(added_fd, fd)
+            diffs.append([old_serial, serial])
+        # Without previous zone, no difference can be applied anymore
+        expired = max(len(diffs) - settings.IOC_RPZ_MAX_DIFFS, 0) if old_path else len(diffs)
+        for old, new in diffs[:expired]:
+            try:
+                os.remove(get_rpz_path(get_diff_name(old, new)))
+            except OSError:
+                pass
+        diffs = diffs[expired:]
+
+        with atomic_write(zone_path) as fd:
+            fd.writelines(zone_header(serial))
+            with open(records.name) as records_fd:
+                shutil.copyfileobj(records_fd, fd)
+
+    metadata = {
+        "serial": serial,
+        "built_at": timezone.now().isoformat(),
+        "count": count,
+        "changes": changes,
+        "diffs": diffs,
+        "validator": validator,
+        "zone": zone,
+    }
+    write_metadata(metadata)
+    return metadata
+
+
+#############################################################################
+# Transfers
+#############################################################################
+
+
+def get_diff_chain(metadata, serial):
+    """Return the difference file names bringing a serial to the current one, None if unavailable."""
+    if serial == metadata["serial"]:
+        return []
+    for index, (old, _) in enumerate(metadata["diffs"]):
+        if old == serial:
+            return [get_diff_name(old, new) for old, new in metadata["diffs"][index:]]
+    return None
+
+
+def open_zone():
+    """
+    Build the zone if needed, return (metadata, open zone file).
+
+    The file is opened while holding the build lock: a concurrent build
+    replaces the path, the open file keeps reading the zone of this serial.
+    """
+    with file_lock(str(settings.IOC_RPZ_DIR)):
+        metadata = update_rpz(False)
+        return metadata, open(get_rpz_path(ZONE_NAME), "rb")
+
+
+def open_diffs(serial):
+    """
+    Build the zone if needed, return (metadata, open difference files bringing a serial to the current one).
+
+    Files are None when the serial is unknown or too old. As for open_zone(),
+    they are opened while holding the build lock: expired differences can be
+    removed by a concurrent build while the open files are being read.
+    """
+    with file_lock(str(settings.IOC_RPZ_DIR)):
+        metadata = update_rpz(False)
+        names = get_diff_chain(metadata, serial)
+        if names is None:
+            return metadata, None
+        return metadata, [open(get_rpz_path(name)) for name in names]
+
+
+def iter_ixfr(metadata, files, chunk_size=65536):
+    """
+    Yield the text of an IXFR-style answer: new SOA, difference sequences, new SOA.
+
+    files are the open difference files (see open_diffs()), closed once read.
+    An empty chain yields the new SOA only (the client is up to date).
+    """
+    try:
+        yield "$ORIGIN {}.\n$TTL {}\n".format(settings.IOC_RPZ_ORIGIN, settings.IOC_RPZ_TTL)
+        yield soa_record(metadata["serial"])
+        if not files:
+            return
+        for fd in files:
+            while True:
+                chunk = fd.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        yield soa_record(metadata["serial"])
+    finally:
+        for fd in files or ():
+            fd.close()
@@ -0,0 +1,216 @@
+"""Suricata rule generation for IoC Management app."""
+
+import json
+import os
+from contextlib import ExitStack
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from ioc_management.files import atomic_write, file_lock, table_validator
+from ioc_management.models import FQDN, Hash, IpAdd, RuleSid, fqdn_labels, hash_digest, ip_networks
+from ioc_management.utils import batches
+
+
+# Sids are offsets from IOC_RULES_SID_BASE: static rules use 0-99, derived from
+# the positions below (append only), FQDN rules 100 + RuleSid.id
+FILE_ALGORITHMS = (("filemd5", "md5"), ("filesha1", "sha1"), ("filesha256", "sha256"))
+FILE_PROTOCOLS = ("http", "smtp", "ftp-data", "smb", "nfs")
+FQDN_SID_OFFSET = 100
+IPREP_CATEGORY = (1, "eg0n", "eg0n malicious IP addresses")
+IPREP_SCORE = {"low": 40, "medium": 70, "high": 100}
+
+
+#############################################################################
+# Helpers
+#############################################################################
+
+
+def active_q():
+    """Return the Q object selecting the attributes turned into rules: approved and not expired."""
+    return Q(expired_at__gt=timezone.localdate(), validation_status="approved")
+
+
+def get_rules_path(name):
+    """Return the path of a generated file."""
+    return os.path.join(str(settings.IOC_RULES_DIR), name)
+
+
+def write_file(name, lines):
+    """Atomically replace a generated file, writing lines one by one."""
+    with atomic_write(get_rules_path(name)) as fd:
+        fd.writelines(lines)
+
+
+def iter_records(model, fields):
+    """Yield the active records of a model, fetching rows by chunks."""
+    qs = model.objects.filter(active_q()).order_by("created_at", "id")
+    yield from qs.values(*fields).iterator(chunk_size=2000)
+
+
+#############################################################################
+# Generators
+#############################################################################
+
+
+def generate_static():
+    """Write the rules loading the list files, and the IP reputation categories."""
+    sid = settings.IOC_RULES_SID_BASE
+    lines = [
+        'alert ip any any -> any any (msg:"eg0n IP reputation (source)"; '
+        "iprep:src,{},>,0; sid:{}; rev:1;)\n".format(IPREP_CATEGORY[1], sid),
+        'alert ip any any -> any any (msg:"eg0n IP reputation (destination)"; '
+        "iprep:dst,{},>,0; sid:{}; rev:1;)\n".format(IPREP_CATEGORY[1], sid + 1),
+    ]
+    for i, (keyword, name) in enumerate(FILE_ALGORITHMS):
+        for j, protocol in enumerate(FILE_PROTOCOLS):
+            lines.append(
+                'alert {} any any -> any any (msg:"eg0n malicious file {} ({})"; '
+                "{}:eg0n-{}.list; sid:{}; rev:1;)\n".format(
+                    protocol, name.upper(), protocol, keyword, name, sid + 10 * (i + 1) + j,
+                )
+            )
+    write_file("eg0n.rules", lines)
+    write_file("eg0n-categories.txt", ["{},{},{}\n".format(*IPREP_CATEGORY)])
+
+
+def get_rule_sids(names):
+    """
+    Return the (sid, rev) of the rules of objects, given as {object id: name}.
+
+    Sids are allocated on first sight and never reused; rev is bumped when
+    the name of an object changes.
+    """
+    rows = {row.object_id: row for row in RuleSid.objects.filter(object_id__in=names)}
+    missing = [pk for pk in names if pk not in rows]
+    if missing:
+        RuleSid.objects.bulk_create([RuleSid(object_id=pk, name=names[pk]) for pk in missing], ignore_conflicts=True)
+        rows.update({row.object_id: row for row in RuleSid.objects.filter(object_id__in=missing)})
+    renamed = [row for row in rows.values() if row.name != names[row.object_id]]
+    for row in renamed:
+        row.name = names[row.object_id]
+        row.rev += 1
+    RuleSid.objects.bulk_update(renamed, ["name", "rev"])
+    base = settings.IOC_RULES_SID_BASE + FQDN_SID_OFFSET
+    return {pk: (base + row.id, row.rev) for pk, row in rows.items()}
+
+
+def generate_fqdn():
+    """Write one dns.query rule per FQDN, a listed domain covering its subdomains."""
+
+    def lines():
+        for batch in batches(iter_records(FQDN, ("id", "fqdn")), 2000):
+            names = {}
+            for record in batch:
+                name = ".".join(reversed(fqdn_labels(record["fqdn"])))
+                if name and '"' not in name and ";" not in name:
+                    names[record["id"]] = name
+            sids = get_rule_sids(names)
+            for pk, name in names.items():
+                if name.startswith("*."):
+                    # Subdomains only
+                    match = 'content:"{}"; nocase; endswith;'.format(name[1:])
+                else:
+                    match = 'dotprefix; content:".{}"; nocase; endswith;'.format(name)
+                yield 'alert dns any any -> any any (msg:"eg0n malicious FQDN {}"; dns.query; {} sid:{}; rev:{};)\n'.format(
+                    name, match, *sids[pk],
+                )
+
+    write_file("eg0n-fqdn.rules", lines())
+
+
+def generate_hash():
+    """Write the filemd5, filesha1 and filesha256 lists."""
+    with ExitStack() as stack:
+        files = {
+            algorithm: stack.enter_context(atomic_write(get_rules_path("eg0n-{}.list".format(algorithm))))
+            for algorithm in ("md5", "sha1", "sha256")
+        }
+        for record in iter_records(Hash, ("md5", "sha1", "sha256")):
+            for field, fd in files.items():
+                try:
+                    algorithm, digest = hash_digest(record[field] or "")
+                except ValueError:
+                    continue
+                if algorithm == field:
+                    fd.write(digest.hex() + "\n")
+
+
+def generate_ipadd():
+    """Write the IP reputation list, ranges being split into CIDR networks."""
+
+    def lines():
+        for record in iter_records(IpAdd, ("ip_address", "prefix_length", "ip_address_end", "confidence")):
+            try:
+                networks = ip_networks(record["ip_address"], record["prefix_length"], record["ip_address_end"])
+            except ValueError:
+                continue
+            score = IPREP_SCORE.get(record["confidence"], IPREP_SCORE["low"])
+            for network in networks:
+                address = str(network.network_address) if network.num_addresses == 1 else str(network)
+                yield "{},{},{}\n".format(address, IPREP_CATEGORY[0], score)
+
+    write_file("eg0n-iprep.list", lines())
+
+
+# set name -> (model, generator, generated files)
+RULE_SETS = {
+    "fqdn": (FQDN, generate_fqdn, ("eg0n-fqdn.rules",)),
+    "hash": (Hash, generate_hash, ("eg0n-md5.list", "eg0n-sha1.list", "eg0n-sha256.list")),
+    "ipadd": (IpAdd, generate_ipadd, ("eg0n-iprep.list",)),
+    "static": (None, generate_static, ("eg0n.rules", "eg0n-categories.txt")),
+}
+RULE_FILES = {name: set_name for set_name, (_, _, names) in RULE_SETS.items() for name in names}
+
+
+#############################################################################
+# Cache
+#############################################################################
+
+
+def get_validator(model):
+    """Return a value changing whenever the rules of a model may change."""
+    if model is None:
+        # Static rules depend on the settings only
+        return [settings.IOC_RULES_SID_BASE]
+    # Attributes expire without updated_at moving: rebuild at least daily
+    return table_validator(model.objects.all()) + [timezone.localdate().isoformat()]
+
+
+def build_rules(force=False):
+    """
+    Rebuild the rule sets whose attributes changed, return the metadata.
+
+    Each set (one per model) is cached on disk with the validator it was
+    built from, so unchanged sets cost a single aggregate query. Sensors
+    polling during a build wait on the rules directory lock and download the
+    sets it produced.
+    """
+    with file_lock(str(settings.IOC_RULES_DIR)):
+        return update_rules(force)
+
+
+def update_rules(force):
+    """Rebuild the rule sets whose attributes changed, the directory lock being held."""
+    metadata_path = get_rules_path("rules.json")
+    try:
+        with open(metadata_path) as fd:
+            metadata = json.load(fd)
+    except (OSError, ValueError):
+        metadata = {}
+
+    changed = False
+    for set_name, (model, generator, names) in RULE_SETS.items():
+        validator = get_validator(model)
+        cached = metadata.get(set_name)
+        if not force and cached and cached["validator"] == validator and all(
+            os.path.exists(get_rules_path(name)) for name in names
+        ):
+            continue
+        generator()
+        metadata[set_name] = {"validator": validator, "built_at": timezone.now().isoformat()}
+        changed = True
+
+    if changed:
+        with atomic_write(metadata_path) as fd:
+            json.dump(metadata, fd)
+    return metadata
@@ -0,0 +1,392 @@
+"""Full-text search index for IoC Management app."""
+
+import ipaddress
+import re
+from functools import reduce
+from operator import or_
+from urllib.parse import urlsplit
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import CharField, Expression, F, FloatField, OuterRef, Q, Subquery, Value
+from django.db.models.expressions import RawSQL
+from ioc_management.models import (
+    CodeSnippet,
+    Event,
+    FQDN,
+    Hash,
+    IpAdd,
+    SearchDocument,
+    Vuln,
+    fqdn_covering_keys,
+    hash_digest,
+    ip_key,
+    ip_network_keys,
+    ip_overlap_q,
+    reverse_fqdn,
+)
+from ioc_management.utils import batches
+
+
+BATCH_SIZE = 1000
+FTS_TABLE = "search_documents_fts"
+SEARCH_CONFIG = "simple"  # PostgreSQL text search configuration, no stemming
+SEARCH_MODELS = (CodeSnippet, Event, FQDN, Hash, IpAdd, Vuln)
+# Words as split by the FTS5 unicode61 tokenizer: letters and digits
+WORD_RE = re.compile(r"[^\W_]+")
+CVE_RE = re.compile(r"^CVE-\d{4}-\d{4,}$", re.IGNORECASE)
+FQDN_RE = re.compile(r"^(\*\.)?([a-z0-9_-]{1,63}\.)+[a-z][a-z0-9-]{1,62}\.?$", re.IGNORECASE)
+
+# Full-text engine of each database alias, see get_search_backend()
+backends = {}
+
+
+#############################################################################
+# Helpers
+#############################################################################
+
+
+def document_content(obj):
+    """Return the searchable text of an object, one search field value per line."""
+    values = (getattr(obj, field) for field in obj.search_fields)
+    return "\n".join(str(value) for value in values if value not in (None, ""))
+
+
+def object_document(obj):
+    """Return the unsaved SearchDocument of an object."""
+    return SearchDocument(model=obj._meta.model_name, object_id=obj.pk, content=document_content(obj))
+
+
+def fts5_query(value):
+    """
+    Return the FTS5 query matching value, an empty string without words.
+
+    Each whitespace separated term is a phrase of its words, the last one
+    matched as a prefix: "192.0.2" finds 192.0.2.1, "evil.co" finds
+    evil.com. Terms are ANDed. Words are quoted, so the user input is never
+    parsed as FTS5 syntax.
+    """
+    phrases = []
+    for term in value.split():
+        words = WORD_RE.findall(term)
+        if words:
+            phrases.append('"{}"*'.format(" ".join(words)))
+    return " ".join(phrases)
+
+
+#############################################################################
+# Incremental updates
+#############################################################################
+
+
+def add_objects(objs):
+    """Index new objects."""
+    SearchDocument.objects.bulk_create([object_document(obj) for obj in objs], batch_size=BATCH_SIZE, ignore_conflicts=True)
+
+
+def remove_objects(object_ids):
+    """Remove objects from the index."""
+    with transaction.atomic():
+        for batch in batches(object_ids, BATCH_SIZE):
+            SearchDocument.objects.filter(object_id__in=batch).delete()
+
+
+def sync_object(obj):
+    """Reindex a saved object (one query if already indexed)."""
+    document = object_document(obj)
+    if not SearchDocument.objects.filter(object_id=obj.pk).update(content=document.content):
+        SearchDocument.objects.bulk_create([document], ignore_conflicts=True)
+
+
+#############################################################################
+# Rebuild
+#############################################################################
+
+
+def rebuild_search_index(chunk_size=2000):
+    """Rebuild the index from scratch, return {model name: indexed objects}."""
+    result = {}
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        for model in SEARCH_MODELS:
+            objs = model.objects.only("pk", *model.search_fields).order_by().iterator(chunk_size=chunk_size)
+            result[model._meta.model_name] = 0
+            for batch in batches(objs, chunk_size):
+                add_objects(batch)
+                result[model._meta.model_name] += len(batch)
+    return result
+
+
+#############################################################################
+# Queries
+#############################################################################
+
+
+def get_search_backend(connection):
+    """Return the full-text engine of a database: "fts5", "postgresql" or None if unavailable."""
+    if connection.alias not in backends:
+        backend = None
+        if connection.vendor == "postgresql":
+            backend = "postgresql"
+        elif connection.vendor == "sqlite":
+            # The migration skips the index when SQLite is built without FTS5
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+                if cursor.fetchone():
+                    backend = "fts5"
+        backends[connection.alias] = backend
+    return backends[connection.alias]
+
+
+def match_documents(db, value):
+    """Return the lazy queryset of SearchDocument matching value, None without full-text index or word."""
+    backend = get_search_backend(connections[db])
+    if backend == "fts5":
+        query = fts5_query(value)
+        if not query:
+            return None
+        return SearchDocument.objects.using(db).filter(
+            id__in=RawSQL('SELECT rowid FROM "{0}" WHERE "{0}" MATCH %s'.format(FTS_TABLE), (query,)),
+        )
+    if backend == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchVector
+
+        vector = SearchVector("content", config=SEARCH_CONFIG)
+        query = SearchQuery(value, config=SEARCH_CONFIG, search_type="websearch")
+        return SearchDocument.objects.using(db).annotate(vector=vector).filter(vector=query)
+    return None
+
+
+def rank_documents(db, value, limit):
+    """
+    Return the (model name, object id) of the limit best matches of value.
+
+    The engine ranks the matches (bm25 or ts_rank) and stops at limit: a
+    single index query whatever the number of models. Return None without
+    full-text index or word.
+    """
+    backend = get_search_backend(connections[db])
+    if backend == "fts5":
+        query = fts5_query(value)
+        if not query:
+            return None
+        sql = (
+            'SELECT "search_documents"."model", "search_documents"."object_id" FROM "{0}" '
+            'INNER JOIN "search_documents" ON ("search_documents"."id" = "{0}"."rowid") '
+            'WHERE "{0}" MATCH %s'.format(FTS_TABLE)
+        )
+        sql += ' ORDER BY "{0}"."rank" LIMIT %s'.format(FTS_TABLE)
+        params = [query, limit]
+        object_id = SearchDocument._meta.get_field("object_id")
+        with connections[db].cursor() as cursor:
+            cursor.execute(sql, params)
+            return [(row[0], object_id.to_python(row[1])) for row in cursor.fetchall()]
+    if backend == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        documents = match_documents(db, value)
+        vector = SearchVector("content", config=SEARCH_CONFIG)
+        query = SearchQuery(value, config=SEARCH_CONFIG, search_type="websearch")
+        return list(
+            documents.annotate(rank=SearchRank(vector, query))
+            .order_by("-rank")
+            .values_list("model", "object_id")[:limit]
+        )
+    return None
+
+
+class FTS5Rank(Expression):
+    """bm25 rank of the search document of an object (lower is better), NULL if not matching."""
+
+    output_field = FloatField()
+
+    def __init__(self, query, pk="pk"):
+        """Create the rank expression of an FTS5 query for the object with the given primary key."""
+        super().__init__()
+        self.query = query
+        self.pk = F(pk)
+
+    def get_source_expressions(self):
+        """Return the primary key expression, resolved against the outer query."""
+        return [self.pk]
+
+    def set_source_expressions(self, exprs):
+        """Set the resolved primary key expression."""
+        (self.pk,) = exprs
+
+    def as_sql(self, compiler, connection):
+        """Return a scalar subquery seeking the document by object_id, then the index by rowid."""
+        pk_sql, pk_params = compiler.compile(self.pk)
+        sql = (
+            '(SELECT "{0}"."rank" FROM "{0}" WHERE "{0}" MATCH %s AND "{0}"."rowid" = '
+            '(SELECT "search_documents"."id" FROM "search_documents" WHERE "search_documents"."object_id" = {1}))'
+        ).format(FTS_TABLE, pk_sql)
+        return sql, (self.query, *pk_params)
+
+
+def rank_expression(db, value):
+    """
+    Return the lazy expression ranking matches of value, best first in ascending order.
+
+    The engine rank (bm25 or negated ts_rank) of the document of each object
+    is read by a correlated subquery, so ranking happens in the query the
+    paginator runs. Return None without full-text index or word.
+    """
+    backend = get_search_backend(connections[db])
+    if backend == "fts5":
+        query = fts5_query(value)
+        return FTS5Rank(query) if query else None
+    if backend == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        vector = SearchVector("content", config=SEARCH_CONFIG)
+        query = SearchQuery(value, config=SEARCH_CONFIG, search_type="websearch")
+        documents = SearchDocument.objects.using(db).filter(object_id=OuterRef("pk"))
+        return Subquery(documents.annotate(rank=SearchRank(vector, query) * -1).values("rank")[:1])
+    return None
+
+
+def search(queryset, value):
+    """
+    Return the objects of queryset matching value, best matches first.
+
+    The match is a lazy subquery on the full-text index, so the result
+    composes with other filters and subqueries like any queryset, and the
+    engine ranks matches (bm25 or ts_rank) in the same query. Nothing runs
+    until the queryset is evaluated. Return None without full-text index or
+    searchable word: callers fall back to a substring search.
+    """
+    db = queryset.db
+    documents = match_documents(db, value)
+    if documents is None:
+        return None
+    rank = rank_expression(db, value)
+    queryset = queryset.filter(pk__in=documents.values("object_id")).alias(search_rank=rank)
+    return queryset.order_by("search_rank", *queryset.model._meta.ordering)
+
+
+#############################################################################
+# Global search
+#############################################################################
+
+
+def refang(value):
+    """Return a defanged observable (hxxp://evil[.]com) in its usable form."""
+    value = value.strip().replace("[.]", ".").replace("(.)", ".").replace("[:]", ":")
+    return re.sub(r"^hxxp", "http", value, flags=re.IGNORECASE)
+
+
+def detect_observable(value):
+    """
+    Return (type, normalized value) of a pasted observable.
+
+    The type is "ip", "network", "hash", "cve", "fqdn" or "text". URLs are
+    reduced to their host, so a pasted URL is looked up as an IP or a FQDN.
+    """
+    value = refang(value)
+    if "://" in value:
+        hostname = urlsplit(value).hostname
+        if hostname:
+            value = hostname
+    try:
+        return "ip", str(ipaddress.ip_address(value))
+    except ValueError:
+        pass
+    if "/" in value:
+        try:
+            return "network", str(ipaddress.ip_network(value, strict=False))
+        except ValueError:
+            pass
+    try:
+        hash_digest(value)
+        return "hash", value.lower()
+    except ValueError:
+        pass
+    if CVE_RE.match(value):
+        return "cve", value.upper()
+    if FQDN_RE.match(value):
+        return "fqdn", value.lower().rstrip(".")
+    return "text", value
+
+
+def observable_querysets(observable, value):
+    """Return the querysets of the indexed lookups of an observable, none for text."""
+    if observable == "ip":
+        key = ip_key(value)
+        return [IpAdd.objects.filter(ip_overlap_q(key, key))]
+    if observable == "network":
+        # Addresses, networks and ranges overlapping the network
+        return [IpAdd.objects.filter(ip_overlap_q(*ip_network_keys(value)))]
+    if observable == "hash":
+        algorithm, digest = hash_digest(value)
+        return [Hash.objects.filter(digests__algorithm=algorithm, digests__digest=digest)]
+    if observable == "cve":
+        return [Vuln.objects.filter(cve__in=[value, value.lower()])]
+    if observable == "fqdn":
+        # The FQDNs covering the name, and the name subdomains (reversed-label range scan)
+        prefix = reverse_fqdn(value)
+        return [
+            FQDN.objects.filter(
+                Q(fqdn_reversed__in=fqdn_covering_keys(value))
+                | Q(fqdn_reversed__gte=prefix + ".", fqdn_reversed__lt=prefix + "/")
+            )
+        ]
+    return []
+
+
+def substring_querysets(value):
+    """Return the icontains querysets over the search fields of all models (no full-text index)."""
+    return [
+        model.objects.filter(reduce(or_, (Q(**{field + "__icontains": value}) for field in model.search_fields)))
+        for model in SEARCH_MODELS
+    ]
+
+
+def merge_querysets(querysets, limit):
+    """Return the (model name, pk) of the limit newest objects of querysets, in a single UNION ALL query."""
+    parts = [
+        queryset.order_by()
+        .annotate(model_name=Value(queryset.model._meta.model_name, output_field=CharField()))
+        .values_list("model_name", "pk", "created_at")
+        for queryset in querysets
+    ]
+    if not parts:
+        return []
+    merged = parts[0].union(*parts[1:], all=True) if len(parts) > 1 else parts[0]
+    return [(name, pk) for name, pk, _ in merged.order_by("-created_at")[:limit]]
+
+
+def fetch_objects(hits):
+    """Return the objects of a list of (model name, pk), in order, with one query per model."""
+    pks = {}
+    for name, pk in hits:
+        pks.setdefault(name, []).append(pk)
+    objs = {}
+    for model in SEARCH_MODELS:
+        name = model._meta.model_name
+        if name not in pks:
+            continue
+        related = ("author",) if model is Event else ("author", "event")
+        queryset = model.objects.filter(pk__in=pks[name]).select_related(*related).prefetch_related("contributors")
+        for obj in queryset:
+            objs[(name, obj.pk)] = obj
+    # Documents of objects deleted in the meantime are skipped
+    return [(name, objs[(name, pk)]) for name, pk in hits if (name, pk) in objs]
+
+
+def global_search(value, limit):
+    """
+    Return (observable type, full-text used, [(model name, object)]) for a pasted observable.
+
+    Typed observables are looked up through their own index (IP ranges,
+    reversed FQDN labels, hash digests, CVE), all in one UNION ALL query,
+    newest first. Free text, and typed observables without a typed match, go
+    through a single ranked query on the full-text index of all models, or
+    icontains scans without full-text index.
+    """
+    observable, value = detect_observable(value)
+    hits = merge_querysets(observable_querysets(observable, value), limit)
+    fulltext = not hits
+    if fulltext:
+        hits = rank_documents(DEFAULT_DB_ALIAS, value, limit)
+        if hits is None:
+            hits = merge_querysets(substring_querysets(value), limit)
+    return observable, fulltext, fetch_objects(hits)
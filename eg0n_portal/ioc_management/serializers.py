@@ -1,7 +1,121 @@
 """Serializers for IoC Management app."""
 
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import serializers
-from ioc_management.models import CodeSnippet, Event, FQDN, Hash, IpAdd, Vuln
+from rest_framework.settings import api_settings
+from ioc_management.models import CodeSnippet, Event, FQDN, Hash, IpAdd, Vuln, bulk_create, hash_digest
+
+
+#############################################################################
+# Generic Bulk Operations
+#############################################################################
+
+
+class BulkSelectionSerializer(serializers.Serializer):
+    """Serializer for bulk requests selecting objects by ids or by filter (FilterSet parameters)."""
+
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        allow_empty=False,
+        max_length=settings.IOC_BULK_MAX_ITEMS,
+        required=False,
+    )
+    filter = serializers.DictField(allow_empty=False, required=False)
+
+    def validate(self, attrs):
+        """Verify exactly one of ids and filter is set."""
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError("Select objects with either ids or filter.")
+        return attrs
+
+
+class BulkUpdateSerializer(BulkSelectionSerializer):
+    """Serializer for bulk update requests."""
+
+    data = serializers.DictField(allow_empty=False)
+
+
+#############################################################################
+# Generic Attribute
+#############################################################################
+
+
+class BulkRelatedField(serializers.PrimaryKeyRelatedField):
+    """Related field resolving primary keys from objects fetched once for a whole list."""
+
+    def __init__(self, objects, **kwargs):
+        """Create the field, objects mapping primary keys to related objects."""
+        self.objects = objects
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        """Return the related object of a primary key."""
+        try:
+            pk = self.get_queryset().model._meta.pk.to_python(data)
+        except (DjangoValidationError, TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if pk not in self.objects:
+            self.fail("does_not_exist", pk_value=data)
+        return self.objects[pk]
+
+
+class AttributeListSerializer(serializers.ListSerializer):
+    """
+    List serializer creating attributes in bulk.
+
+    Invalid items do not abort the list: their errors are kept in item_errors
+    (index -> errors) and only valid items are inserted, with bulk_create()
+    in batches. Related objects are fetched with one query for the list.
+    """
+
+    def prefetch_related_fields(self, data):
+        """Replace the related fields of the child with fields resolving prefetched objects."""
+        for name, field in list(self.child.fields.items()):
+            if field.read_only or not isinstance(field, serializers.PrimaryKeyRelatedField):
+                continue
+            pks = set()
+            for item in data:
+                try:
+                    pks.add(field.get_queryset().model._meta.pk.to_python(item.get(name)))
+                except (AttributeError, DjangoValidationError, TypeError, ValueError):
+                    continue
+            pks.discard(None)
+            self.child.fields[name] = BulkRelatedField(
+                field.get_queryset().in_bulk(pks),
+                queryset=field.get_queryset(),
+                allow_null=field.allow_null,
+                required=field.required,
+            )
+
+    def to_internal_value(self, data):
+        """Return the validated data of the valid items, keeping errors of the invalid ones."""
+        if not isinstance(data, list):
+            message = self.error_messages["not_a_list"].format(input_type=type(data).__name__)
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code="not_a_list")
+        if not self.allow_empty and not data:
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [self.error_messages["empty"]]}, code="empty")
+        if self.max_length is not None and len(data) > self.max_length:
+            message = self.error_messages["max_length"].format(max_length=self.max_length)
+            raise serializers.ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [message]}, code="max_length")
+
+        self.prefetch_related_fields(data)
+        self.item_errors = {}
+        self.item_indexes = []
+        validated = []
+        for index, item in enumerate(data):
+            try:
+                validated.append(self.run_child_validation(item))
+            except serializers.ValidationError as exc:
+                self.item_errors[index] = exc.detail
+            else:
+                self.item_indexes.append(index)
+        return validated
+
+    def create(self, validated_data):
+        """Insert the valid items in batches."""
+        model = self.child.Meta.model
+        return bulk_create(model, [model(**attrs) for attrs in validated_data], batch_size=settings.IOC_BULK_BATCH_SIZE)
 
 
 #############################################################################
@@ -23,6 +137,14 @@ class EventSerializer(serializers.ModelSerializer):
         )
 
 
+class RelatedEventsQuerySerializer(serializers.Serializer):
+    """Serializer for related events requests."""
+
+    limit = serializers.IntegerField(
+        min_value=1, max_value=settings.IOC_RELATED_EVENTS_MAX_ITEMS, default=settings.IOC_RELATED_EVENTS_PAGE_SIZE,
+    )
+
+
 #############################################################################
 # CodeSnippet
 #############################################################################
@@ -36,6 +158,7 @@ class CodeSnippetSerializer(serializers.ModelSerializer):
 
         model = CodeSnippet
         fields = "__all__"
+        list_serializer_class = AttributeListSerializer
         read_only_fields = (
             "id",
             "author",
@@ -58,6 +181,7 @@ class FQDNSerializer(serializers.ModelSerializer):
 
         model = FQDN
         fields = "__all__"
+        list_serializer_class = AttributeListSerializer
         read_only_fields = (
             "id",
             "author",
@@ -80,6 +204,7 @@ class HashSerializer(serializers.ModelSerializer):
 
         model = Hash
         fields = "__all__"
+        list_serializer_class = AttributeListSerializer
         read_only_fields = (
             "id",
             "author",
@@ -89,6 +214,30 @@ class HashSerializer(serializers.ModelSerializer):
         )
 
 
+class HashLookupSerializer(serializers.Serializer):
+    """Serializer for Hash lookup requests."""
+
+    digests = serializers.ListField(
+        child=serializers.CharField(max_length=64),
+        allow_empty=False,
+        max_length=settings.IOC_MATCH_MAX_ITEMS,
+    )
+
+    def validate_digests(self, value):
+        """Verify each value is a MD5, SHA1 or SHA256 hex digest."""
+        invalid = []
+        for digest in value:
+            try:
+                hash_digest(digest)
+            except ValueError:
+                invalid.append(digest)
+        if invalid:
+            raise serializers.ValidationError(
+                "Not a MD5, SHA1 or SHA256 digest: {}".format(", ".join(invalid[:10]))
+            )
+        return value
+
+
 #############################################################################
 # IpAdd
 #############################################################################
@@ -102,6 +251,7 @@ class IpAddSerializer(serializers.ModelSerializer):
 
         model = IpAdd
         fields = "__all__"
+        list_serializer_class = AttributeListSerializer
         read_only_fields = (
             "id",
             "author",
@@ -110,6 +260,19 @@ class IpAddSerializer(serializers.ModelSerializer):
             "updated_at",
         )
 
+    def validate(self, attrs):
+        """Validate CIDR and range attributes."""
+        attrs = super().validate(attrs)
+        obj = IpAdd(**{
+            field: attrs.get(field, getattr(self.instance, field, None))
+            for field in ("ip_address", "prefix_length", "ip_address_end")
+        })
+        try:
+            obj.clean()
+        except DjangoValidationError as exc:
+            raise serializers.ValidationError(serializers.as_serializer_error(exc))
+        return attrs
+
 
 #############################################################################
 # Vuln
@@ -124,6 +287,7 @@ class VulnSerializer(serializers.ModelSerializer):
 
         model = Vuln
         fields = "__all__"
+        list_serializer_class = AttributeListSerializer
         read_only_fields = (
             "id",
             "author",
@@ -131,3 +295,56 @@ class VulnSerializer(serializers.ModelSerializer):
             "created_at",
             "updated_at",
         )
+
+
+#############################################################################
+# Match
+#############################################################################
+
+
+class IpAddMatchSerializer(serializers.Serializer):
+    """Serializer for bulk IpAdd match requests."""
+
+    addresses = serializers.ListField(
+        child=serializers.IPAddressField(),
+        allow_empty=False,
+        max_length=settings.IOC_MATCH_MAX_ITEMS,
+    )
+
+
+class FQDNMatchSerializer(serializers.Serializer):
+    """Serializer for bulk FQDN match requests."""
+
+    fqdns = serializers.ListField(
+        child=serializers.CharField(max_length=253),
+        allow_empty=False,
+        max_length=settings.IOC_MATCH_MAX_ITEMS,
+    )
+
+
+#############################################################################
+# Search
+#############################################################################
+
+
+class GlobalSearchQuerySerializer(serializers.Serializer):
+    """Serializer for global search requests."""
+
+    q = serializers.CharField(max_length=2048, trim_whitespace=True)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=settings.IOC_SEARCH_MAX_ITEMS, default=settings.IOC_SEARCH_PAGE_SIZE,
+    )
+
+
+#############################################################################
+# Change
+#############################################################################
+
+
+class ChangeQuerySerializer(serializers.Serializer):
+    """Serializer for change log requests."""
+
+    since = serializers.IntegerField(min_value=0, default=0)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=settings.IOC_CHANGES_MAX_ITEMS, default=settings.IOC_CHANGES_PAGE_SIZE,
+    )
@@ -0,0 +1,196 @@
+"""Signal handlers for IoC Management app."""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+from ioc_management import correlations, search
+from ioc_management.duplicates import DUPLICATE_MODELS, add_objects, remove_objects, sync_object
+from ioc_management.matchers import fqdn_matcher, ipadd_matcher
+from ioc_management.models import Change, CodeSnippet, Event, FQDN, Hash, IpAdd, Vuln
+
+
+# Sent by bulk operations, which skip model signals. sender is the model,
+# object_ids the affected primary keys, action "upsert" or "delete", objects
+# the saved instances (if available) and created True for bulk_create().
+bulk_changed = Signal()
+
+
+#############################################################################
+# Change
+#############################################################################
+
+
+def object_saved(sender, instance, **kwargs):
+    """Log the create/update of an IoC object."""
+    Change.record(sender, [instance.pk])
+
+
+def object_deleted(sender, instance, **kwargs):
+    """Log the deletion of an IoC object as a tombstone."""
+    Change.record(sender, [instance.pk], action="delete")
+
+
+def objects_bulk_changed(sender, object_ids, action="upsert", **kwargs):
+    """Log the changes of a bulk operation."""
+    Change.record(sender, object_ids, action=action)
+
+
+for model in (CodeSnippet, Event, FQDN, Hash, IpAdd, Vuln):
+    post_save.connect(object_saved, sender=model, dispatch_uid=f"change_saved_{model._meta.model_name}")
+    post_delete.connect(object_deleted, sender=model, dispatch_uid=f"change_deleted_{model._meta.model_name}")
+    bulk_changed.connect(objects_bulk_changed, sender=model, dispatch_uid=f"change_bulk_{model._meta.model_name}")
+
+
+#############################################################################
+# Duplicates
+#############################################################################
+
+
+def duplicates_saved(sender, instance, **kwargs):
+    """Move a saved object to the duplicate groups of its values."""
+    sync_object(instance)
+
+
+def duplicates_deleted(sender, instance, **kwargs):
+    """Remove a deleted object from its duplicate groups."""
+    remove_objects(sender, [instance.pk])
+
+
+def duplicates_bulk_changed(sender, object_ids, action="upsert", objects=None, created=False, **kwargs):
+    """Update the duplicate groups after bulk operations."""
+    if action == "delete":
+        remove_objects(sender, object_ids)
+    elif created and objects is not None:
+        add_objects(sender, objects)
+    elif objects is not None:
+        for obj in objects:
+            sync_object(obj)
+    # Bulk updates without objects do not change duplicated fields
+
+
+for model in DUPLICATE_MODELS:
+    name = model._meta.model_name
+    post_save.connect(duplicates_saved, sender=model, dispatch_uid=f"duplicates_saved_{name}")
+    post_delete.connect(duplicates_deleted, sender=model, dispatch_uid=f"duplicates_deleted_{name}")
+    bulk_changed.connect(duplicates_bulk_changed, sender=model, dispatch_uid=f"duplicates_bulk_{name}")
+
+
+#############################################################################
+# Correlations
+#############################################################################
+
+
+def correlations_saved(sender, instance, **kwargs):
+    """Reindex the indicators of a saved attribute."""
+    correlations.sync_object(instance)
+
+
+def correlations_deleted(sender, instance, **kwargs):
+    """Remove the indicators of a deleted attribute."""
+    correlations.remove_objects([instance.pk])
+
+
+def correlations_bulk_changed(sender, object_ids, action="upsert", objects=None, created=False, **kwargs):
+    """Update the correlation index after bulk operations."""
+    if action == "delete":
+        correlations.remove_objects(object_ids)
+    elif created and objects is not None:
+        correlations.add_objects(objects)
+    elif objects is not None:
+        for obj in objects:
+            correlations.sync_object(obj)
+    # Bulk updates without objects change neither indicators nor events
+
+
+for model in correlations.CORRELATION_MODELS:
+    name = model._meta.model_name
+    post_save.connect(correlations_saved, sender=model, dispatch_uid=f"correlations_saved_{name}")
+    post_delete.connect(correlations_deleted, sender=model, dispatch_uid=f"correlations_deleted_{name}")
+    bulk_changed.connect(correlations_bulk_changed, sender=model, dispatch_uid=f"correlations_bulk_{name}")
+
+
+#############################################################################
+# Search
+#############################################################################
+
+
+def search_saved(sender, instance, **kwargs):
+    """Reindex the searchable text of a saved object."""
+    search.sync_object(instance)
+
+
+def search_deleted(sender, instance, **kwargs):
+    """Remove a deleted object from the search index."""
+    search.remove_objects([instance.pk])
+
+
+def search_bulk_changed(sender, object_ids, action="upsert", objects=None, created=False, **kwargs):
+    """Update the search index after bulk operations."""
+    if action == "delete":
+        search.remove_objects(object_ids)
+    elif created and objects is not None:
+        search.add_objects(objects)
+    elif objects is not None:
+        for obj in objects:
+            search.sync_object(obj)
+    # Bulk updates without objects do not change search fields
+
+
+for model in search.SEARCH_MODELS:
+    name = model._meta.model_name
+    post_save.connect(search_saved, sender=model, dispatch_uid=f"search_saved_{name}")
+    post_delete.connect(search_deleted, sender=model, dispatch_uid=f"search_deleted_{name}")
+    bulk_changed.connect(search_bulk_changed, sender=model, dispatch_uid=f"search_bulk_{name}")
+
+
+#############################################################################
+# FQDN
+#############################################################################
+
+
+@receiver(post_save, sender=FQDN)
+def fqdn_saved(sender, instance, created, **kwargs):
+    """Keep the in-memory FQDN matcher in sync on create/update."""
+    fqdn_matcher.update(instance, created=created)
+
+
+@receiver(post_delete, sender=FQDN)
+def fqdn_deleted(sender, instance, **kwargs):
+    """Keep the in-memory FQDN matcher in sync on delete."""
+    fqdn_matcher.discard(instance)
+
+
+@receiver(bulk_changed, sender=FQDN)
+def fqdn_bulk_changed(sender, objects=None, created=False, **kwargs):
+    """Keep the in-memory FQDN matcher in sync after bulk operations."""
+    if objects is None:
+        fqdn_matcher.invalidate()
+        return
+    for obj in objects:
+        fqdn_matcher.update(obj, created=created)
+
+
+#############################################################################
+# IpAdd
+#############################################################################
+
+
+@receiver(post_save, sender=IpAdd)
+def ipadd_saved(sender, instance, created, **kwargs):
+    """Keep the in-memory IP matcher in sync on create/update."""
+    ipadd_matcher.update(instance, created=created)
+
+
+@receiver(post_delete, sender=IpAdd)
+def ipadd_deleted(sender, instance, **kwargs):
+    """Keep the in-memory IP matcher in sync on delete."""
+    ipadd_matcher.discard(instance)
+
+
+@receiver(bulk_changed, sender=IpAdd)
+def ipadd_bulk_changed(sender, objects=None, created=False, **kwargs):
+    """Keep the in-memory IP matcher in sync after bulk operations."""
+    if objects is None:
+        ipadd_matcher.invalidate()
+        return
+    for obj in objects:
+        ipadd_matcher.update(obj, created=created)
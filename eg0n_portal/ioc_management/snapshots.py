@@ -0,0 +1,311 @@
+"""Probabilistic filter snapshots for IoC Management app."""
+
+import hashlib
+import json
+import math
+import os
+import struct
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from ioc_management.files import atomic_write, file_lock, table_validator
+from ioc_management.models import FQDN, Hash, IpAdd, fqdn_labels, hash_digest, ip_networks
+
+
+#############################################################################
+# Bloom filter
+#############################################################################
+
+
+class BloomFilter:
+    """
+    Bloom filter with blake2b double hashing.
+
+    The k bit positions of a value are (h1 + i * h2) % bits for i in 0..k-1,
+    h1 and h2 being the two little-endian uint64 halves of the 16 bytes
+    blake2b digest of the UTF-8 value. Bit n is bit (n % 8) of byte (n // 8).
+
+    The serialized form is a fixed header (see HEADER) followed by the bit
+    array, so sensors can implement the lookup in a few lines of any language.
+    """
+
+    MAGIC = b"EG0NBLM1"
+    HEADER = struct.Struct("<8sQQQBQ")  # magic, version, capacity, bits, hashes, count
+
+    def __init__(self, capacity, error_rate, version=1):
+        """Create an empty filter sized for capacity values at the given false positive rate."""
+        capacity = max(int(capacity), 1)
+        bits = max(64, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.version = version
+        self.capacity = capacity
+        self.bits = bits
+        self.hashes = max(1, round(bits / capacity * math.log(2)))
+        self.count = 0
+        self.data = bytearray((bits + 7) // 8)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Return the filter serialized by to_bytes()."""
+        magic, version, capacity, bits, hashes, count = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError("Not a Bloom filter snapshot")
+        bloom = cls.__new__(cls)
+        bloom.version = version
+        bloom.capacity = capacity
+        bloom.bits = bits
+        bloom.hashes = hashes
+        bloom.count = count
+        bloom.data = bytearray(data[cls.HEADER.size:])
+        return bloom
+
+    def to_bytes(self):
+        """Return the serialized filter."""
+        header = self.HEADER.pack(self.MAGIC, self.version, self.capacity, self.bits, self.hashes, self.count)
+        return header + bytes(self.data)
+
+    def positions(self, value):
+        """Return the bit positions of a value."""
+        h1, h2 = struct.unpack("<QQ", hashlib.blake2b(value.encode(), digest_size=16).digest())
+        return [(h1 + i * h2) % self.bits for i in range(self.hashes)]
+
+    def add(self, value):
+        """
+        Add a value to the filter, return False if it was (probably) already present.
+
+        count only counts values setting a new bit: adding again the value of
+        an updated row does not inflate it.
+        """
+        added = False
+        for position in self.positions(value):
+            mask = 1 << (position & 7)
+            if not self.data[position >> 3] & mask:
+                self.data[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, value):
+        """Return True if the value may be in the filter, False if it is certainly not."""
+        return all(self.data[position >> 3] & (1 << (position & 7)) for position in self.positions(value))
+
+
+#############################################################################
+# Indicator keys
+#############################################################################
+
+
+def active_q():
+    """Return the Q object selecting indicators sensors should act on."""
+    return Q(expired_at__gt=timezone.localdate()) & ~Q(validation_status="suspended")
+
+
+def fqdn_keys(record):
+    """
+    Return the filter keys of a FQDN record.
+
+    Names are lowercased without the trailing dot, e.g. "fqdn:evil.com" or
+    "fqdn:*.evil.com": sensors probe the queried name, then each parent
+    domain both as is and as wildcard.
+    """
+    labels = fqdn_labels(record["fqdn"])
+    return ["fqdn:" + ".".join(reversed(labels))] if labels else []
+
+
+def hash_keys(record):
+    """Return the filter keys of a Hash record, e.g. "hash:<lowercase hex digest>"."""
+    keys = []
+    for field in ("md5", "sha1", "sha256"):
+        try:
+            algorithm, digest = hash_digest(record[field] or "")
+        except ValueError:
+            continue
+        if algorithm == field:
+            keys.append("hash:" + digest.hex())
+    return keys
+
+
+def ipadd_keys(record):
+    """
+    Return the filter keys of an IpAdd record.
+
+    Addresses, CIDRs and ranges are stored as the CIDR networks they cover,
+    e.g. "ip:192.0.2.1/32" or "ip:2001:db8::/32": sensors probe the queried
+    address masked with each prefix length listed in the snapshot metadata.
+    """
+    try:
+        networks = ip_networks(record["ip_address"], record["prefix_length"], record["ip_address_end"])
+    except ValueError:
+        return []
+    return ["ip:" + network.with_prefixlen for network in networks]
+
+
+# model -> (fields, key function)
+SNAPSHOT_MODELS = {
+    FQDN: (("fqdn",), fqdn_keys),
+    Hash: (("md5", "sha1", "sha256"), hash_keys),
+    IpAdd: (("ip_address", "prefix_length", "ip_address_end"), ipadd_keys),
+}
+
+
+#############################################################################
+# Snapshot
+#############################################################################
+
+
+def get_snapshot_paths():
+    """Return the (filter, metadata) paths of the current snapshot."""
+    directory = str(settings.IOC_SNAPSHOT_DIR)
+    return os.path.join(directory, "ioc-filter.bin"), os.path.join(directory, "ioc-filter.json")
+
+
+def get_watermark():
+    """Return a cheap value changing whenever a snapshot model table changes."""
+    return {model._meta.model_name: table_validator(model.objects.all()) for model in SNAPSHOT_MODELS}
+
+
+def load_snapshot():
+    """Return the (filter, metadata) of the current snapshot, (None, None) if missing."""
+    filter_path, metadata_path = get_snapshot_paths()
+    try:
+        with open(metadata_path) as fd:
+            metadata = json.load(fd)
+        with open(filter_path, "rb") as fd:
+            bloom = BloomFilter.from_bytes(fd.read())
+    except (OSError, ValueError):
+        return None, None
+    if bloom.version != metadata.get("version"):
+        return None, None
+    return bloom, metadata
+
+
+def write_snapshot(bloom, metadata):
+    """Atomically replace the current snapshot (only the metadata if bloom is None)."""
+    filter_path, metadata_path = get_snapshot_paths()
+    files = []
+    if bloom is not None:
+        data = bloom.to_bytes()
+        metadata["size"] = len(data)
+        metadata["sha256"] = hashlib.sha256(data).hexdigest()
+        files.append((filter_path, data, "wb"))
+    files.append((metadata_path, json.dumps(metadata), "w"))
+    for path, content, mode in files:
+        with atomic_write(path, mode) as fd:
+            fd.write(content)
+
+
+def build_snapshot(full=False, rebuild=True):
+    """
+    Build or update the filter snapshot, return its metadata.
+
+    Bloom filters cannot forget values, but deleted or expired entries only
+    add false positives since sensors confirm positives with the match API.
+    Updates are therefore incremental: rows with updated_at past the previous
+    scan, minus IOC_SNAPSHOT_RESCAN seconds, are added to the filter. The
+    margin catches rows committed after a scan with an earlier updated_at;
+    adding present values again is harmless. A full rebuild is due on the
+    first build of each day (to drop deleted and expired entries), when the
+    false positive rate setting changed, or when the filter reached its
+    capacity. With rebuild=False (API polls), due rebuilds are left to the
+    build_snapshot command and only new values are added meanwhile.
+
+    The snapshot directory lock serializes builds of all processes.
+    """
+    with file_lock(str(settings.IOC_SNAPSHOT_DIR)):
+        return update_snapshot(full, rebuild)
+
+
+def is_rebuild_due(metadata):
+    """Return True if a snapshot should be rebuilt from scratch."""
+    return (
+        metadata["built_on"] != timezone.localdate().isoformat()
+        or metadata["error_rate"] != settings.IOC_SNAPSHOT_ERROR_RATE
+        or metadata["count"] > metadata["capacity"]
+    )
+
+
+def is_settled(metadata):
+    """
+    Return True if the last scan saw every row counted in the metadata watermark.
+
+    Rows commit at most IOC_SNAPSHOT_RESCAN seconds after their updated_at:
+    once a scan started that long after the latest updated_at, a late update
+    (not moving the watermark) cannot be missing from the filter.
+    """
+    updated_at = max((updated_at for _, updated_at in metadata["watermark"].values() if updated_at), default=None)
+    if updated_at is None:
+        return True
+    margin = timedelta(seconds=settings.IOC_SNAPSHOT_RESCAN)
+    return datetime.fromisoformat(metadata["scanned_at"]) >= datetime.fromisoformat(updated_at) + margin
+
+
+def update_snapshot(full, rebuild):
+    """Build or update the filter snapshot, the directory lock being held."""
+    scanned_at = timezone.now()
+    watermark = get_watermark()
+    bloom, metadata = load_snapshot()
+
+    since = None
+    if full or not metadata or "scanned_at" not in metadata or (rebuild and is_rebuild_due(metadata)):
+        bloom = None
+    elif metadata["watermark"] == watermark and is_settled(metadata):
+        # Nothing changed
+        return metadata
+    else:
+        since = datetime.fromisoformat(metadata["scanned_at"]) - timedelta(seconds=settings.IOC_SNAPSHOT_RESCAN)
+
+    querysets = []
+    for model, (fields, keys) in SNAPSHOT_MODELS.items():
+        qs = model.objects.filter(active_q())
+        if since:
+            qs = qs.filter(updated_at__gt=since)
+        querysets.append((qs.values(*fields), keys))
+
+    if bloom is None:
+        # Size the filter with headroom for incremental updates
+        count = sum(qs.count() for qs, _ in querysets)
+        bloom = BloomFilter(count * settings.IOC_SNAPSHOT_HEADROOM + 1000, settings.IOC_SNAPSHOT_ERROR_RATE)
+        prefixes = {"ipv4": set(), "ipv6": set()}
+    else:
+        prefixes = {version: set(lengths) for version, lengths in metadata["prefixes"].items()}
+    count = bloom.count
+
+    for qs, keys in querysets:
+        for record in qs.iterator(chunk_size=2000):
+            for key in keys(record):
+                bloom.add(key)
+                if key.startswith("ip:"):
+                    network, length = key[3:].rsplit("/", 1)
+                    prefixes["ipv6" if ":" in network else "ipv4"].add(int(length))
+
+    if since is None:
+        built_on, error_rate = timezone.localdate().isoformat(), settings.IOC_SNAPSHOT_ERROR_RATE
+    else:
+        if bloom.count > bloom.capacity and rebuild:
+            return update_snapshot(True, rebuild)
+        if bloom.count == count:
+            # No new value: deletions, or updates of values already present
+            # (deleted values stay in the filter until the next full rebuild)
+            metadata["watermark"] = watermark
+            metadata["scanned_at"] = scanned_at.isoformat()
+            write_snapshot(None, metadata)
+            return metadata
+        built_on, error_rate = metadata["built_on"], metadata["error_rate"]
+
+    bloom.version = metadata["version"] + 1 if metadata else 1
+    metadata = {
+        "version": bloom.version,
+        "created_at": timezone.now().isoformat(),
+        "built_on": built_on,
+        "scanned_at": scanned_at.isoformat(),
+        "error_rate": error_rate,
+        "capacity": bloom.capacity,
+        "count": bloom.count,
+        "bits": bloom.bits,
+        "hashes": bloom.hashes,
+        "prefixes": {version: sorted(lengths) for version, lengths in prefixes.items()},
+        "watermark": watermark,
+    }
+    write_snapshot(bloom, metadata)
+    return metadata
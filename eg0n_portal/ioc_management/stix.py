@@ -0,0 +1,229 @@
+"""STIX 2.1 export for IoC Management app."""
+
+import json
+import uuid
+from datetime import datetime, time, timezone as dt_timezone
+from django.core.serializers.json import DjangoJSONEncoder
+from ioc_management.models import CodeSnippet, FQDN, Hash, IpAdd, Vuln, fqdn_labels, hash_digest, ip_networks
+
+
+STIX_CONFIDENCE = {"low": 15, "medium": 50, "high": 85}  # STIX 2.1 None/Low/Med/High scale
+STIX_HASHES = {"md5": "MD5", "sha1": "SHA-1", "sha256": "SHA-256"}
+STIX_MEDIA_TYPE = "application/stix+json;version=2.1"
+
+
+#############################################################################
+# Helpers
+#############################################################################
+
+
+def stix_timestamp(value, microseconds=False):
+    """Return a STIX timestamp (UTC, millisecond or microsecond precision) for a datetime or a date."""
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, time.min, tzinfo=dt_timezone.utc)
+    value = value.astimezone(dt_timezone.utc)
+    if microseconds:
+        return value.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+    return value.strftime("%Y-%m-%dT%H:%M:%S.") + "{:03d}Z".format(value.microsecond // 1000)
+
+
+def stix_string(value):
+    """Quote a value for a STIX pattern."""
+    return "'{}'".format(str(value).replace("\\", "\\\\").replace("'", "\\'"))
+
+
+def stix_indicator(record, name, pattern):
+    """Return a STIX indicator for an attribute record (dict with common attribute fields)."""
+    indicator = {
+        "type": "indicator",
+        "spec_version": "2.1",
+        "id": "indicator--{}".format(record["id"]),
+        "created": stix_timestamp(record["created_at"]),
+        "modified": stix_timestamp(record["updated_at"]),
+        "name": name,
+        "description": record["description"],
+        "indicator_types": ["malicious-activity"],
+        "pattern": pattern,
+        "pattern_type": "stix",
+        "valid_from": stix_timestamp(record["created_at"]),
+        "confidence": STIX_CONFIDENCE.get(record["confidence"], 0),
+        "labels": [record["validation_status"]],
+    }
+    if record["expired_at"] and stix_timestamp(record["expired_at"]) > indicator["valid_from"]:
+        indicator["valid_until"] = stix_timestamp(record["expired_at"])
+    return indicator
+
+
+#############################################################################
+# Converters
+#############################################################################
+
+
+INDICATOR_FIELDS = ("id", "event_id", "confidence", "description", "expired_at", "validation_status", "created_at", "updated_at")
+
+
+def stix_codesnippet(record):
+    """Return the STIX note of a CodeSnippet record."""
+    return {
+        "type": "note",
+        "spec_version": "2.1",
+        "id": "note--{}".format(record["id"]),
+        "created": stix_timestamp(record["created_at"]),
+        "modified": stix_timestamp(record["updated_at"]),
+        "abstract": record["name"],
+        "content": record["code"],
+        "object_refs": ["report--{}".format(record["event_id"])],
+        "confidence": STIX_CONFIDENCE.get(record["confidence"], 0),
+        "labels": [record["validation_status"]],
+        "x_eg0n_language": record["language"],
+        "x_eg0n_description": record["description"],
+    }
+
+
+def stix_fqdn(record):
+    """Return the STIX indicator of a FQDN record, "*.domain" matching subdomains only."""
+    name = ".".join(reversed(fqdn_labels(record["fqdn"])))
+    if name.startswith("*."):
+        pattern = "[domain-name:value LIKE {}]".format(stix_string("%" + name[1:]))
+    else:
+        pattern = "[domain-name:value = {}]".format(stix_string(name))
+    return stix_indicator(record, name, pattern)
+
+
+def stix_hash(record):
+    """Return the STIX indicator of a Hash record, matching any of its digests."""
+    comparisons = []
+    for field, algorithm in STIX_HASHES.items():
+        try:
+            detected, digest = hash_digest(record[field] or "")
+        except ValueError:
+            continue
+        if detected == field:
+            comparisons.append("file:hashes.{} = {}".format(stix_string(algorithm), stix_string(digest.hex())))
+    if not comparisons:
+        return None
+    name = record["filename"] or record["sha256"] or record["sha1"] or record["md5"]
+    return stix_indicator(record, name, "[{}]".format(" OR ".join(comparisons)))
+
+
+def stix_ipadd(record):
+    """Return the STIX indicator of an IpAdd record, ranges being split into CIDR networks."""
+    try:
+        networks = ip_networks(record["ip_address"], record["prefix_length"], record["ip_address_end"])
+    except ValueError:
+        return None
+    comparisons = [
+        "ipv{}-addr:value = {}".format(network.version, stix_string(network.with_prefixlen)) for network in networks
+    ]
+    if record["ip_address_end"]:
+        name = "{}-{}".format(record["ip_address"], record["ip_address_end"])
+    elif record["prefix_length"] is not None:
+        name = "{}/{}".format(record["ip_address"], record["prefix_length"])
+    else:
+        name = record["ip_address"]
+    return stix_indicator(record, name, "[{}]".format(" OR ".join(comparisons)))
+
+
+def stix_vuln(record):
+    """Return the STIX vulnerability of a Vuln record."""
+    return {
+        "type": "vulnerability",
+        "spec_version": "2.1",
+        "id": "vulnerability--{}".format(record["id"]),
+        "created": stix_timestamp(record["created_at"]),
+        "modified": stix_timestamp(record["updated_at"]),
+        "name": record["cve"],
+        "description": record["description"],
+        "external_references": [{"source_name": "cve", "external_id": record["cve"]}],
+        "x_eg0n_cvss": record["cvss"],
+        "x_eg0n_title": record["name"],
+    }
+
+
+# model -> STIX type
+STIX_TYPES = {
+    CodeSnippet: "note",
+    FQDN: "indicator",
+    Hash: "indicator",
+    IpAdd: "indicator",
+    Vuln: "vulnerability",
+}
+
+# model -> (values() fields, converter)
+STIX_MODELS = {
+    CodeSnippet: (
+        ("id", "event_id", "code", "confidence", "description", "language", "name", "validation_status", "created_at", "updated_at"),
+        stix_codesnippet,
+    ),
+    FQDN: (INDICATOR_FIELDS + ("fqdn",), stix_fqdn),
+    Hash: (INDICATOR_FIELDS + ("filename", "md5", "sha1", "sha256"), stix_hash),
+    IpAdd: (INDICATOR_FIELDS + ("ip_address", "prefix_length", "ip_address_end"), stix_ipadd),
+    Vuln: (("id", "event_id", "cve", "cvss", "description", "name", "created_at", "updated_at"), stix_vuln),
+}
+
+
+#############################################################################
+# Bundle
+#############################################################################
+
+
+def iter_objects(model, queryset, chunk_size=2000):
+    """Yield the STIX objects of a queryset of model, fetching rows by chunks."""
+    fields, converter = STIX_MODELS[model]
+    for record in queryset.order_by().values(*fields).iterator(chunk_size=chunk_size):
+        obj = converter(record)
+        if obj is not None:
+            yield obj
+
+
+def iter_report(event, chunk_size=2000):
+    """
+    Yield the JSON text of the report of an event.
+
+    object_refs are streamed from the objects of the attributes, converted
+    again: memory usage does not depend on the number of attributes, and
+    attributes the converters skip (invalid hashes or addresses) are not
+    referred to.
+    """
+    report = {
+        "type": "report",
+        "spec_version": "2.1",
+        "id": "report--{}".format(event.pk),
+        "created": stix_timestamp(event.created_at),
+        "modified": stix_timestamp(event.updated_at),
+        "name": event.name,
+        "description": event.description,
+        "report_types": ["threat-report"],
+        "published": stix_timestamp(event.updated_at),
+    }
+    # Write the report without its closing brace, then append object_refs
+    yield json.dumps(report)[:-1] + ', "object_refs": ['
+    separator = ""
+    for model in STIX_MODELS:
+        for obj in iter_objects(model, model.objects.filter(event_id=event.pk), chunk_size):
+            yield separator + json.dumps(obj["id"])
+            separator = ", "
+    if not separator:
+        # object_refs cannot be empty: an event without attributes refers to itself
+        yield json.dumps(report["id"])
+    yield "]}"
+
+
+def iter_event_objects(event, chunk_size=2000):
+    """Yield the STIX objects of an event (attributes, then the report) as JSON text fragments."""
+    for model in STIX_MODELS:
+        for obj in iter_objects(model, model.objects.filter(event_id=event.pk), chunk_size):
+            yield [json.dumps(obj, cls=DjangoJSONEncoder)]
+    yield iter_report(event, chunk_size)
+
+
+def iter_bundle(events, chunk_size=2000):
+    """Yield the JSON text of a STIX 2.1 bundle of the events in the given queryset, chunk by chunk."""
+    yield '{{"type": "bundle", "id": "bundle--{}", "objects": ['.format(uuid.uuid4())
+    separator = ""
+    for event in events.iterator(chunk_size=chunk_size):
+        for fragments in iter_event_objects(event, chunk_size):
+            yield separator
+            yield from fragments
+            separator = ", "
+    yield "]}"
@@ -2,10 +2,11 @@
 
 from django.utils.translation import gettext_lazy as _
 from django.template import engines
-from django.db.models import Count, Q
+from django.db.models import QuerySet
 from django.urls import reverse
 from django.utils.safestring import mark_safe
 import django_tables2 as tables
+from ioc_management.duplicates import duplicated_ids
 from ioc_management.models import Event, CodeSnippet, FQDN, Hash, IpAdd, Vuln
 from ui.include.tables import ObjectTable, GreenRedDateInTheFuture
 
@@ -19,39 +20,52 @@ class DuplicateColumnMixin:
     """Utility to detect duplicated values on specific model fields."""
 
     @staticmethod
-    def has_duplicates(record, fields):
-        model = record.__class__
-        q = Q()
-        for f in fields:
-            q |= Q(**{f"{f}": getattr(record, f)})
-        return model.objects.filter(q).count() > 1
-    
+    def get_duplicated_pks(model, queryset):
+        """
+        Return the primary keys of the objects of queryset having duplicates.
+
+        An object is duplicated if another object of the model shares one of
+        its duplicated_fields values: a single indexed query on the
+        materialized duplicate groups, whatever the number of objects.
+        """
+        return set(
+            duplicated_ids(model).filter(object_id__in=queryset.order_by().values("pk")).values_list("object_id", flat=True)
+        )
 
-class DuplicatedColumn(tables.TemplateColumn, DuplicateColumnMixin):
-    """Table column that shows if a record has duplicates on given fields."""    
 
-    def render(self, value, record, **kwargs):
+class DuplicatedColumn(tables.TemplateColumn, DuplicateColumnMixin):
+    """
+    Table column that shows if a record has duplicates on given fields.
+
+    Duplicated records of the whole table are computed once, on the first
+    rendered cell, and the template is loaded once.
+    """
+
+    def get_table_duplicated_pks(self, table, model):
+        """Return the primary keys of the duplicated records of a table, computed once per table."""
+        if not hasattr(table, "duplicated_pks"):
+            data = getattr(table.data, "data", table.data)
+            if not isinstance(data, QuerySet):
+                data = model.objects.filter(pk__in=[record.pk for record in data])
+            table.duplicated_pks = self.get_duplicated_pks(model, data)
+        return table.duplicated_pks
+
+    def render(self, value, record, table, **kwargs):
         """Analyze data and return True/False."""
-        fields = getattr(record.__class__, "duplicated_fields", [])
-        is_duplicated = False
-        for f in fields:
-            if record.__class__.objects.filter(**{f: getattr(record, f)}).count() > 1:
-                is_duplicated = True
-                break
-            
+        is_duplicated = record.pk in self.get_table_duplicated_pks(table, record.__class__)
+
         # Load template
-        template_engine = engines['django']
-        template = template_engine.get_template(self.template_name)
+        if not hasattr(self, "template"):
+            self.template = engines["django"].get_template(self.template_name)
 
         # Render
         context = {
             'record': record,
-            'value': value,
             'value': is_duplicated,
             **kwargs,
         }
 
-        return template.render(context)
+        return self.template.render(context)
 
 
 #############################################################################
@@ -242,7 +256,7 @@ class FQDNTable(ObjectTable):
         """Meta options."""
 
         model = FQDN
-        exclude = ("id", "select", "created_at", "confidence", "validation_status", "description", "actions")
+        exclude = ("id", "select", "created_at", "confidence", "validation_status", "description", "fqdn_reversed", "actions")
         sequence = (
             "fqdn",
             "event",
@@ -269,7 +283,7 @@ class FQDNEmbeddedTable(ObjectTable):
         """Meta options."""
 
         model = FQDN
-        exclude = ("select", "id", "author", "event", "created_at", "description")
+        exclude = ("select", "id", "author", "event", "created_at", "description", "fqdn_reversed")
         sequence = (
             "fqdn",
             "confidence",
@@ -369,7 +383,7 @@ class IpAddTable(ObjectTable):
 
     author = tables.LinkColumn("user_detail", args=[tables.A("author__pk")])
     event = tables.LinkColumn("event_detail", args=[tables.A("event__pk")])
-    ip_address = tables.LinkColumn("ipadd_detail", args=[tables.A("pk")])
+    ip_address = tables.LinkColumn("ipadd_detail", args=[tables.A("pk")], text=lambda record: str(record))
     expired_at = GreenRedDateInTheFuture(verbose_name="Valid")
     updated_at = tables.DateColumn(orderable=True, format="Y-m-d H:i")
 
@@ -377,7 +391,7 @@ class IpAddTable(ObjectTable):
         """Meta options."""
 
         model = IpAdd
-        exclude = ("id", "select", "description", "created_at", "confidence", "validation_status", "actions")
+        exclude = ("id", "select", "description", "created_at", "confidence", "validation_status", "prefix_length", "ip_address_end", "range_start", "range_end", "range_bits", "actions")
         sequence = (
             "ip_address",
             "event",
@@ -395,7 +409,7 @@ class IpAddTable(ObjectTable):
 class IpAddEmbeddedTable(ObjectTable):
     """Embedded table definition for the IpAdd model."""
 
-    ip_address = tables.LinkColumn("ipadd_detail", args=[tables.A("pk")])
+    ip_address = tables.LinkColumn("ipadd_detail", args=[tables.A("pk")], text=lambda record: str(record))
     expired_at = GreenRedDateInTheFuture(verbose_name="Valid")
     updated_at = tables.DateColumn(orderable=True, format="Y-m-d H:i")
     duplicated = DuplicatedColumn(accessor="pk", verbose_name="Duplicated", orderable=False, template_name="ui/tables/column_boolean_green_red_reverse.html")
@@ -404,7 +418,7 @@ class IpAddEmbeddedTable(ObjectTable):
         """Meta options."""
 
         model = IpAdd
-        exclude = ("id", "select", "created_at", "description", "author", "event")
+        exclude = ("id", "select", "created_at", "description", "author", "event", "prefix_length", "ip_address_end", "range_start", "range_end", "range_bits")
         sequence = (
             "ip_address",
             "confidence",
@@ -0,0 +1,143 @@
+"""TAXII 2.1 collections for IoC Management app."""
+
+import base64
+import uuid
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.renderers import JSONRenderer
+from ioc_management.models import FQDN, Hash, IpAdd, Vuln
+from ioc_management.stix import STIX_MEDIA_TYPE, STIX_MODELS, STIX_TYPES, stix_timestamp
+
+
+TAXII_MEDIA_TYPE = "application/taxii+json;version=2.1"
+
+
+class TAXIIJSONRenderer(JSONRenderer):
+    """Render TAXII 2.1 resources as is, with the TAXII media type."""
+
+    media_type = TAXII_MEDIA_TYPE
+    format = "taxii"
+
+
+#############################################################################
+# Collections
+#############################################################################
+
+
+def collection_id(model):
+    """Return the stable collection id of a model."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, "eg0n:taxii:{}".format(model._meta.model_name)))
+
+
+TAXII_COLLECTIONS = {
+    collection_id(model): (model, title, description)
+    for model, title, description in (
+        (FQDN, "FQDN", "Malicious domain names."),
+        (Hash, "Hash", "Malicious file hashes."),
+        (IpAdd, "IpAdd", "Malicious IP addresses, networks and ranges."),
+        (Vuln, "Vuln", "Vulnerabilities."),
+    )
+}
+
+
+def get_collection(pk):
+    """Return the TAXII collection resource of a collection id."""
+    model, title, description = TAXII_COLLECTIONS[pk]
+    return {
+        "id": pk,
+        "title": title,
+        "description": description,
+        "alias": model._meta.model_name,
+        "can_read": True,
+        "can_write": False,
+        "media_types": [STIX_MEDIA_TYPE],
+    }
+
+
+#############################################################################
+# Objects
+#############################################################################
+
+
+def encode_next(record):
+    """Return the opaque next token resuming after a record."""
+    value = "{}|{}".format(record["updated_at"].isoformat(), record["id"])
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_next(token):
+    """Return the (updated_at, id) keyset encoded by encode_next(), raise ValueError if invalid."""
+    try:
+        updated_at, pk = base64.urlsafe_b64decode(token.encode()).decode().split("|")
+        updated_at, pk = parse_datetime(updated_at), uuid.UUID(pk)
+    except (TypeError, UnicodeDecodeError, ValueError) as exc:
+        raise ValueError("Invalid next token") from exc
+    if updated_at is None:
+        raise ValueError("Invalid next token")
+    return updated_at, pk
+
+
+def parse_limit(value):
+    """Return the page size of a limit parameter, raise ValueError if invalid."""
+    if value in (None, ""):
+        return settings.IOC_TAXII_PAGE_SIZE
+    limit = int(value)
+    if limit < 1:
+        raise ValueError("Invalid limit")
+    return min(limit, settings.IOC_TAXII_MAX_PAGE_SIZE)
+
+
+def get_objects(model, params):
+    """
+    Return a page of STIX objects of a collection.
+
+    Objects are sorted by (updated_at, id): added_after and next are keyset
+    conditions on the updated_at index, so a page costs the same whatever
+    its position in the collection. Return (records, objects, more, next).
+    Raise ValueError on invalid parameters.
+    """
+    fields, converter = STIX_MODELS[model]
+    qs = model.objects.order_by("updated_at", "id")
+    if params.get("added_after"):
+        added_after = parse_datetime(params["added_after"])
+        if added_after is None or timezone.is_naive(added_after):
+            # RFC 3339 timestamps carry an offset, naive dates would be server-local
+            raise ValueError("Invalid added_after")
+        qs = qs.filter(updated_at__gt=added_after)
+    if params.get("next"):
+        updated_at, pk = decode_next(params["next"])
+        qs = qs.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=pk))
+    if params.get("match[id]"):
+        ids = []
+        prefix = STIX_TYPES[model] + "--"
+        for value in params["match[id]"].split(","):
+            if value.startswith(prefix):
+                try:
+                    ids.append(uuid.UUID(value[len(prefix):]))
+                except ValueError:
+                    continue
+        qs = qs.filter(id__in=ids)
+    limit = parse_limit(params.get("limit"))
+
+    records = list(qs.values(*fields)[:limit + 1])
+    more = len(records) > limit
+    records = records[:limit]
+    objects = [obj for obj in (converter(record) for record in records) if obj is not None]
+    return records, objects, more, encode_next(records[-1]) if more else None
+
+
+def get_date_added_headers(records):
+    """
+    Return the X-TAXII-Date-Added-First/Last headers of a page.
+
+    Dates keep the microseconds of updated_at, so that added_after=<last>
+    does not return the last objects again.
+    """
+    if not records:
+        return {}
+    return {
+        "X-TAXII-Date-Added-First": stix_timestamp(records[0]["updated_at"], microseconds=True),
+        "X-TAXII-Date-Added-Last": stix_timestamp(records[-1]["updated_at"], microseconds=True),
+    }
@@ -3,6 +3,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from ioc_management.views import (
+    ChangeAPIViewSet,
     CodeSnippetAPIViewSet,
     CodeSnippetChangeView,
     CodeSnippetDeleteView,
@@ -19,22 +20,42 @@ from ioc_management.views import (
     FQDNChangeView,
     FQDNDeleteView,
     FQDNDetailView,
+    FQDNDuplicateListView,
+    FQDNFeedView,
     FQDNListView,
     HashAPIViewSet,
     HashChangeView,
     HashDeleteView,
     HashDetailView,
+    HashDuplicateListView,
+    HashFeedView,
     HashListView,
     HomeView,
     IpAddAPIViewSet,
     IpAddChangeView,
     IpAddDeleteView,
     IpAddDetailView,
+    IpAddDuplicateListView,
+    IpAddFeedView,
     IpAddListView,
+    MatchAPIViewSet,
+    RPZAPIViewSet,
+    RulesAPIViewSet,
+    SearchAPIViewSet,
+    SearchView,
+    SnapshotAPIViewSet,
+    TAXIIAPIRootView,
+    TAXIICollectionListView,
+    TAXIICollectionView,
+    TAXIIDiscoveryView,
+    TAXIIManifestView,
+    TAXIIObjectListView,
+    TAXIIObjectView,
     VulnAPIViewSet,
     VulnChangeView,
     VulnDeleteView,
     VulnDetailView,
+    VulnDuplicateListView,
     VulnListView,
 )
 
@@ -46,10 +67,17 @@ router.register(r"fqdn", FQDNAPIViewSet, basename="fqdn")
 router.register(r"hash", HashAPIViewSet, basename="hash")
 router.register(r"ipadd", IpAddAPIViewSet, basename="ipadd")
 router.register(r"vuln", VulnAPIViewSet, basename="vuln")
+router.register(r"match", MatchAPIViewSet, basename="match")
+router.register(r"search", SearchAPIViewSet, basename="search")
+router.register(r"snapshot", SnapshotAPIViewSet, basename="snapshot")
+router.register(r"changes", ChangeAPIViewSet, basename="changes")
+router.register(r"rules", RulesAPIViewSet, basename="rules")
+router.register(r"rpz", RPZAPIViewSet, basename="rpz")
 
 # URL patterns for class-based views and API endpoints
 urlpatterns = [
     path("", HomeView.as_view(), name="home"),
+    path("search/", SearchView.as_view(), name="search"),
     #########################################################################
     # Event views (HTML)
     #########################################################################
@@ -89,30 +117,54 @@ urlpatterns = [
     #########################################################################
     path("fqdn/", FQDNListView.as_view(), name="fqdn_list"),
     path("fqdn/<uuid:pk>/", FQDNDetailView.as_view(),name="fqdn_detail"),
+    path("fqdn/<uuid:pk>/duplicates", FQDNDuplicateListView.as_view(), name="fqdn_duplicates"),
     path("fqdn/<uuid:pk>/delete", FQDNDeleteView.as_view(), name="fqdn_delete"),
     path("fqdn/<uuid:pk>/update", FQDNChangeView.as_view(), name="fqdn_update"),
+    path("feed/fqdn.csv", FQDNFeedView.as_view(feed_format="csv"), name="fqdn_feed_csv"),
+    path("feed/fqdn.txt", FQDNFeedView.as_view(feed_format="txt"), name="fqdn_feed_txt"),
     #########################################################################
     # Hash
     #########################################################################
     path("hash/", HashListView.as_view(), name="hash_list"),
     path("hash/<uuid:pk>/", HashDetailView.as_view(),name="hash_detail"),
+    path("hash/<uuid:pk>/duplicates", HashDuplicateListView.as_view(), name="hash_duplicates"),
     path("hash/<uuid:pk>/delete", HashDeleteView.as_view(), name="hash_delete"),
     path("hash/<uuid:pk>/update", HashChangeView.as_view(), name="hash_update"),
+    path("feed/hash.csv", HashFeedView.as_view(feed_format="csv"), name="hash_feed_csv"),
+    path("feed/hash.txt", HashFeedView.as_view(feed_format="txt"), name="hash_feed_txt"),
     #########################################################################
     # IpAdd
     #########################################################################
     path("ipadd/", IpAddListView.as_view(), name="ipadd_list"),
     path("ipadd/<uuid:pk>/", IpAddDetailView.as_view(),name="ipadd_detail"),
+    path("ipadd/<uuid:pk>/duplicates", IpAddDuplicateListView.as_view(), name="ipadd_duplicates"),
     path("ipadd/<uuid:pk>/delete", IpAddDeleteView.as_view(), name="ipadd_delete"),
     path("ipadd/<uuid:pk>/update", IpAddChangeView.as_view(), name="ipadd_update"),
+    path("feed/ipadd.csv", IpAddFeedView.as_view(feed_format="csv"), name="ipadd_feed_csv"),
+    path("feed/ipadd.txt", IpAddFeedView.as_view(feed_format="txt"), name="ipadd_feed_txt"),
     #########################################################################
     # Vuln
     #########################################################################
     path("vuln/", VulnListView.as_view(), name="vuln_list"),
     path("vuln/<uuid:pk>/", VulnDetailView.as_view(),name="vuln_detail"),
+    path("vuln/<uuid:pk>/duplicates", VulnDuplicateListView.as_view(), name="vuln_duplicates"),
     path("vuln/<uuid:pk>/delete", VulnDeleteView.as_view(), name="vuln_delete"),
     path("vuln/<uuid:pk>/update", VulnChangeView.as_view(), name="vuln_update"),
     #########################################################################
+    # TAXII 2.1 server
+    #########################################################################
+    path("taxii2/", TAXIIDiscoveryView.as_view(), name="taxii_discovery"),
+    path("taxii2/api/", TAXIIAPIRootView.as_view(), name="taxii_api_root"),
+    path("taxii2/api/collections/", TAXIICollectionListView.as_view(), name="taxii_collection_list"),
+    path("taxii2/api/collections/<uuid:collection_id>/", TAXIICollectionView.as_view(), name="taxii_collection"),
+    path("taxii2/api/collections/<uuid:collection_id>/manifest/", TAXIIManifestView.as_view(), name="taxii_manifest"),
+    path("taxii2/api/collections/<uuid:collection_id>/objects/", TAXIIObjectListView.as_view(), name="taxii_object_list"),
+    path(
+        "taxii2/api/collections/<uuid:collection_id>/objects/<str:object_id>/",
+        TAXIIObjectView.as_view(),
+        name="taxii_object",
+    ),
+    #########################################################################
     # API endpoints
     #########################################################################
     path("api/", include(router.urls)),
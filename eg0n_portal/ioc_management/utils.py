@@ -0,0 +1,13 @@
+"""Shared helpers for IoC Management app."""
+
+from itertools import islice
+
+
+def batches(iterable, size):
+    """Yield lists of up to size items."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
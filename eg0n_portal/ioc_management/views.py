@@ -1,29 +1,75 @@
 """Views for IoC Management app."""
 
 
+import hashlib
+import json
+import os
+from django.conf import settings
+from django.db import transaction
+from django.http import FileResponse, HttpResponseNotModified, StreamingHttpResponse
 from django.views.generic import TemplateView
 from django.db.models import Count, Q
+from django.utils import timezone
 import django_tables2 as tables
+from django.urls import reverse
+from rest_framework.authentication import BasicAuthentication, SessionAuthentication, TokenAuthentication
+from rest_framework.decorators import action
+from rest_framework.exceptions import MethodNotAllowed, NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from rest_framework.viewsets import GenericViewSet
+from ioc_management.correlations import related_events
+from ioc_management.duplicates import duplicates_of, is_duplicated
 from ioc_management.filters import EventFilter, VulnFilter, IpAddFilter, CodeSnippetFilter, FQDNFilter, HashFilter
 from ioc_management.forms import EventForm, CodeSnippetForm, FQDNForm, IpAddForm, HashForm, VulnForm
-from ioc_management.models import CodeSnippet, Event, FQDN, Hash, IpAdd, Vuln
+from ioc_management.matchers import fqdn_matcher, hash_matcher, ipadd_matcher
+from ioc_management.models import Change, ChangePrune, CodeSnippet, Event, FQDN, Hash, IpAdd, Vuln, fqdn_labels, hash_digest, ip_networks
 from ioc_management.permissions import (
+    ChangePermissionPolicy,
     CodeSnippetPermissionPolicy,
     EventPermissionPolicy,
     FQDNPermissionPolicy,
     HashPermissionPolicy,
     HomePermissionPolicy,
     IpAddPermissionPolicy,
+    MatchPermissionPolicy,
+    RPZPermissionPolicy,
+    RulesPermissionPolicy,
+    SearchPermissionPolicy,
+    SnapshotPermissionPolicy,
+    TAXIIPermissionPolicy,
     VulnPermissionPolicy,
 )
+from ioc_management.rpz import ZONE_NAME, build_rpz, iter_ixfr, open_diffs, open_zone
+from ioc_management.rules import RULE_FILES, build_rules, get_rules_path
+from ioc_management.search import global_search
 from ioc_management.serializers import (
+    BulkSelectionSerializer,
+    BulkUpdateSerializer,
+    ChangeQuerySerializer,
     CodeSnippetSerializer,
     EventSerializer,
+    FQDNMatchSerializer,
     FQDNSerializer,
+    GlobalSearchQuerySerializer,
+    HashLookupSerializer,
     HashSerializer,
+    IpAddMatchSerializer,
     IpAddSerializer,
+    RelatedEventsQuerySerializer,
     VulnSerializer,
 )
+from ioc_management.signals import bulk_changed
+from ioc_management.snapshots import build_snapshot, get_snapshot_paths
+from ioc_management.stix import STIX_MEDIA_TYPE, STIX_TYPES, iter_bundle, stix_timestamp
+from ioc_management.taxii import (
+    TAXII_COLLECTIONS,
+    TAXII_MEDIA_TYPE,
+    TAXIIJSONRenderer,
+    get_collection,
+    get_date_added_headers,
+    get_objects,
+)
 from ioc_management.tables import (
     OwnedEventHomeTable,
     ContributedEventHomeTable,
@@ -41,6 +87,7 @@ from ioc_management.tables import (
 )
 from ui.include.views import (
     APICRUDViewSet,
+    APIFeedView,
     ObjectBulkDeleteView,
     ObjectChangeView,
     ObjectCreateView,
@@ -49,6 +96,114 @@ from ui.include.views import (
     ObjectListView,
     TemplateMixin,
 )
+from ui.include.permissions import ObjectPermission
+
+
+#############################################################################
+# Generic Bulk Operations
+#############################################################################
+
+
+class BulkActionMixin:
+    """
+    Bulk actions on objects selected by ids or by a filter via REST API.
+
+    Selected objects are processed by batches of IOC_BULK_BATCH_SIZE primary
+    keys, each batch in its own short transaction. The policy is checked once
+    for the whole selection, the target being the selected queryset.
+    """
+
+    bulk_update_fields = ()  # Fields accepted by bulk updates
+
+    def get_bulk_queryset(self, selection):
+        """Return the queryset of the objects selected by validated ids or filter."""
+        queryset = self.get_queryset()
+        if "ids" in selection:
+            return queryset.filter(pk__in=selection["ids"])
+        # Unknown parameters would be ignored by the FilterSet, selecting everything
+        unknown = set(selection["filter"]) - set(self.filterset_class.base_filters)
+        if unknown:
+            raise ValidationError({"filter": ["Unknown filters: {}.".format(", ".join(sorted(unknown)))]})
+        filterset = self.filterset_class(data=selection["filter"], queryset=queryset, request=self.request)
+        if not filterset.is_valid():
+            raise ValidationError({"filter": filterset.errors})
+        return filterset.qs
+
+    def iter_bulk_batches(self, queryset):
+        """
+        Yield the primary keys of a queryset by batches.
+
+        Each batch resumes after the last key of the previous one, so objects
+        leaving the selection (e.g. updated or deleted) do not shift batches.
+        """
+        queryset = queryset.order_by("pk").values_list("pk", flat=True)
+        last = None
+        while True:
+            batch = queryset if last is None else queryset.filter(pk__gt=last)
+            pks = list(batch[:settings.IOC_BULK_BATCH_SIZE])
+            if not pks:
+                return
+            yield pks
+            last = pks[-1]
+
+    def get_bulk_changes(self, data):
+        """Return the validated field values of a bulk update."""
+        unknown = set(data) - set(self.bulk_update_fields)
+        if unknown:
+            raise ValidationError({"data": ["Fields not allowed in bulk updates: {}.".format(", ".join(sorted(unknown)))]})
+        serializer = self.get_serializer(data=data, partial=True)
+        if not serializer.is_valid():
+            raise ValidationError({"data": serializer.errors})
+        return serializer.validated_data
+
+    @action(detail=False, methods=["patch"])
+    def bulk(self, request):
+        """Apply the same field values to the selected objects with batched QuerySet.update()."""
+        if not self.bulk_update_fields:
+            raise MethodNotAllowed(request.method)
+        serializer = BulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        changes = self.get_bulk_changes(serializer.validated_data["data"])
+        queryset = self.get_bulk_queryset(serializer.validated_data)
+        self.check_object_permissions(request, queryset)
+
+        count = 0
+        for pks in self.iter_bulk_batches(queryset):
+            with transaction.atomic():
+                # QuerySet.update() skips auto_now and signals
+                count += self.model.objects.filter(pk__in=pks).update(**changes, updated_at=timezone.now())
+                bulk_changed.send(sender=self.model, object_ids=pks)
+        return Response({"count": count})
+
+    def perform_bulk_delete(self, pks):
+        """Delete a batch of objects, return the number of deleted objects."""
+        with transaction.atomic():
+            _, deleted = self.model.objects.filter(pk__in=pks).delete()
+        return deleted.get(self.model._meta.label, 0)
+
+    @bulk.mapping.delete
+    def bulk_delete(self, request):
+        """
+        Delete the selected objects by batches, then return the progress.
+
+        The response is a JSON line per deleted batch with the deleted and
+        total counts, then a last line with done set. All batches are deleted
+        before the response starts: a failure is an error status, and a
+        client disconnecting cannot stop the deletion halfway.
+        """
+        serializer = BulkSelectionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        queryset = self.get_bulk_queryset(serializer.validated_data)
+        self.check_object_permissions(request, queryset)
+        total = queryset.count()
+
+        deleted = 0
+        lines = []
+        for pks in self.iter_bulk_batches(queryset):
+            deleted += self.perform_bulk_delete(pks)
+            lines.append(json.dumps({"deleted": deleted, "total": total}) + "\n")
+        lines.append(json.dumps({"deleted": deleted, "total": total, "done": True}) + "\n")
+        return StreamingHttpResponse(lines, content_type="application/x-ndjson")
 
 
 #############################################################################
@@ -56,13 +211,41 @@ from ui.include.views import (
 #############################################################################
 
 
-class AttributeQueryMixin:
+class AttributeQueryMixin(BulkActionMixin):
     """Standard actions for generic attributes."""
 
+    bulk_update_fields = ("confidence", "expired_at", "validation_status")
+
+    def create(self, request, *args, **kwargs):
+        """Create an attribute, or a JSON list of attributes in bulk, via REST API."""
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data, many=True, max_length=settings.IOC_BULK_MAX_ITEMS)
+        serializer.is_valid(raise_exception=True)
+        objs = self.perform_bulk_create(serializer) if serializer.validated_data else []
+        return Response(
+            {
+                "count": len(objs),
+                "results": [{"index": index, "id": obj.pk} for index, obj in zip(serializer.item_indexes, objs)],
+                "errors": [{"index": index, "errors": errors} for index, errors in sorted(serializer.item_errors.items())],
+            },
+            status=201 if objs else 400,
+        )
+
     def perform_create(self, serializer):
         """Set user and update event when creating a new attribute via REST API."""
         obj = serializer.save(author=self.request.user)
-        obj.event.save()
+        obj.event.save(update_fields=["updated_at"])
+
+    def perform_bulk_create(self, serializer):
+        """Set user and insert attributes in bulk, touching each affected event once."""
+        with transaction.atomic():
+            objs = serializer.save(author=self.request.user)
+            event_ids = {obj.event_id for obj in objs}
+            Event.objects.filter(pk__in=event_ids).update(updated_at=timezone.now())
+            bulk_changed.send(sender=self.model, object_ids=[obj.pk for obj in objs], objects=objs, created=True)
+            bulk_changed.send(sender=Event, object_ids=event_ids)
+        return objs
 
     def perform_update(self, serializer):
         """Set contributed users and update event when creating a new CodeSnippet."""
@@ -71,6 +254,38 @@ class AttributeQueryMixin:
         # serializer.save(last_editor=self.request.user)
 
 
+class AttributeFeedMixin:
+    """Feed defaults for generic attributes: skip expired and non-approved items unless filtered."""
+
+    def get_feed_queryset(self):
+        """Return the filtered queryset, applying default filters not overridden by the request."""
+        qs = super().get_feed_queryset()
+        params = self.request.query_params
+        if not params.get("expiration"):
+            qs = qs.filter(expired_at__gt=timezone.localdate())
+        if not params.get("validation_status"):
+            qs = qs.filter(validation_status="approved")
+        return qs
+
+
+class DuplicateDetailMixin:
+    """Detail view of an attribute with duplicated_fields, flagging duplicated objects."""
+
+    def get_context_data(self, **kwargs):
+        """Add the duplicated flag to context."""
+        context = super().get_context_data(**kwargs)
+        context["duplicated"] = is_duplicated(self.object)
+        return context
+
+
+class DuplicateListMixin:
+    """List view of the objects sharing a duplicated field value with the object of the URL."""
+
+    def get_queryset(self):
+        """Return the duplicates of the object, itself excluded."""
+        return duplicates_of(super().get_queryset(), self.kwargs["pk"])
+
+
 #############################################################################
 # Event
 #############################################################################
@@ -88,17 +303,59 @@ class EventQueryMixin:
 
     def get_queryset(self):
         """Return the queryset of Event objects accessible to the current user."""
-        qs = Event.objects.all().prefetch_related("contributors")
+        qs = Event.objects.all().select_related("author").prefetch_related("contributors")
         return qs
 
 
-class EventAPIViewSet(EventQueryMixin, APICRUDViewSet):
+class EventAPIViewSet(EventQueryMixin, BulkActionMixin, APICRUDViewSet):
     """REST API ViewSet for the Event model."""
 
+    def perform_bulk_delete(self, pks):
+        """Delete the attributes of a batch of events by batches, then the events."""
+        for model in (CodeSnippet, FQDN, Hash, IpAdd, Vuln):
+            for attribute_pks in self.iter_bulk_batches(model.objects.filter(event_id__in=pks)):
+                with transaction.atomic():
+                    model.objects.filter(pk__in=attribute_pks).delete()
+        return super().perform_bulk_delete(pks)
+
+    def perform_content_negotiation(self, request, force=False):
+        """Accept any client on STIX exports, they are not rendered by DRF renderers."""
+        return super().perform_content_negotiation(request, force=force or self.action in ("stix", "stix_bundle"))
+
     def perform_create(self, serializer):
         """Set user when creating a new Event."""
         serializer.save(author=self.request.user)
 
+    def get_stix_response(self, events, filename):
+        """Stream the STIX 2.1 bundle of the given events."""
+        response = StreamingHttpResponse(iter_bundle(events), content_type=STIX_MEDIA_TYPE)
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+    @action(detail=True, methods=["get"])
+    def stix(self, request, pk=None):
+        """Stream the STIX 2.1 bundle of an Event."""
+        event = self.get_object()
+        return self.get_stix_response(Event.objects.filter(pk=event.pk), f"{event.pk}.stix.json")
+
+    @action(detail=False, methods=["get"], url_path="stix")
+    def stix_bundle(self, request):
+        """Stream the STIX 2.1 bundle of all the (filtered) Events."""
+        return self.get_stix_response(self.filter_queryset(self.get_queryset()), "eg0n.stix.json")
+
+    @action(detail=True, methods=["get"])
+    def related(self, request, pk=None):
+        """Return the Events sharing indicators with an Event, most shared first."""
+        query = RelatedEventsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        event = self.get_object()
+        events = list(related_events(event, self.get_queryset())[:query.validated_data["limit"]])
+        data = self.get_serializer(events, many=True).data
+        return Response({
+            "count": len(events),
+            "results": [{**item, "shared": obj.shared} for obj, item in zip(events, data)],
+        })
+
 
 class EventBulkDeleteView(EventQueryMixin, ObjectBulkDeleteView):
     """HTML view for deleting multiple Event objects at once."""
@@ -165,6 +422,9 @@ class EventDetailView(EventQueryMixin, ObjectDetailView):
         tables.RequestConfig(self.request, paginate=False).configure(vuln_table)
         context["vuln_table"] = vuln_table
 
+        # Events sharing indicators, from the correlation index
+        context["related_events"] = related_events(event_obj)[:settings.IOC_RELATED_EVENTS_PAGE_SIZE]
+
         return context
 
 class EventListView(EventQueryMixin, ObjectListView):
@@ -190,7 +450,7 @@ class CodeSnippetQueryMixin:
 
     def get_queryset(self):
         """Return the queryset of CodeSnippet objects accessible to the current user."""
-        qs = CodeSnippet.objects.all()
+        qs = CodeSnippet.objects.all().select_related("author", "event").prefetch_related("contributors")
         return qs
 
 
@@ -241,7 +501,7 @@ class FQDNQueryMixin:
 
     def get_queryset(self):
         """Return the queryset of FQDN objects accessible to the current user."""
-        qs = FQDN.objects.all()
+        qs = FQDN.objects.all().select_related("author", "event").prefetch_related("contributors")
         return qs
 
 
@@ -263,12 +523,31 @@ class FQDNDeleteView(FQDNQueryMixin, ObjectDeleteView):
     pass
 
 
-class FQDNDetailView(FQDNQueryMixin, ObjectDetailView):
+class FQDNDetailView(FQDNQueryMixin, DuplicateDetailMixin, ObjectDetailView):
     """HTML view for displaying the details of a FQDN."""
 
     # Fields rendered in the template
     template_name = "fqdn_detail.html"
-    duplicated_fields = ["fqdn"]
+
+
+class FQDNDuplicateListView(DuplicateListMixin, FQDNQueryMixin, ObjectListView):
+    """HTML view for displaying the duplicates of a FQDN."""
+
+    pass
+
+
+class FQDNFeedView(FQDNQueryMixin, AttributeFeedMixin, APIFeedView):
+    """Plain text or CSV feed of FQDN objects."""
+
+    fields = ("fqdn", "confidence", "validation_status", "expired_at", "event_id")
+    header = ("fqdn", "confidence", "validation_status", "expired_at", "event")
+
+    def get_feed_rows(self, record):
+        """Return the normalized name (lowercase, no trailing dot) and its attributes."""
+        labels = fqdn_labels(record["fqdn"])
+        if not labels:
+            return []
+        return [[".".join(reversed(labels))] + [record[field] for field in self.fields[1:]]]
 
 
 class FQDNListView(FQDNQueryMixin, ObjectListView):
@@ -294,14 +573,30 @@ class HashQueryMixin:
 
     def get_queryset(self):
         """Return the queryset of Hash objects accessible to the current user."""
-        qs = Hash.objects.all()
+        qs = Hash.objects.all().select_related("author", "event").prefetch_related("contributors")
         return qs
 
 
 class HashAPIViewSet(HashQueryMixin, AttributeQueryMixin, APICRUDViewSet):
     """REST API ViewSet for the Hash model."""
 
-    pass
+    @action(detail=False, methods=["get", "post"])
+    def lookup(self, request):
+        """Return the Hash objects matching each of the given MD5, SHA1 or SHA256 digests."""
+        if request.method == "GET":
+            data = {"digests": request.query_params.getlist("digest")}
+        else:
+            data = request.data
+        serializer = HashLookupSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        matches = hash_matcher.match(serializer.validated_data["digests"])
+        return Response({
+            "count": len(matches),
+            "results": [
+                {"digest": digest, "algorithm": hash_digest(digest)[0], "matches": records}
+                for digest, records in matches.items()
+            ],
+        })
 
 class HashChangeView(HashQueryMixin, ObjectChangeView):
     """HTML view for updating an existing Hash."""
@@ -315,12 +610,37 @@ class HashDeleteView(HashQueryMixin, ObjectDeleteView):
     pass
 
 
-class HashDetailView(HashQueryMixin, ObjectDetailView):
+class HashDetailView(HashQueryMixin, DuplicateDetailMixin, ObjectDetailView):
     """HTML view for displaying the details of a Hash."""
 
     # Fields rendered in the template
     template_name = "hash_detail.html"
-    duplicated_fields = ["md5", "sha1", "sha256", "filename"]
+
+
+class HashDuplicateListView(DuplicateListMixin, HashQueryMixin, ObjectListView):
+    """HTML view for displaying the duplicates of a Hash."""
+
+    pass
+
+
+class HashFeedView(HashQueryMixin, AttributeFeedMixin, APIFeedView):
+    """Plain text (one digest per line) or CSV feed of Hash objects."""
+
+    fields = ("filename", "md5", "sha1", "sha256", "platform", "confidence", "validation_status", "expired_at", "event_id")
+    header = ("filename", "md5", "sha1", "sha256", "platform", "confidence", "validation_status", "expired_at", "event")
+
+    def get_feed_rows(self, record):
+        """Return one row per lowercase digest (txt) or one row per Hash (CSV)."""
+        if self.feed_format == "csv":
+            return super().get_feed_rows(record)
+        rows = []
+        for field in ("md5", "sha1", "sha256"):
+            try:
+                _, digest = hash_digest(record[field] or "")
+            except ValueError:
+                continue
+            rows.append([digest.hex()])
+        return rows
 
 
 class HashListView(HashQueryMixin, ObjectListView):
@@ -346,7 +666,7 @@ class IpAddQueryMixin:
 
     def get_queryset(self):
         """Return the queryset of IpAdd objects accessible to the current user."""
-        qs = IpAdd.objects.all()
+        qs = IpAdd.objects.all().select_related("author", "event").prefetch_related("contributors")
         return qs
 
 
@@ -368,12 +688,36 @@ class IpAddDeleteView(IpAddQueryMixin, ObjectDeleteView):
     pass
 
 
-class IpAddDetailView(IpAddQueryMixin, ObjectDetailView):
+class IpAddDetailView(IpAddQueryMixin, DuplicateDetailMixin, ObjectDetailView):
     """HTML view for displaying the details of a IpAdd."""
 
     # Fields rendered in the template
     template_name = "ipadd_detail.html"
-    duplicated_fields = ["ip_address"]
+
+
+class IpAddDuplicateListView(DuplicateListMixin, IpAddQueryMixin, ObjectListView):
+    """HTML view for displaying the duplicates of a IpAdd."""
+
+    pass
+
+
+class IpAddFeedView(IpAddQueryMixin, AttributeFeedMixin, APIFeedView):
+    """Plain text or CSV feed of IpAdd objects, ranges being split into CIDR networks."""
+
+    fields = ("ip_address", "prefix_length", "ip_address_end", "confidence", "validation_status", "expired_at", "event_id")
+    header = ("network", "confidence", "validation_status", "expired_at", "event")
+
+    def get_feed_rows(self, record):
+        """Return one row per network, single addresses without prefix length."""
+        try:
+            networks = ip_networks(record["ip_address"], record["prefix_length"], record["ip_address_end"])
+        except ValueError:
+            return []
+        attributes = [record[field] for field in self.fields[3:]]
+        return [
+            [str(network.network_address) if network.num_addresses == 1 else str(network)] + attributes
+            for network in networks
+        ]
 
 
 class IpAddListView(IpAddQueryMixin, ObjectListView):
@@ -399,14 +743,14 @@ class VulnQueryMixin:
 
     def get_queryset(self):
         """Return the queryset of Vuln objects accessible to the current user."""
-        qs = Vuln.objects.all()
+        qs = Vuln.objects.all().select_related("author", "event").prefetch_related("contributors")
         return qs
 
 
 class VulnAPIViewSet(VulnQueryMixin, AttributeQueryMixin, APICRUDViewSet):
     """REST API ViewSet for the Vuln model."""
 
-    pass
+    bulk_update_fields = ()  # No confidence, expiration or validation status
 
 
 class VulnChangeView(VulnQueryMixin, ObjectChangeView):
@@ -421,12 +765,17 @@ class VulnDeleteView(VulnQueryMixin, ObjectDeleteView):
     pass
 
 
-class VulnDetailView(VulnQueryMixin, ObjectDetailView):
+class VulnDetailView(VulnQueryMixin, DuplicateDetailMixin, ObjectDetailView):
     """HTML view for displaying the details of a Vuln."""
 
     # Fields rendered in the template
     template_name = "vuln_detail.html"
-    duplicated_fields = ["cve"]
+
+
+class VulnDuplicateListView(DuplicateListMixin, VulnQueryMixin, ObjectListView):
+    """HTML view for displaying the duplicates of a Vuln."""
+
+    pass
 
 
 class VulnListView(VulnQueryMixin, ObjectListView):
@@ -435,6 +784,443 @@ class VulnListView(VulnQueryMixin, ObjectListView):
     pass
 
 
+#############################################################################
+# Match
+#############################################################################
+
+
+class MatchAPIViewSet(GenericViewSet):
+    """REST API ViewSet matching observables in bulk against in-memory indexes."""
+
+    permission_classes = [ObjectPermission]
+    policy_class = MatchPermissionPolicy
+
+    @action(detail=False, methods=["post"], url_path="fqdn")
+    def fqdn(self, request):
+        """Return the FQDN objects covering each of the given names."""
+        serializer = FQDNMatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        matches = fqdn_matcher.match(serializer.validated_data["fqdns"])
+        return Response({
+            "count": len(matches),
+            "results": [
+                {"fqdn": fqdn, "matches": records}
+                for fqdn, records in matches.items()
+            ],
+        })
+
+    @action(detail=False, methods=["post"], url_path="ip")
+    def ip(self, request):
+        """Return the IpAdd objects matching each of the given addresses."""
+        serializer = IpAddMatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        matches = ipadd_matcher.match(serializer.validated_data["addresses"])
+        return Response({
+            "count": len(matches),
+            "results": [
+                {"address": address, "matches": records}
+                for address, records in matches.items()
+            ],
+        })
+
+
+#############################################################################
+# Search
+#############################################################################
+
+
+class SearchAPIViewSet(GenericViewSet):
+    """REST API ViewSet searching a single observable across all IoC types."""
+
+    permission_classes = [ObjectPermission]
+    policy_class = SearchPermissionPolicy
+    serializer_classes = {
+        "codesnippet": CodeSnippetSerializer,
+        "event": EventSerializer,
+        "fqdn": FQDNSerializer,
+        "hash": HashSerializer,
+        "ipadd": IpAddSerializer,
+        "vuln": VulnSerializer,
+    }
+
+    def list(self, request):
+        """
+        Return the objects matching the q observable, as a single list.
+
+        The observable type (ip, network, hash, cve, fqdn or text) is
+        detected and looked up through its own index; the full-text index
+        is only used for text and for observables without a typed match.
+        """
+        query = GlobalSearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        observable, fulltext, results = global_search(query.validated_data["q"], query.validated_data["limit"])
+        context = self.get_serializer_context()
+        return Response({
+            "query": query.validated_data["q"],
+            "observable": observable,
+            "fulltext": fulltext,
+            "count": len(results),
+            "results": [
+                {"model": name, **self.serializer_classes[name](obj, context=context).data}
+                for name, obj in results
+            ],
+        })
+
+
+#############################################################################
+# Change
+#############################################################################
+
+
+class ChangeAPIViewSet(GenericViewSet):
+    """REST API ViewSet returning the IoC objects created, updated or deleted after a cursor."""
+
+    permission_classes = [ObjectPermission]
+    policy_class = ChangePermissionPolicy
+    # model name -> (model, serializer, select_related fields), as the list viewsets
+    serializer_classes = {
+        "codesnippet": (CodeSnippet, CodeSnippetSerializer, ("author", "event")),
+        "event": (Event, EventSerializer, ("author",)),
+        "fqdn": (FQDN, FQDNSerializer, ("author", "event")),
+        "hash": (Hash, HashSerializer, ("author", "event")),
+        "ipadd": (IpAdd, IpAddSerializer, ("author", "event")),
+        "vuln": (Vuln, VulnSerializer, ("author", "event")),
+    }
+
+    def list(self, request):
+        """
+        Return the changes after the since cursor, in order.
+
+        Only the last change of each object in the batch is returned: upserts
+        carry the current object, deletions are tombstones without data. The
+        returned cursor is the since value of the next request. 410 Gone means
+        the changes after since were pruned and the mirror must be rebuilt.
+
+        Cursors are ids: on a backend with concurrent writers (PostgreSQL),
+        a change committed after a change with a greater id can be skipped
+        by a client whose cursor already passed it.
+        """
+        query = ChangeQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        since = query.validated_data["since"]
+        limit = query.validated_data["limit"]
+
+        watermark = ChangePrune.watermark()
+        if since < watermark:
+            last = Change.objects.values_list("id", flat=True).last() or watermark
+            return Response(
+                {"detail": "Changes after this cursor have been pruned, full resync required.", "cursor": last},
+                status=410,
+            )
+
+        changes = list(Change.objects.filter(id__gt=since)[:limit + 1])
+        more = len(changes) > limit
+        changes = changes[:limit]
+        cursor = changes[-1].id if changes else since
+
+        # Keep the last change of each object
+        latest = {}
+        for change in changes:
+            latest[(change.model, change.object_id)] = change
+        changes = [change for change in changes if latest[(change.model, change.object_id)] is change]
+
+        objects = {}
+        for model_name, (model, serializer_class, related) in self.serializer_classes.items():
+            ids = [change.object_id for change in changes if change.model == model_name and change.action == "upsert"]
+            if ids:
+                qs = model.objects.filter(pk__in=ids).select_related(*related).prefetch_related("contributors")
+                instances = list(qs)
+                data = serializer_class(instances, many=True, context={"request": request}).data
+                for instance, item in zip(instances, data):
+                    objects[(model_name, instance.pk)] = item
+
+        return Response({
+            "cursor": cursor,
+            "more": more,
+            "results": [
+                {
+                    "cursor": change.id,
+                    "action": change.action,
+                    "model": change.model,
+                    "id": change.object_id,
+                    "data": objects.get((change.model, change.object_id)),
+                }
+                for change in changes
+            ],
+        })
+
+
+#############################################################################
+# RPZ
+#############################################################################
+
+
+class RPZAPIViewSet(GenericViewSet):
+    """REST API ViewSet serving the DNS Response Policy Zone of active FQDN objects."""
+
+    permission_classes = [ObjectPermission]
+    policy_class = RPZPermissionPolicy
+
+    def list(self, request):
+        """Return the serial of the current zone and the serials incremental transfers start from."""
+        metadata = build_rpz()
+        return Response({
+            "origin": settings.IOC_RPZ_ORIGIN,
+            "serial": metadata["serial"],
+            "count": metadata["count"],
+            "built_at": metadata["built_at"],
+            "ixfr_serials": [old for old, _ in metadata["diffs"]],
+        })
+
+    @action(detail=False, methods=["get"])
+    def zone(self, request):
+        """Return the whole zone file (AXFR), or 304 if the client already has this serial."""
+        metadata, fd = open_zone()
+        etag = '"{}"'.format(metadata["serial"])
+        if request.headers.get("If-None-Match") == etag:
+            fd.close()
+            return HttpResponseNotModified(headers={"ETag": etag})
+        response = FileResponse(fd, content_type="text/dns", filename=ZONE_NAME)
+        response["ETag"] = etag
+        response["X-RPZ-Serial"] = metadata["serial"]
+        response["X-RPZ-Transfer"] = "axfr"
+        return response
+
+    @action(detail=False, methods=["get"])
+    def ixfr(self, request):
+        """
+        Return the changes since the given serial (IXFR).
+
+        Like DNS, fall back to the whole zone when the serial is unknown or
+        too old for the kept differences.
+        """
+        try:
+            serial = int(request.query_params.get("serial", ""))
+        except ValueError:
+            raise ValidationError({"serial": ["A valid integer is required."]})
+        metadata, files = open_diffs(serial)
+        if files is None:
+            return self.zone(request)
+        response = StreamingHttpResponse(iter_ixfr(metadata, files), content_type="text/dns")
+        response["X-RPZ-Serial"] = metadata["serial"]
+        response["X-RPZ-Transfer"] = "ixfr"
+        return response
+
+    def perform_content_negotiation(self, request, force=False):
+        """Accept any media type, the zone being rendered outside DRF."""
+        return super().perform_content_negotiation(request, force=True)
+
+
+#############################################################################
+# Rules
+#############################################################################
+
+
+class RulesAPIViewSet(GenericViewSet):
+    """REST API ViewSet serving the generated Suricata rules and lists."""
+
+    lookup_value_regex = r"[\w.-]+"
+    permission_classes = [ObjectPermission]
+    policy_class = RulesPermissionPolicy
+
+    def list(self, request):
+        """Return the generated files, rebuilding the rule sets whose attributes changed."""
+        metadata = build_rules()
+        return Response({
+            "count": len(RULE_FILES),
+            "results": [
+                {
+                    "name": name,
+                    "size": os.path.getsize(get_rules_path(name)),
+                    "built_at": metadata[set_name]["built_at"],
+                    "url": request.build_absolute_uri(reverse("rules-detail", args=[name])),
+                }
+                for name, set_name in sorted(RULE_FILES.items())
+            ],
+        })
+
+    def retrieve(self, request, pk=None):
+        """Return a generated file, or 304 if the client copy is current."""
+        if pk not in RULE_FILES:
+            raise NotFound("Unknown rules file.")
+        metadata = build_rules()
+        etag = '"{}"'.format(hashlib.blake2b(
+            "{}|{}".format(pk, metadata[RULE_FILES[pk]]["built_at"]).encode(), digest_size=16,
+        ).hexdigest())
+        if request.headers.get("If-None-Match") == etag:
+            return HttpResponseNotModified(headers={"ETag": etag})
+        response = FileResponse(open(get_rules_path(pk), "rb"), content_type="text/plain", filename=pk)
+        response["ETag"] = etag
+        return response
+
+
+#############################################################################
+# Snapshot
+#############################################################################
+
+
+class SnapshotAPIViewSet(GenericViewSet):
+    """REST API ViewSet serving the Bloom filter snapshot of active indicators."""
+
+    permission_classes = [ObjectPermission]
+    policy_class = SnapshotPermissionPolicy
+
+    def list(self, request):
+        """Return the metadata of the current snapshot, adding new indicators (rebuilds are left to build_snapshot)."""
+        return Response(build_snapshot(rebuild=False))
+
+    @action(detail=False, methods=["get"])
+    def download(self, request):
+        """Return the current snapshot file, or 304 if the client already has this version."""
+        metadata = build_snapshot(rebuild=False)
+        etag = '"{}"'.format(metadata["sha256"])
+        if request.headers.get("If-None-Match") == etag:
+            return HttpResponseNotModified(headers={"ETag": etag})
+        filter_path, _ = get_snapshot_paths()
+        response = FileResponse(
+            open(filter_path, "rb"), content_type="application/octet-stream", filename="ioc-filter.bin",
+        )
+        response["ETag"] = etag
+        response["X-Snapshot-Version"] = metadata["version"]
+        return response
+
+
+#############################################################################
+# TAXII
+#############################################################################
+
+
+class TAXIIMixin:
+    """Common settings of the read only TAXII 2.1 server views."""
+
+    # TAXII clients usually authenticate with HTTP Basic
+    authentication_classes = [BasicAuthentication, TokenAuthentication, SessionAuthentication]
+    permission_classes = [ObjectPermission]
+    policy_class = TAXIIPermissionPolicy
+    renderer_classes = [TAXIIJSONRenderer]
+
+    def perform_content_negotiation(self, request, force=False):
+        """Always answer with the TAXII media type."""
+        return super().perform_content_negotiation(request, force=True)
+
+    def handle_exception(self, exc):
+        """Return errors as TAXII error messages."""
+        response = super().handle_exception(exc)
+        detail = response.data.get("detail", response.data) if isinstance(response.data, dict) else response.data
+        response.data = {"title": response.status_text, "description": str(detail), "http_status": str(response.status_code)}
+        return response
+
+    def get_model(self, collection_id):
+        """Return the model of a collection, raise NotFound if unknown."""
+        if str(collection_id) not in TAXII_COLLECTIONS:
+            raise NotFound("Collection not found.")
+        return TAXII_COLLECTIONS[str(collection_id)][0]
+
+    def get_page(self, model, params):
+        """Return the objects page of a collection, raise ValidationError on invalid parameters."""
+        try:
+            return get_objects(model, params)
+        except ValueError as exc:
+            raise ValidationError(str(exc))
+
+
+class TAXIIDiscoveryView(TAXIIMixin, APIView):
+    """TAXII 2.1 server discovery."""
+
+    def get(self, request):
+        """Return the discovery resource."""
+        api_root = request.build_absolute_uri(reverse("taxii_api_root"))
+        return Response({
+            "title": settings.SITE_META["title"],
+            "description": "eg0n Threat Intelligence TAXII 2.1 server.",
+            "default": api_root,
+            "api_roots": [api_root],
+        })
+
+
+class TAXIIAPIRootView(TAXIIMixin, APIView):
+    """TAXII 2.1 API root."""
+
+    def get(self, request):
+        """Return the API root resource."""
+        return Response({
+            "title": settings.SITE_META["title"],
+            "versions": [TAXII_MEDIA_TYPE],
+            "max_content_length": 0,
+        })
+
+
+class TAXIICollectionListView(TAXIIMixin, APIView):
+    """TAXII 2.1 collections, one per IoC model."""
+
+    def get(self, request):
+        """Return the collections resource."""
+        return Response({"collections": [get_collection(pk) for pk in TAXII_COLLECTIONS]})
+
+
+class TAXIICollectionView(TAXIIMixin, APIView):
+    """TAXII 2.1 collection."""
+
+    def get(self, request, collection_id):
+        """Return the collection resource."""
+        self.get_model(collection_id)
+        return Response(get_collection(str(collection_id)))
+
+
+class TAXIIObjectListView(TAXIIMixin, APIView):
+    """TAXII 2.1 collection objects, paginated with added_after/next on updated_at."""
+
+    def get(self, request, collection_id):
+        """Return an envelope of objects."""
+        model = self.get_model(collection_id)
+        records, objects, more, next_token = self.get_page(model, request.query_params)
+        envelope = {"more": more, "objects": objects}
+        if next_token:
+            envelope["next"] = next_token
+        return Response(envelope, headers=get_date_added_headers(records))
+
+
+class TAXIIObjectView(TAXIIMixin, APIView):
+    """TAXII 2.1 collection object."""
+
+    def get(self, request, collection_id, object_id):
+        """Return an envelope with the requested object."""
+        model = self.get_model(collection_id)
+        params = request.query_params.dict()
+        params["match[id]"] = object_id
+        records, objects, _, _ = self.get_page(model, params)
+        if not objects:
+            raise NotFound("Object not found.")
+        return Response({"more": False, "objects": objects}, headers=get_date_added_headers(records))
+
+
+class TAXIIManifestView(TAXIIMixin, APIView):
+    """TAXII 2.1 collection manifest."""
+
+    def get(self, request, collection_id):
+        """Return the manifest of a page of objects."""
+        model = self.get_model(collection_id)
+        records, objects, more, next_token = self.get_page(model, request.query_params)
+        # Records the converter skipped have no object to describe
+        ids = {obj["id"] for obj in objects}
+        manifest = {
+            "more": more,
+            "objects": [
+                {
+                    "id": "{}--{}".format(STIX_TYPES[model], record["id"]),
+                    "date_added": stix_timestamp(record["updated_at"], microseconds=True),
+                    "version": stix_timestamp(record["updated_at"]),
+                    "media_type": STIX_MEDIA_TYPE,
+                }
+                for record in records
+                if "{}--{}".format(STIX_TYPES[model], record["id"]) in ids
+            ],
+        }
+        if next_token:
+            manifest["next"] = next_token
+        return Response(manifest, headers=get_date_added_headers(records))
+
+
 #############################################################################
 # Home
 #############################################################################
@@ -464,3 +1250,22 @@ class HomeView(TemplateMixin, TemplateView):
         context["contributed_event_table"] = contributed_event_table
 
         return context
+
+
+class SearchView(TemplateMixin, TemplateView):
+    """Render the global search page."""
+
+    policy_class = SearchPermissionPolicy
+    template_name = "search.html"
+
+    def get_context_data(self, **kwargs):
+        """Add the results of the q observable to context."""
+        context = super().get_context_data(**kwargs)
+        query = self.request.GET.get("q", "").strip()
+        context["query"] = query
+        if query:
+            observable, fulltext, results = global_search(query, settings.IOC_SEARCH_PAGE_SIZE)
+            context["observable"] = observable
+            context["fulltext"] = fulltext
+            context["results"] = [{"model": name, "object": obj} for name, obj in results]
+        return context
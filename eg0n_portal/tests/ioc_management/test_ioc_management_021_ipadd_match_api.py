@@ -0,0 +1,68 @@
+"""Test DRF (API) bulk IpAdd match."""
+
+import pytest
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import IpAdd
+
+
+@pytest.mark.django_db
+def test_ioc_management_ipadd_match_api_user(api_client, user_set_group1):
+    """Test DRF (API) bulk IpAdd match, including index updates via signals."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    url = reverse("match-ip")
+
+    ipadd = IpAdd.objects.create(
+        author=user,
+        confidence="high",
+        description="C2 server.",
+        event=event,
+        ip_address="192.0.2.10",
+        validation_status="approved",
+    )
+    IpAdd.objects.create(author=user, description="IPv6 C2 server.", event=event, ip_address="2001:db8::1")
+
+    payload = {"addresses": ["192.0.2.10", "192.0.2.11", "2001:db8::1"]}
+    response = api_client.post(url, payload, format="json", headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    results = {r["address"]: r["matches"] for r in response.data["results"]}
+    assert set(results) == {"192.0.2.10", "2001:db8::1"}, "Unexpected matches"
+    match = results["192.0.2.10"][0]
+    assert match["id"] == ipadd.pk, "IpAdd id not returned"
+    assert match["event"] == event.pk, "Event not returned"
+    assert match["confidence"] == "high", "Confidence not returned"
+    assert match["validation_status"] == "approved", "Validation status not returned"
+
+    # Signals keep the loaded index up to date
+    ipadd.ip_address = "192.0.2.11"
+    ipadd.save()
+    response = api_client.post(url, payload, format="json", headers=headers)
+    results = {r["address"] for r in response.data["results"]}
+    assert results == {"192.0.2.11", "2001:db8::1"}, "Index not updated on save"
+
+    ipadd.delete()
+    response = api_client.post(url, payload, format="json", headers=headers)
+    results = {r["address"] for r in response.data["results"]}
+    assert results == {"2001:db8::1"}, "Index not updated on delete"
+
+
+@pytest.mark.django_db
+def test_ioc_management_ipadd_match_api_invalid(api_client, user_set_group1):
+    """Test DRF (API) bulk IpAdd match with invalid payload."""
+    user = user_set_group1["user"]
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    url = reverse("match-ip")
+    response = api_client.post(url, {"addresses": ["not-an-ip"]}, format="json", headers=headers)
+    assert response.status_code == 400, "Expected 400 for invalid addresses"
+
+
+@pytest.mark.django_db
+def test_ioc_management_ipadd_match_api_guest(api_client, user_set_group1):
+    """Test DRF (API) bulk IpAdd match by guest user."""
+    url = reverse("match-ip")
+    response = api_client.post(url, {"addresses": ["192.0.2.10"]}, format="json")
+    assert response.status_code == 401, "Expected 401 for guest user"
@@ -0,0 +1,87 @@
+"""Test DRF (API) IpAdd CIDR and range indicators."""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import IpAdd, ip_range_classes
+
+
+@pytest.mark.django_db
+def test_ioc_management_ipadd_range_api_user(api_client, user_set_group1):
+    """Test DRF (API) CIDR/range creation and contains/within lookups."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    url = reverse("ipadd-list")
+
+    payloads = [
+        {"ip_address": "198.51.100.7", "prefix_length": 24},
+        {"ip_address": "203.0.113.10", "ip_address_end": "203.0.113.20"},
+        {"ip_address": "2001:db8::", "prefix_length": 32},
+        {"ip_address": "192.0.2.1"},
+    ]
+    for payload in payloads:
+        payload.update({"description": "Bulletproof hoster.", "event": str(event.pk), "expired_at": "2099-01-01"})
+        response = api_client.post(url, payload, format="json", headers=headers)
+        assert response.status_code == 201, f"Failed for payload {payload}"
+    cidr = IpAdd.objects.get(prefix_length=24)
+    assert cidr.ip_address == "198.51.100.0", "Network address not normalized"
+    assert str(cidr) == "198.51.100.0/24", "CIDR not printed"
+    assert cidr.range_bits == 8, "Span class not computed"
+    assert IpAdd.objects.get(ip_address="192.0.2.1").range_bits == 0, "Span class not computed"
+
+    lookups = {
+        "contains=198.51.100.200": {"198.51.100.0/24"},
+        "contains=203.0.113.15": {"203.0.113.10-203.0.113.20"},
+        "contains=203.0.113.21": set(),
+        "contains=2001:db8:1::1": {"2001:db8::/32"},
+        "contains=192.0.2.1": {"192.0.2.1"},
+        "within=203.0.113.0/24": {"203.0.113.10-203.0.113.20"},
+        "within=192.0.0.0/8": {"192.0.2.1"},
+        "within=198.51.100.128/25": set(),
+    }
+    for query, expected in lookups.items():
+        response = api_client.get(f"{url}?{query}", headers=headers)
+        assert response.status_code == 200, f"Failed for {query}"
+        results = {str(IpAdd.objects.get(pk=r["id"])) for r in response.data["results"]}
+        assert results == expected, f"Unexpected results for {query}"
+
+    # Contains lookups are bounded by span class, not scans of every lower range_start
+    with CaptureQueriesContext(connection) as context:
+        api_client.get(f"{url}?contains=198.51.100.200", headers=headers)
+    assert any('"range_bits"' in query["sql"] for query in context.captured_queries), "Span classes not used"
+    assert ip_range_classes() == [0, 4, 8, 96], "Unexpected span classes"
+    branches = max(query["sql"].count('"range_bits" =') for query in context.captured_queries)
+    assert branches == 4, "Unused span classes queried"
+
+    response = api_client.post(reverse("match-ip"), {"addresses": ["198.51.100.99", "203.0.113.19"]}, format="json", headers=headers)
+    assert {r["address"] for r in response.data["results"]} == {"198.51.100.99", "203.0.113.19"}, "Ranges not matched"
+
+
+@pytest.mark.django_db
+def test_ioc_management_ipadd_range_api_invalid(api_client, user_set_group1):
+    """Test DRF (API) invalid CIDR/range payloads and lookups."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    url = reverse("ipadd-list")
+
+    payloads = [
+        {"ip_address": "198.51.100.0", "prefix_length": 33},
+        {"ip_address": "198.51.100.0", "prefix_length": 24, "ip_address_end": "198.51.100.9"},
+        {"ip_address": "198.51.100.9", "ip_address_end": "198.51.100.0"},
+        {"ip_address": "198.51.100.0", "ip_address_end": "2001:db8::1"},
+    ]
+    for payload in payloads:
+        payload.update({"description": "Invalid range.", "event": str(event.pk), "expired_at": "2099-01-01"})
+        response = api_client.post(url, payload, format="json", headers=headers)
+        assert response.status_code == 400, f"Expected 400 for payload {payload}"
+    assert not IpAdd.objects.exists(), "Invalid IpAdd has been created"
+
+    for query in ("contains=198.51.100", "within=not-a-network"):
+        response = api_client.get(f"{url}?{query}", headers=headers)
+        assert response.status_code == 400, f"Expected 400 for {query}"
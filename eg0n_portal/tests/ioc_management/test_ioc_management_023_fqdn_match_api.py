@@ -0,0 +1,67 @@
+"""Test DRF (API) FQDN subdomain/wildcard lookups and bulk match."""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import FQDN
+
+
+@pytest.mark.django_db
+def test_ioc_management_fqdn_match_api_user(api_client, user_set_group1):
+    """Test DRF (API) FQDN contains/within lookups and bulk match."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+
+    for fqdn in ("evil.com", "*.wild.org", "www.example.net", "EVIL-sibling.com"):
+        FQDN.objects.create(author=user, description="Phishing.", event=event, fqdn=fqdn)
+    assert FQDN.objects.get(fqdn="evil.com").fqdn_reversed == "com.evil", "Reversed labels not stored"
+
+    url = reverse("fqdn-list")
+    lookups = {
+        "contains=a.b.evil.com": {"evil.com"},
+        "contains=evil.com": {"evil.com"},
+        "contains=a.wild.org": {"*.wild.org"},
+        "contains=wild.org": set(),
+        "contains=example.net": set(),
+        "within=com": {"evil.com", "EVIL-sibling.com"},
+        "within=evil.com": {"evil.com"},
+        "within=example.net": {"www.example.net"},
+    }
+    for query, expected in lookups.items():
+        response = api_client.get(f"{url}?{query}", headers=headers)
+        assert response.status_code == 200, f"Failed for {query}"
+        results = {r["fqdn"] for r in response.data["results"]}
+        assert results == expected, f"Unexpected results for {query}"
+
+    # Subdomain range scans compare with a binary collation
+    with CaptureQueriesContext(connection) as context:
+        api_client.get(f"{url}?within=com", headers=headers)
+    assert any("COLLATE" in query["sql"] for query in context.captured_queries), "Range not compared as binary"
+
+    url = reverse("match-fqdn")
+    payload = {"fqdns": ["a.b.evil.com", "x.wild.org", "wild.org", "Evil.Com.", "example.net"]}
+    response = api_client.post(url, payload, format="json", headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    results = {r["fqdn"]: {m["fqdn"] for m in r["matches"]} for r in response.data["results"]}
+    assert results == {
+        "a.b.evil.com": {"evil.com"},
+        "x.wild.org": {"*.wild.org"},
+        "Evil.Com.": {"evil.com"},
+    }, "Unexpected matches"
+
+    # Signals keep the loaded index up to date
+    FQDN.objects.get(fqdn="evil.com").delete()
+    response = api_client.post(url, payload, format="json", headers=headers)
+    assert {r["fqdn"] for r in response.data["results"]} == {"x.wild.org"}, "Index not updated on delete"
+
+
+@pytest.mark.django_db
+def test_ioc_management_fqdn_match_api_guest(api_client, user_set_group1):
+    """Test DRF (API) bulk FQDN match by guest user."""
+    url = reverse("match-fqdn")
+    response = api_client.post(url, {"fqdns": ["evil.com"]}, format="json")
+    assert response.status_code == 401, "Expected 401 for guest user"
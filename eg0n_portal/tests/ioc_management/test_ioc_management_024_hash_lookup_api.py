@@ -0,0 +1,77 @@
+"""Test DRF (API) Hash lookup by digest."""
+
+import pytest
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import Hash, HashDigest
+
+MD5 = "44D88612FEA8A8F36DE82E1278ABB02F"
+SHA1 = "3395856ce81f2b7382dee72602f798b642f14140"
+SHA256 = "275a021bbfb6489e54d471899f7db9d1663fc695ec2fe2a2c4538aabf651fd0f"
+
+
+@pytest.mark.django_db
+def test_ioc_management_hash_lookup_api_user(api_client, user_set_group1):
+    """Test DRF (API) single and batch Hash lookups, including digest table updates."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    url = reverse("hash-lookup")
+
+    hash_obj = Hash.objects.create(
+        author=user, description="EICAR.", event=event, filename="eicar.com", md5=MD5, sha1=SHA1, sha256=SHA256,
+    )
+    Hash.objects.create(author=user, description="Dropper.", event=event, filename="dropper.exe", md5="0" * 32)
+    assert HashDigest.objects.filter(hash=hash_obj).count() == 3, "Digests not indexed"
+
+    response = api_client.get(f"{url}?digest={MD5.lower()}", headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert response.data["count"] == 1, "Unexpected matches"
+    result = response.data["results"][0]
+    assert result["algorithm"] == "md5", "Algorithm not detected"
+    assert result["matches"][0]["id"] == hash_obj.pk, "Hash id not returned"
+    assert result["matches"][0]["event"] == event.pk, "Event not returned"
+
+    payload = {"digests": [SHA1.upper(), SHA256, "0" * 32, "f" * 64]}
+    response = api_client.post(url, payload, format="json", headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    results = {r["digest"]: {m["filename"] for m in r["matches"]} for r in response.data["results"]}
+    assert results == {
+        SHA1.upper(): {"eicar.com"},
+        SHA256: {"eicar.com"},
+        "0" * 32: {"dropper.exe"},
+    }, "Unexpected matches"
+
+    # Digest table follows updates and deletions
+    hash_obj.sha256 = "f" * 64
+    hash_obj.save()
+    response = api_client.post(url, payload, format="json", headers=headers)
+    results = {r["digest"] for r in response.data["results"]}
+    assert results == {SHA1.upper(), "0" * 32, "f" * 64}, "Digest table not updated on save"
+
+    hash_obj.delete()
+    assert not HashDigest.objects.filter(hash_id=hash_obj.pk).exists(), "Digests not deleted"
+    response = api_client.post(url, payload, format="json", headers=headers)
+    assert {r["digest"] for r in response.data["results"]} == {"0" * 32}, "Digest table not updated on delete"
+
+
+@pytest.mark.django_db
+def test_ioc_management_hash_lookup_api_invalid(api_client, user_set_group1):
+    """Test DRF (API) Hash lookup with invalid digests."""
+    user = user_set_group1["user"]
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    url = reverse("hash-lookup")
+    response = api_client.post(url, {"digests": ["abc", "z" * 32]}, format="json", headers=headers)
+    assert response.status_code == 400, "Expected 400 for invalid digests"
+    response = api_client.get(url, headers=headers)
+    assert response.status_code == 400, "Expected 400 for missing digest"
+
+
+@pytest.mark.django_db
+def test_ioc_management_hash_lookup_api_guest(api_client, user_set_group1):
+    """Test DRF (API) Hash lookup by guest user."""
+    url = reverse("hash-lookup")
+    response = api_client.get(f"{url}?digest={MD5}", format="json")
+    assert response.status_code == 401, "Expected 401 for guest user"
@@ -0,0 +1,115 @@
+"""Test DRF (API) Bloom filter snapshot export."""
+
+import io
+from datetime import timedelta
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from ioc_management.models import FQDN, Hash, IpAdd
+from ioc_management.snapshots import BloomFilter
+
+SHA256 = "275A021BBFB6489E54D471899F7DB9D1663FC695EC2FE2A2C4538AABF651FD0F"
+
+
+@pytest.fixture
+def snapshot_dir(settings, tmp_path):
+    """Store snapshots in a temporary directory."""
+    settings.IOC_SNAPSHOT_DIR = tmp_path
+    return tmp_path
+
+
+@pytest.mark.django_db
+def test_ioc_management_snapshot_api_user(api_client, user_set_group1, snapshot_dir, settings):
+    """Test DRF (API) snapshot metadata, download and incremental updates."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+
+    IpAdd.objects.create(author=user, description="C2.", event=event, ip_address="192.0.2.10", expired_at="2099-01-01")
+    IpAdd.objects.create(
+        author=user, description="Hoster.", event=event, ip_address="198.51.100.0", prefix_length=24,
+        expired_at="2099-01-01",
+    )
+    FQDN.objects.create(author=user, description="Phishing.", event=event, fqdn="Evil.com.", expired_at="2099-01-01")
+    Hash.objects.create(author=user, description="EICAR.", event=event, sha256=SHA256, expired_at="2099-01-01")
+    IpAdd.objects.create(author=user, description="Expired.", event=event, ip_address="192.0.2.99", expired_at="2000-01-01")
+    IpAdd.objects.create(
+        author=user, description="Suspended.", event=event, ip_address="192.0.2.98", expired_at="2099-01-01",
+        validation_status="suspended",
+    )
+
+    response = api_client.get(reverse("snapshot-list"), headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    metadata = response.data
+    assert metadata["version"] == 1, "Unexpected version"
+    assert metadata["count"] == 4, "Unexpected number of values"
+    assert metadata["prefixes"] == {"ipv4": [24, 32], "ipv6": []}, "Unexpected prefixes"
+
+    response = api_client.get(reverse("snapshot-download"), headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    bloom = BloomFilter.from_bytes(b"".join(response.streaming_content))
+    assert bloom.version == 1, "Unexpected filter version"
+    for value in ("ip:192.0.2.10/32", "ip:198.51.100.0/24", "fqdn:evil.com", "hash:" + SHA256.lower()):
+        assert value in bloom, f"{value} not in filter"
+    for value in ("ip:192.0.2.99/32", "ip:192.0.2.98/32", "fqdn:good.com"):
+        assert value not in bloom, f"{value} in filter"
+
+    # Unchanged indicators: same version, conditional download
+    response = api_client.get(reverse("snapshot-download"), headers={**headers, "If-None-Match": response["ETag"]})
+    assert response.status_code == 304, "Expected 304 for unchanged snapshot"
+
+    # New indicators are added incrementally
+    FQDN.objects.create(author=user, description="Phishing.", event=event, fqdn="*.wild.org", expired_at="2099-01-01")
+    response = api_client.get(reverse("snapshot-list"), headers=headers)
+    assert response.data["version"] == 2, "Snapshot not updated"
+    assert response.data["capacity"] == metadata["capacity"], "Snapshot fully rebuilt"
+    response = api_client.get(reverse("snapshot-download"), headers=headers)
+    bloom = BloomFilter.from_bytes(b"".join(response.streaming_content))
+    assert "fqdn:*.wild.org" in bloom and "fqdn:evil.com" in bloom, "Incremental update lost values"
+
+    # Deletions do not change the filter
+    FQDN.objects.get(fqdn="*.wild.org").delete()
+    response = api_client.get(reverse("snapshot-list"), headers=headers)
+    assert response.data["version"] == 2, "Snapshot updated on delete"
+
+    # Updates of already present values do not change the filter nor its count
+    fqdn = FQDN.objects.get(fqdn="Evil.com.")
+    fqdn.description = "Phishing kit."
+    fqdn.save()
+    response = api_client.get(reverse("snapshot-list"), headers=headers)
+    assert response.data["version"] == 2, "Snapshot updated on update"
+    assert response.data["count"] == 5, "Updated value counted twice"
+
+    # Rows committed after a scan with an earlier updated_at are not missed
+    late = IpAdd.objects.create(author=user, description="C2.", event=event, ip_address="203.0.113.7", expired_at="2099-01-01")
+    IpAdd.objects.filter(pk=late.pk).update(updated_at=timezone.now() - timedelta(seconds=60))
+    response = api_client.get(reverse("snapshot-list"), headers=headers)
+    assert response.data["version"] == 3, "Late row not added"
+    response = api_client.get(reverse("snapshot-download"), headers=headers)
+    assert "ip:203.0.113.7/32" in BloomFilter.from_bytes(b"".join(response.streaming_content)), "Late row missing"
+
+    # Due rebuilds are left to the build_snapshot command
+    settings.IOC_SNAPSHOT_ERROR_RATE = 0.01
+    response = api_client.get(reverse("snapshot-list"), headers=headers)
+    assert response.data["version"] == 3, "Snapshot rebuilt by a poll"
+    call_command("build_snapshot", stdout=io.StringIO())
+    response = api_client.get(reverse("snapshot-list"), headers=headers)
+    assert response.data["version"] == 4, "Snapshot not rebuilt"
+    assert response.data["error_rate"] == 0.01, "Unexpected false positive rate"
+
+    late.delete()
+    call_command("build_snapshot", "--full", stdout=io.StringIO())
+    response = api_client.get(reverse("snapshot-list"), headers=headers)
+    assert response.data["version"] == 5, "Snapshot not rebuilt"
+    assert response.data["count"] == 4, "Unexpected number of values"
+    assert not list(snapshot_dir.glob("*.tmp")), "Temporary files left behind"
+
+
+@pytest.mark.django_db
+def test_ioc_management_snapshot_api_guest(api_client, user_set_group1, snapshot_dir):
+    """Test DRF (API) snapshot download by guest user."""
+    response = api_client.get(reverse("snapshot-download"))
+    assert response.status_code == 401, "Expected 401 for guest user"
@@ -0,0 +1,74 @@
+"""Test DRF (API) streaming plain text and CSV feeds."""
+
+import pytest
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import FQDN, Hash, IpAdd
+
+MD5 = "44D88612FEA8A8F36DE82E1278ABB02F"
+SHA256 = "275a021bbfb6489e54d471899f7db9d1663fc695ec2fe2a2c4538aabf651fd0f"
+
+
+def get_feed(api_client, url, headers):
+    """Return the lines of a streamed feed."""
+    response = api_client.get(url, headers=headers)
+    assert response.status_code == 200, f"Failed for {url}"
+    assert response.streaming, f"Feed {url} not streamed"
+    return b"".join(response.streaming_content).decode().splitlines()
+
+
+@pytest.mark.django_db
+def test_ioc_management_feed_api_user(api_client, user_set_group1):
+    """Test DRF (API) feeds default filters, request filters and formats."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    attributes = {"author": user, "event": event, "description": "Feed.", "expired_at": "2099-01-01"}
+
+    IpAdd.objects.create(ip_address="192.0.2.10", validation_status="approved", confidence="high", **attributes)
+    IpAdd.objects.create(ip_address="198.51.100.0", prefix_length=24, validation_status="approved", **attributes)
+    IpAdd.objects.create(
+        ip_address="203.0.113.8", ip_address_end="203.0.113.11", validation_status="approved", **attributes
+    )
+    IpAdd.objects.create(ip_address="192.0.2.20", validation_status="new", **attributes)
+    IpAdd.objects.create(
+        ip_address="192.0.2.30", validation_status="approved", **{**attributes, "expired_at": "2000-01-01"}
+    )
+    FQDN.objects.create(fqdn="Evil.COM.", validation_status="approved", **attributes)
+    Hash.objects.create(filename="eicar.com", md5=MD5, sha256=SHA256, validation_status="approved", **attributes)
+
+    lines = get_feed(api_client, reverse("ipadd_feed_txt"), headers)
+    assert sorted(lines) == ["192.0.2.10", "198.51.100.0/24", "203.0.113.8/30"], "Unexpected IpAdd feed"
+
+    lines = get_feed(api_client, reverse("ipadd_feed_txt") + "?confidence=high", headers)
+    assert lines == ["192.0.2.10"], "Filter not honoured"
+    lines = get_feed(api_client, reverse("ipadd_feed_txt") + "?validation_status=new", headers)
+    assert lines == ["192.0.2.20"], "Validation status filter not honoured"
+    lines = get_feed(api_client, reverse("ipadd_feed_txt") + "?expiration=expired", headers)
+    assert lines == ["192.0.2.30"], "Expiration filter not honoured"
+
+    lines = get_feed(api_client, reverse("ipadd_feed_csv") + "?confidence=high", headers)
+    assert lines == ["network,confidence,validation_status,expired_at,event", f"192.0.2.10,high,approved,2099-01-01,{event.pk}"]
+
+    lines = get_feed(api_client, reverse("fqdn_feed_txt"), headers)
+    assert lines == ["evil.com"], "Unexpected FQDN feed"
+    lines = get_feed(api_client, reverse("fqdn_feed_csv"), headers)
+    assert lines[1].startswith("evil.com,low,approved,2099-01-01,"), "Unexpected FQDN CSV feed"
+
+    lines = get_feed(api_client, reverse("hash_feed_txt"), headers)
+    assert lines == [MD5.lower(), SHA256], "Unexpected Hash feed"
+    lines = get_feed(api_client, reverse("hash_feed_csv"), headers)
+    assert lines[0].startswith("filename,md5,sha1,sha256,"), "Unexpected Hash CSV header"
+    assert lines[1].startswith(f"eicar.com,{MD5},,{SHA256},"), "Unexpected Hash CSV row"
+
+    response = api_client.get(reverse("ipadd_feed_txt") + "?within=not-a-network", headers=headers)
+    assert response.status_code == 400, "Expected 400 for invalid filter"
+
+
+@pytest.mark.django_db
+def test_ioc_management_feed_api_guest(api_client, user_set_group1):
+    """Test DRF (API) feeds by guest user."""
+    for name in ("ipadd_feed_txt", "fqdn_feed_csv", "hash_feed_txt"):
+        response = api_client.get(reverse(name))
+        assert response.status_code == 401, f"Expected 401 for guest user on {name}"
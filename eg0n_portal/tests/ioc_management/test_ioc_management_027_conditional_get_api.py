@@ -0,0 +1,66 @@
+"""Test DRF (API) conditional GET on lists and feeds."""
+
+import pytest
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import IpAdd
+
+
+@pytest.mark.django_db
+def test_ioc_management_conditional_get_api_user(api_client, user_set_group1):
+    """Test DRF (API) ETag validators and 304 responses."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01"}
+    ipadd = IpAdd.objects.create(ip_address="192.0.2.10", validation_status="approved", **attributes)
+
+    for url in (reverse("ipadd-list"), reverse("ipadd_feed_txt"), reverse("event-list")):
+        response = api_client.get(url, headers=headers)
+        assert response.status_code == 200, f"Failed for {url}"
+        etag = response["ETag"]
+        assert "Last-Modified" not in response, f"Last-Modified sent for {url}"
+
+        response = api_client.get(url, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 304, f"Expected 304 for unchanged {url}"
+        assert response["ETag"] == etag, f"ETag not returned for {url}"
+
+    url = reverse("ipadd-list")
+    response = api_client.get(url, headers=headers)
+    etag = response["ETag"]
+    response = api_client.get(f"{url}?confidence=high", headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200, "ETag shared across filter sets"
+
+    # Updates and deletions change the validator
+    ipadd.confidence = "high"
+    ipadd.save()
+    response = api_client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200, "Expected 200 after update"
+    etag = response["ETag"]
+    ipadd.delete()
+    response = api_client.get(url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200, "Expected 200 after delete"
+
+
+@pytest.mark.django_db
+def test_ioc_management_conditional_get_if_modified_since_api_user(api_client, user_set_group1):
+    """Test DRF (API) If-Modified-Since polls do not get stale 304 after deletions."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01"}
+    IpAdd.objects.create(ip_address="192.0.2.10", validation_status="approved", **attributes)
+    ipadd = IpAdd.objects.create(ip_address="192.0.2.11", validation_status="approved", **attributes)
+    since = "Fri, 01 Jan 2100 00:00:00 GMT"
+
+    for url in (reverse("ipadd-list"), reverse("ipadd_feed_txt")):
+        response = api_client.get(url, headers={**headers, "If-Modified-Since": since})
+        assert response.status_code == 200, f"Expected 200 for {url}"
+    ipadd.delete()
+    for url in (reverse("ipadd-list"), reverse("ipadd_feed_txt")):
+        response = api_client.get(url, headers={**headers, "If-Modified-Since": since})
+        assert response.status_code == 200, f"Expected 200 after delete for {url}"
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        assert b"192.0.2.11" not in body, f"Deleted row listed by {url}"
@@ -0,0 +1,91 @@
+"""Test DRF (API) change log with tombstones."""
+
+import io
+from datetime import timedelta
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from ioc_management.models import Change, FQDN, IpAdd
+
+
+@pytest.mark.django_db
+def test_ioc_management_changes_api_user(api_client, user_set_group1):
+    """Test DRF (API) ordered upserts, tombstones and cursor batches."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    url = reverse("changes-list")
+
+    response = api_client.get(url, headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    cursor = response.data["cursor"]
+
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01"}
+    ipadd = IpAdd.objects.create(ip_address="192.0.2.10", **attributes)
+    fqdn = FQDN.objects.create(fqdn="evil.com", **attributes)
+    fqdn_pk = fqdn.pk
+    ipadd.confidence = "high"
+    ipadd.save()
+    fqdn.delete()
+
+    response = api_client.get(f"{url}?since={cursor}", headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    results = [(r["model"], r["action"], r["id"]) for r in response.data["results"]]
+    assert results == [("ipadd", "upsert", ipadd.pk), ("fqdn", "delete", fqdn_pk)], "Unexpected changes"
+    assert response.data["results"][0]["data"]["confidence"] == "high", "Current object not returned"
+    assert response.data["results"][1]["data"] is None, "Tombstone with data"
+    assert response.data["more"] is False, "Unexpected more flag"
+    last = response.data["cursor"]
+
+    # Batches
+    response = api_client.get(f"{url}?since={cursor}&limit=1", headers=headers)
+    assert response.data["more"] is True, "Expected more changes"
+    assert len(response.data["results"]) == 1, "Limit not honoured"
+    response = api_client.get(f"{url}?since={last}", headers=headers)
+    assert response.data["results"] == [] and response.data["cursor"] == last, "Unexpected changes after cursor"
+
+    # Sequence gaps (e.g. rolled back inserts) are not pruned changes
+    Change.objects.filter(id__lte=cursor + 1).delete()
+    response = api_client.get(f"{url}?since={cursor}", headers=headers)
+    assert response.status_code == 200, "Sequence gap taken for pruned changes"
+
+    # Pruned changes require a resync
+    Change.objects.update(created_at=timezone.now() - timedelta(days=365))
+    IpAdd.objects.create(ip_address="192.0.2.11", **attributes)
+    call_command("prune_changes", stdout=io.StringIO())
+    response = api_client.get(f"{url}?since={cursor}", headers=headers)
+    assert response.status_code == 410, "Expected 410 for pruned cursor"
+
+
+@pytest.mark.django_db
+def test_ioc_management_changes_api_queries(api_client, user_set_group1):
+    """Test DRF (API) change batches fetch related objects per model, not per row."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    url = reverse("changes-list")
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01"}
+
+    counts = []
+    for i in range(2):
+        cursor = api_client.get(url, headers=headers).data["cursor"]
+        for j in range(5 * (i + 1)):
+            IpAdd.objects.create(ip_address=f"192.0.{i}.{j}", **attributes).contributors.add(user)
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(f"{url}?since={cursor}", headers=headers)
+        assert response.data["results"][0]["data"]["contributors"] == [user.pk], "Contributors not returned"
+        counts.append(len(context.captured_queries))
+    assert counts[0] == counts[1], "Queries grow with the number of changes"
+
+
+@pytest.mark.django_db
+def test_ioc_management_changes_api_guest(api_client, user_set_group1):
+    """Test DRF (API) change log by guest user."""
+    response = api_client.get(reverse("changes-list"))
+    assert response.status_code == 401, "Expected 401 for guest user"
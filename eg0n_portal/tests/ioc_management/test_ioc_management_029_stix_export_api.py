@@ -0,0 +1,66 @@
+"""Test DRF (API) streaming STIX 2.1 export."""
+
+import io
+import json
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import CodeSnippet, FQDN, Hash, IpAdd, Vuln
+
+SHA256 = "275a021bbfb6489e54d471899f7db9d1663fc695ec2fe2a2c4538aabf651fd0f"
+
+
+@pytest.mark.django_db
+def test_ioc_management_stix_export_api_user(api_client, user_set_group1):
+    """Test DRF (API) STIX 2.1 bundle per event and global."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    attributes = {"author": user, "event": event, "description": "Campaign.", "expired_at": "2099-01-01"}
+
+    ipadd = IpAdd.objects.create(ip_address="203.0.113.8", ip_address_end="203.0.113.12", confidence="high", **attributes)
+    FQDN.objects.create(fqdn="*.Evil.com", **attributes)
+    Hash.objects.create(filename="eicar.com", sha256=SHA256, **attributes)
+    Vuln.objects.create(author=user, event=event, cve="CVE-2024-3400", cvss=10.0, description="RCE.", name="PAN-OS")
+    CodeSnippet.objects.create(code="whoami", name="Recon", language="bash", **attributes)
+    # Skipped by the converter: no object, no reference
+    Hash.objects.create(filename="unknown.bin", md5="not a digest", **attributes)
+
+    response = api_client.get(reverse("event-stix", args=[event.pk]), headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert response["Content-Type"].startswith("application/stix+json"), "Unexpected content type"
+    bundle = json.loads(b"".join(response.streaming_content))
+    assert bundle["type"] == "bundle", "Not a STIX bundle"
+    objects = {obj["id"]: obj for obj in bundle["objects"]}
+    assert len(objects) == 6, "Unexpected number of objects"
+
+    indicator = objects[f"indicator--{ipadd.pk}"]
+    assert indicator["pattern"] == "[ipv4-addr:value = '203.0.113.8/30' OR ipv4-addr:value = '203.0.113.12/32']"
+    assert indicator["confidence"] == 85, "Confidence not mapped"
+    assert indicator["valid_until"] == "2099-01-01T00:00:00.000Z", "Expiration not mapped"
+    patterns = {obj["pattern"] for obj in bundle["objects"] if obj["type"] == "indicator"}
+    assert "[domain-name:value LIKE '%.evil.com']" in patterns, "Wildcard FQDN not mapped"
+    assert f"[file:hashes.'SHA-256' = '{SHA256}']" in patterns, "Hash not mapped"
+
+    report = objects[f"report--{event.pk}"]
+    assert len(report["object_refs"]) == 5, "Unexpected report references"
+    assert set(report["object_refs"]) <= set(objects), "Dangling report references"
+
+    response = api_client.get(reverse("event-stix-bundle"), headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    bundle = json.loads(b"".join(response.streaming_content))
+    reports = [obj for obj in bundle["objects"] if obj["type"] == "report"]
+    assert len(reports) == user.events.model.objects.count(), "Unexpected number of reports"
+
+    output = io.StringIO()
+    call_command("export_stix", "--event", str(event.pk), stdout=output)
+    assert len(json.loads(output.getvalue())["objects"]) == 6, "Unexpected command output"
+
+
+@pytest.mark.django_db
+def test_ioc_management_stix_export_api_guest(api_client, user_set_group1):
+    """Test DRF (API) STIX 2.1 export by guest user."""
+    response = api_client.get(reverse("event-stix-bundle"))
+    assert response.status_code == 401, "Expected 401 for guest user"
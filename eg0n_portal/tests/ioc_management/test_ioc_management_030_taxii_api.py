@@ -0,0 +1,82 @@
+"""Test DRF (API) TAXII 2.1 server."""
+
+import base64
+import pytest
+from django.urls import reverse
+from ioc_management.models import FQDN, Hash, IpAdd
+from ioc_management.taxii import collection_id
+
+
+@pytest.mark.django_db
+def test_ioc_management_taxii_api_user(api_client, user_set_group1):
+    """Test DRF (API) TAXII discovery, collections and paginated objects."""
+    user = user_set_group1["user"]
+    user.set_password("taxii-secret")
+    user.save()
+    event = user.events.all().first()
+    credentials = base64.b64encode(f"{user.username}:taxii-secret".encode()).decode()
+    headers = {"Authorization": f"Basic {credentials}", "Accept": "application/taxii+json;version=2.1"}
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01"}
+
+    response = api_client.get(reverse("taxii_discovery"), headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert response["Content-Type"].startswith("application/taxii+json"), "Unexpected content type"
+    assert response.data["api_roots"][0].endswith(reverse("taxii_api_root")), "Unexpected API root"
+    response = api_client.get(reverse("taxii_api_root"), headers=headers)
+    assert response.data["versions"] == ["application/taxii+json;version=2.1"], "Unexpected versions"
+    response = api_client.get(reverse("taxii_collection_list"), headers=headers)
+    assert {c["alias"] for c in response.data["collections"]} == {"fqdn", "hash", "ipadd", "vuln"}
+
+    ipadd_ids = [
+        str(IpAdd.objects.create(ip_address=f"192.0.2.{i}", **attributes).pk) for i in range(5)
+    ]
+    FQDN.objects.create(fqdn="evil.com", **attributes)
+    pk = collection_id(IpAdd)
+    response = api_client.get(reverse("taxii_collection", args=[pk]), headers=headers)
+    assert response.data["can_read"] is True and response.data["can_write"] is False
+
+    # Keyset pagination with next
+    url = reverse("taxii_object_list", args=[pk])
+    seen = []
+    response = api_client.get(f"{url}?limit=2", headers=headers)
+    while True:
+        assert response.status_code == 200, "Failed to list objects"
+        assert len(response.data["objects"]) <= 2, "Limit not honoured"
+        seen.extend(obj["id"].split("--")[1] for obj in response.data["objects"])
+        if not response.data["more"]:
+            break
+        response = api_client.get(f"{url}?limit=2&next={response.data['next']}", headers=headers)
+    assert seen == ipadd_ids, "Objects missing or not ordered by date added"
+
+    # added_after
+    response = api_client.get(f"{url}?limit=2", headers=headers)
+    last = response["X-TAXII-Date-Added-Last"]
+    IpAdd.objects.filter(pk=ipadd_ids[0]).get().save()
+    response = api_client.get(f"{url}?added_after={last}", headers=headers)
+    assert [obj["id"].split("--")[1] for obj in response.data["objects"]] == ipadd_ids[2:] + ipadd_ids[:1]
+
+    response = api_client.get(reverse("taxii_manifest", args=[pk]), headers=headers)
+    assert len(response.data["objects"]) == 5, "Unexpected manifest"
+    Hash.objects.create(filename="eicar.com", md5="44d88612fea8a8f36de82e1278abb02f", **attributes)
+    Hash.objects.create(filename="unknown.bin", md5="not a digest", **attributes)
+    response = api_client.get(reverse("taxii_manifest", args=[collection_id(Hash)]), headers=headers)
+    assert len(response.data["objects"]) == 1, "Manifest lists skipped objects"
+    object_id = f"indicator--{ipadd_ids[3]}"
+    response = api_client.get(reverse("taxii_object", args=[pk, object_id]), headers=headers)
+    assert response.data["objects"][0]["pattern"] == "[ipv4-addr:value = '192.0.2.3/32']", "Unexpected object"
+
+    response = api_client.get(f"{url}?added_after=2024-01-01T00:00:00", headers=headers)
+    assert response.status_code == 400, "Expected 400 for added_after without offset"
+    response = api_client.get(f"{url}?next=invalid", headers=headers)
+    assert response.status_code == 400, "Expected 400 for invalid next"
+    assert response.data["http_status"] == "400", "Not a TAXII error message"
+    response = api_client.get(reverse("taxii_collection", args=[collection_id(FQDN).replace("a", "b", 1)]), headers=headers)
+    assert response.status_code == 404, "Expected 404 for unknown collection"
+
+
+@pytest.mark.django_db
+def test_ioc_management_taxii_api_guest(api_client, user_set_group1):
+    """Test DRF (API) TAXII server by guest user."""
+    response = api_client.get(reverse("taxii_discovery"))
+    assert response.status_code == 401, "Expected 401 for guest user"
+    assert response["WWW-Authenticate"].startswith("Basic"), "Expected HTTP Basic challenge"
@@ -0,0 +1,90 @@
+"""Test DRF (API) generated Suricata rules."""
+
+import os
+import pytest
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import FQDN, Hash, IpAdd
+from ioc_management.rules import build_rules
+
+MD5 = "44D88612FEA8A8F36DE82E1278ABB02F"
+
+
+@pytest.fixture
+def rules_dir(settings, tmp_path):
+    """Store generated rules in a temporary directory."""
+    settings.IOC_RULES_DIR = tmp_path
+    return tmp_path
+
+
+def get_file(api_client, name, headers):
+    """Return the lines of a generated file."""
+    response = api_client.get(reverse("rules-detail", args=[name]), headers=headers)
+    assert response.status_code == 200, f"Failed for {name}"
+    return b"".join(response.streaming_content).decode().splitlines()
+
+
+@pytest.mark.django_db
+def test_ioc_management_rules_api_user(api_client, user_set_group1, rules_dir):
+    """Test DRF (API) rule generation, download and cache invalidation."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01", "validation_status": "approved"}
+
+    IpAdd.objects.create(ip_address="192.0.2.10", confidence="high", **attributes)
+    IpAdd.objects.create(ip_address="198.51.100.0", prefix_length=24, **attributes)
+    IpAdd.objects.create(ip_address="192.0.2.20", **{**attributes, "validation_status": "new"})
+    FQDN.objects.create(fqdn="Evil.com", **attributes)
+    FQDN.objects.create(fqdn="*.wild.org", **attributes)
+    Hash.objects.create(filename="eicar.com", md5=MD5, **attributes)
+
+    response = api_client.get(reverse("rules-list"), headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert {f["name"] for f in response.data["results"]} >= {"eg0n.rules", "eg0n-fqdn.rules", "eg0n-iprep.list"}
+
+    assert sorted(get_file(api_client, "eg0n-iprep.list", headers)) == ["192.0.2.10,1,100", "198.51.100.0/24,1,40"]
+    assert get_file(api_client, "eg0n-md5.list", headers) == [MD5.lower()]
+    rules = get_file(api_client, "eg0n-fqdn.rules", headers)
+    assert len(rules) == 2, "Unexpected FQDN rules"
+    assert 'dns.query; dotprefix; content:".evil.com"; nocase; endswith;' in rules[0], "Unexpected FQDN rule"
+    assert 'dns.query; content:".wild.org"; nocase; endswith;' in rules[1], "Unexpected wildcard FQDN rule"
+    sids = [line.split("sid:")[1].split(";")[0] for line in get_file(api_client, "eg0n.rules", headers) + rules]
+    assert len(sids) == len(set(sids)), "Duplicated sids"
+
+    # Only changed sets are rebuilt
+    response = api_client.get(reverse("rules-detail", args=["eg0n-iprep.list"]), headers=headers)
+    etag = response["ETag"]
+    mtime = os.path.getmtime(rules_dir / "eg0n-fqdn.rules")
+    IpAdd.objects.create(ip_address="203.0.113.1", **attributes)
+    response = api_client.get(reverse("rules-detail", args=["eg0n-iprep.list"]), headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200, "IP reputation list not rebuilt"
+    assert "203.0.113.1,1,40" in b"".join(response.streaming_content).decode(), "New IpAdd missing"
+    assert os.path.getmtime(rules_dir / "eg0n-fqdn.rules") == mtime, "Unchanged FQDN rules rebuilt"
+    response = api_client.get(reverse("rules-detail", args=["eg0n-iprep.list"]), headers={**headers, "If-None-Match": response["ETag"]})
+    assert response.status_code == 304, "Expected 304 for unchanged list"
+
+    # Sids are stable: removing a rule does not renumber the others, renaming bumps rev
+    first, second = FQDN.objects.order_by("created_at")
+    sid = rules[1].split("sid:")[1]
+    first.delete()
+    rules = get_file(api_client, "eg0n-fqdn.rules", headers)
+    assert len(rules) == 1 and rules[0].split("sid:")[1] == sid, "FQDN rule renumbered"
+    second.fqdn = "*.wilder.org"
+    second.save()
+    rules = get_file(api_client, "eg0n-fqdn.rules", headers)
+    assert rules[0].split("sid:")[1] == sid.replace("rev:1", "rev:2"), "FQDN rule revision not bumped"
+
+    metadata = build_rules(force=True)
+    assert set(metadata) == {"fqdn", "hash", "ipadd", "static"}, "Unexpected rule sets"
+    assert not list(rules_dir.glob("*.tmp")), "Temporary files left behind"
+    response = api_client.get(reverse("rules-detail", args=["unknown.rules"]), headers=headers)
+    assert response.status_code == 404, "Expected 404 for unknown file"
+
+
+@pytest.mark.django_db
+def test_ioc_management_rules_api_guest(api_client, user_set_group1, rules_dir):
+    """Test DRF (API) generated rules by guest user."""
+    response = api_client.get(reverse("rules-detail", args=["eg0n.rules"]))
+    assert response.status_code == 401, "Expected 401 for guest user"
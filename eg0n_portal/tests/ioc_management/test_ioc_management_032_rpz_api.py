@@ -0,0 +1,160 @@
+"""Test DRF (API) DNS Response Policy Zone."""
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import FQDN
+from ioc_management.rpz import build_rpz
+
+
+@pytest.fixture
+def rpz_dir(settings, tmp_path):
+    """Store the zone in a temporary directory."""
+    settings.IOC_RPZ_DIR = tmp_path
+    return tmp_path
+
+
+def get_text(response):
+    """Return the lines of a zone response."""
+    content = b"".join(response.streaming_content) if response.streaming else response.content
+    return content.decode().splitlines()
+
+
+def get_records(lines):
+    """Return the records of a zone, without header."""
+    return [line for line in lines if line[0] not in "$@"]
+
+
+@pytest.mark.django_db
+def test_ioc_management_rpz_api_user(api_client, user_set_group1, rpz_dir):
+    """Test DRF (API) zone transfers and serials."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01", "confidence": "high", "validation_status": "approved"}
+
+    FQDN.objects.create(fqdn="Evil.com.", **attributes)
+    FQDN.objects.create(fqdn="*.evil.com", **attributes)
+    FQDN.objects.create(fqdn="evil-x.com", **attributes)
+    FQDN.objects.create(fqdn="*.wild.org", **attributes)
+    removed = FQDN.objects.create(fqdn="old.net", **attributes)
+    FQDN.objects.create(fqdn="low.net", **{**attributes, "confidence": "low"})
+    FQDN.objects.create(fqdn="new.net", **{**attributes, "validation_status": "new"})
+    FQDN.objects.create(fqdn="expired.net", **{**attributes, "expired_at": "2000-01-01"})
+    FQDN.objects.create(fqdn="bad name.net", **attributes)
+
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(reverse("rpz-list"), headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    ordered = [query["sql"] for query in context.captured_queries if "ORDER BY" in query["sql"]]
+    assert ordered and all("COLLATE" in sql for sql in ordered), "Keys not sorted with a binary collation"
+    serial = response.data["serial"]
+    assert response.data["count"] == 7, "Unexpected record count"
+
+    response = api_client.get(reverse("rpz-zone"), headers=headers)
+    assert response.status_code == 200, "Zone download failed"
+    lines = get_text(response)
+    assert lines[0] == "$ORIGIN eg0n.rpz.", "Unexpected origin"
+    assert f"({serial} " in lines[2], "Unexpected SOA serial"
+    # Sorted by reversed labels (com.evil < com.evil-x < com.evil-x.* < com.evil.*)
+    assert get_records(lines) == [
+        "evil.com CNAME .",
+        "evil-x.com CNAME .",
+        "*.evil-x.com CNAME .",
+        "*.evil.com CNAME .",
+        "old.net CNAME .",
+        "*.old.net CNAME .",
+        "*.wild.org CNAME .",
+    ], "Unexpected zone records"
+    response = api_client.get(reverse("rpz-zone"), headers={**headers, "If-None-Match": response["ETag"]})
+    assert response.status_code == 304, "Expected 304 for current serial"
+
+    # Up to date: the answer is the current SOA only
+    response = api_client.get(reverse("rpz-ixfr"), {"serial": serial}, headers=headers)
+    assert response["X-RPZ-Transfer"] == "ixfr", "Expected incremental transfer"
+    assert len(get_text(response)) == 3, "Expected SOA only"
+
+    # Unlisted changes keep the serial
+    FQDN.objects.filter(fqdn="low.net").update(description="Changed.")
+    FQDN.objects.get(fqdn="low.net").save()
+    assert api_client.get(reverse("rpz-list"), headers=headers).data["serial"] == serial, "Serial changed"
+
+    removed.delete()
+    FQDN.objects.create(fqdn="fresh.io", **attributes)
+    response = api_client.get(reverse("rpz-list"), headers=headers)
+    new_serial = response.data["serial"]
+    assert new_serial > serial, "Serial not increased"
+    assert response.data["ixfr_serials"] == [serial], "Unexpected incremental serials"
+
+    response = api_client.get(reverse("rpz-ixfr"), {"serial": serial}, headers=headers)
+    assert response.status_code == 200, "Incremental transfer failed"
+    assert response["X-RPZ-Transfer"] == "ixfr", "Expected incremental transfer"
+    lines = get_text(response)[2:]
+    assert [line.split("(")[1].split()[0] if "SOA" in line else line for line in lines] == [
+        str(new_serial),
+        str(serial),
+        "old.net CNAME .",
+        "*.old.net CNAME .",
+        str(new_serial),
+        "fresh.io CNAME .",
+        "*.fresh.io CNAME .",
+        str(new_serial),
+    ], "Unexpected difference sequence"
+
+    # Unknown serial: whole zone
+    response = api_client.get(reverse("rpz-ixfr"), {"serial": 1}, headers=headers)
+    assert response["X-RPZ-Transfer"] == "axfr", "Expected full transfer"
+    assert len(get_records(get_text(response))) == 7, "Unexpected zone records"
+    response = api_client.get(reverse("rpz-ixfr"), {"serial": "x"}, headers=headers)
+    assert response.status_code == 400, "Expected 400 for invalid serial"
+
+    call_command("build_rpz", "--force")
+    assert api_client.get(reverse("rpz-list"), headers=headers).data["serial"] == new_serial, "Serial changed"
+    assert not list(rpz_dir.glob("*.tmp")), "Temporary files left behind"
+
+
+@pytest.mark.django_db
+def test_ioc_management_rpz_transfer_build_api(api_client, user_set_group1, rpz_dir, settings):
+    """Test DRF (API) transfers in progress are not affected by concurrent builds."""
+    settings.IOC_RPZ_MAX_DIFFS = 1
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01", "confidence": "high", "validation_status": "approved"}
+
+    FQDN.objects.create(fqdn="first.com", **attributes)
+    serial = build_rpz()["serial"]
+    FQDN.objects.create(fqdn="second.com", **attributes)
+    new_serial = build_rpz()["serial"]
+
+    # The difference expires while being streamed
+    response = api_client.get(reverse("rpz-ixfr"), {"serial": serial}, headers=headers)
+    assert response["X-RPZ-Transfer"] == "ixfr", "Expected incremental transfer"
+    chunks = iter(response.streaming_content)
+    first = next(chunks)
+    FQDN.objects.create(fqdn="third.com", **attributes)
+    metadata = build_rpz()
+    assert metadata["diffs"] == [[new_serial, metadata["serial"]]], "Difference not expired"
+    assert not list(rpz_dir.glob(f"eg0n-{serial}-*.ixfr")), "Difference not removed"
+    text = (first + b"".join(chunks)).decode()
+    assert "second.com CNAME ." in text and "third.com" not in text, "Unexpected difference sequence"
+
+    # The zone is replaced while being streamed
+    response = api_client.get(reverse("rpz-zone"), headers=headers)
+    FQDN.objects.create(fqdn="fourth.com", **attributes)
+    assert build_rpz()["serial"] > int(response["X-RPZ-Serial"]), "Zone not rebuilt"
+    lines = get_text(response)
+    assert f"({response['X-RPZ-Serial']} " in lines[2], "Zone of another serial"
+    assert "fourth.com CNAME ." not in lines, "Zone of another serial"
+
+
+@pytest.mark.django_db
+def test_ioc_management_rpz_api_guest(api_client, user_set_group1, rpz_dir):
+    """Test DRF (API) zone transfers by guest user."""
+    response = api_client.get(reverse("rpz-zone"))
+    assert response.status_code == 401, "Expected 401 for guest user"
@@ -0,0 +1,73 @@
+"""Test DRF (API) bulk attribute creation."""
+
+import pytest
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import Change, Event, FQDN, Hash, HashDigest, IpAdd
+
+MD5 = "44D88612FEA8A8F36DE82E1278ABB02F"
+
+
+@pytest.mark.django_db
+def test_ioc_management_bulk_create_api_user(api_client, user_set_group1, django_assert_max_num_queries):
+    """Test DRF (API) bulk creation with per-item errors, derived columns and change log."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    attributes = {"event": str(event.pk), "description": "C2.", "expired_at": "2099-01-01"}
+
+    # Load the IP matcher index, it must see bulk created objects
+    response = api_client.post(reverse("match-ip"), {"addresses": ["198.51.100.7"]}, format="json", headers=headers)
+    assert response.data["results"] == [], "Unexpected match"
+    updated_at = Event.objects.get(pk=event.pk).updated_at
+    cursor = Change.objects.order_by("-id").values_list("id", flat=True).first() or 0
+
+    payload = [
+        {"ip_address": "192.0.2.10", **attributes},
+        {"ip_address": "not an address", **attributes},
+        {"ip_address": "198.51.100.0", "prefix_length": 24, **attributes},
+        {"ip_address": "192.0.2.20", **attributes, "event": "00000000-0000-0000-0000-000000000000"},
+    ] + [{"ip_address": f"203.0.113.{i}", **attributes} for i in range(50)]
+    with django_assert_max_num_queries(20):
+        response = api_client.post(reverse("ipadd-list"), payload, format="json", headers=headers)
+    assert response.status_code == 201, f"Failed for user {user.username}"
+    assert response.data["count"] == 52, "Unexpected created count"
+    assert [item["index"] for item in response.data["errors"]] == [1, 3], "Unexpected errors"
+    assert "ip_address" in response.data["errors"][0]["errors"], "Field error not returned"
+    assert "event" in response.data["errors"][1]["errors"], "Event error not returned"
+    created = {item["index"]: item["id"] for item in response.data["results"]}
+    assert set(created) == {0, 2, *range(4, 54)}, "Unexpected created indexes"
+
+    ipadd = IpAdd.objects.get(pk=created[2])
+    assert ipadd.author == user, "Author not set"
+    assert ipadd.range_start and ipadd.range_end > ipadd.range_start, "Range bounds not computed"
+    assert Event.objects.get(pk=event.pk).updated_at > updated_at, "Event not touched"
+    changes = Change.objects.filter(id__gt=cursor)
+    assert changes.filter(model="ipadd").count() == 52, "Changes not logged"
+    assert changes.filter(model="event").count() == 1, "Event change not logged once"
+    response = api_client.post(reverse("match-ip"), {"addresses": ["198.51.100.7"]}, format="json", headers=headers)
+    assert response.data["results"][0]["matches"][0]["id"] == ipadd.pk, "Matcher not updated"
+
+    response = api_client.post(reverse("fqdn-list"), [{"fqdn": "A.Evil.com", **attributes}], format="json", headers=headers)
+    assert response.status_code == 201, "FQDN bulk creation failed"
+    assert FQDN.objects.get(fqdn="A.Evil.com").fqdn_reversed == "com.evil.a", "Reversed labels not computed"
+
+    response = api_client.post(reverse("hash-list"), [{"filename": "eicar.com", "md5": MD5, **attributes}], format="json", headers=headers)
+    assert response.status_code == 201, "Hash bulk creation failed"
+    hash_obj = Hash.objects.get(filename="eicar.com")
+    assert HashDigest.objects.filter(hash=hash_obj, algorithm="md5").exists(), "Digests not indexed"
+
+    # Nothing valid, nothing created
+    response = api_client.post(reverse("fqdn-list"), [{"fqdn": "b.evil.com"}], format="json", headers=headers)
+    assert response.status_code == 400, "Expected 400 without valid items"
+    assert response.data["count"] == 0, "Unexpected created count"
+    response = api_client.post(reverse("fqdn-list"), [], format="json", headers=headers)
+    assert response.status_code == 400, "Expected 400 for empty list"
+
+
+@pytest.mark.django_db
+def test_ioc_management_bulk_create_api_guest(api_client, user_set_group1):
+    """Test DRF (API) bulk creation by guest user."""
+    response = api_client.post(reverse("ipadd-list"), [{"ip_address": "192.0.2.10"}], format="json")
+    assert response.status_code == 401, "Expected 401 for guest user"
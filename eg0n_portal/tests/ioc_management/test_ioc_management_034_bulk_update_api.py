@@ -0,0 +1,62 @@
+"""Test DRF (API) bulk attribute updates."""
+
+import pytest
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import Change, FQDN, IpAdd
+
+
+@pytest.mark.django_db
+def test_ioc_management_bulk_update_api_user(api_client, user_set_group1, settings):
+    """Test DRF (API) bulk updates by ids and by filter."""
+    settings.IOC_BULK_BATCH_SIZE = 2
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    url = reverse("ipadd-bulk")
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01"}
+    ipadds = [IpAdd.objects.create(ip_address=f"192.0.2.{i}", **attributes) for i in range(5)]
+    other = FQDN.objects.create(fqdn="evil.com", **attributes)
+
+    # Load the IP matcher index, it must see bulk updates
+    response = api_client.post(reverse("match-ip"), {"addresses": ["192.0.2.0"]}, format="json", headers=headers)
+    assert response.data["results"][0]["matches"][0]["validation_status"] == "new", "Unexpected match"
+    cursor = Change.objects.order_by("-id").values_list("id", flat=True).first()
+
+    payload = {"ids": [str(ipadds[0].pk), str(ipadds[1].pk), str(ipadds[2].pk)], "data": {"validation_status": "approved"}}
+    response = api_client.patch(url, payload, format="json", headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert response.data["count"] == 3, "Unexpected updated count"
+    assert IpAdd.objects.filter(validation_status="approved").count() == 3, "Objects not updated"
+    assert IpAdd.objects.get(pk=ipadds[0].pk).updated_at > ipadds[0].updated_at, "updated_at not moved"
+    assert Change.objects.filter(id__gt=cursor, model="ipadd").count() == 3, "Changes not logged"
+    response = api_client.post(reverse("match-ip"), {"addresses": ["192.0.2.0"]}, format="json", headers=headers)
+    assert response.data["results"][0]["matches"][0]["validation_status"] == "approved", "Matcher not updated"
+
+    # Selected by filter, across batches, objects leaving the selection
+    payload = {"filter": {"validation_status": "new"}, "data": {"validation_status": "suspended", "confidence": "high"}}
+    response = api_client.patch(url, payload, format="json", headers=headers)
+    assert response.status_code == 200, "Filtered update failed"
+    assert response.data["count"] == 2, "Unexpected updated count"
+    assert IpAdd.objects.filter(validation_status="suspended", confidence="high").count() == 2, "Objects not updated"
+    assert FQDN.objects.get(pk=other.pk).validation_status == "new", "Other model updated"
+
+    response = api_client.patch(url, {"ids": [str(ipadds[0].pk)], "data": {"ip_address": "198.51.100.1"}}, format="json", headers=headers)
+    assert response.status_code == 400, "Expected 400 for field not allowed"
+    response = api_client.patch(url, {"ids": [str(ipadds[0].pk)], "data": {"confidence": "extreme"}}, format="json", headers=headers)
+    assert response.status_code == 400, "Expected 400 for invalid value"
+    response = api_client.patch(url, {"filter": {"validaton_status": "new"}, "data": {"confidence": "medium"}}, format="json", headers=headers)
+    assert response.status_code == 400, "Expected 400 for unknown filter"
+    response = api_client.patch(url, {"data": {"confidence": "medium"}}, format="json", headers=headers)
+    assert response.status_code == 400, "Expected 400 without selection"
+    assert not IpAdd.objects.filter(confidence="medium").exists(), "Objects updated by invalid requests"
+    response = api_client.patch(reverse("vuln-bulk"), {"filter": {"cve": "x"}, "data": {"cvss": 1}}, format="json", headers=headers)
+    assert response.status_code == 405, "Expected 405 for Vuln"
+
+
+@pytest.mark.django_db
+def test_ioc_management_bulk_update_api_guest(api_client, user_set_group1):
+    """Test DRF (API) bulk updates by guest user."""
+    response = api_client.patch(reverse("ipadd-bulk"), {"filter": {"validation_status": "new"}, "data": {"confidence": "low"}}, format="json")
+    assert response.status_code == 401, "Expected 401 for guest user"
@@ -0,0 +1,83 @@
+"""Test DRF (API) and HTML (UI) bulk deletion."""
+
+import json
+import pytest
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import Change, Event, FQDN, IpAdd
+from ioc_management.views import EventBulkDeleteView
+
+
+def get_progress(response):
+    """Return the progress lines of a bulk deletion."""
+    return [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+
+
+@pytest.mark.django_db
+def test_ioc_management_bulk_delete_api_user(api_client, user_set_group1, settings):
+    """Test DRF (API) bulk deletion by ids and by filter, by batches."""
+    settings.IOC_BULK_BATCH_SIZE = 2
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    url = reverse("ipadd-bulk")
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01"}
+    ipadds = [IpAdd.objects.create(ip_address=f"192.0.2.{i}", **attributes) for i in range(5)]
+    IpAdd.objects.filter(pk__in=[ipadds[3].pk, ipadds[4].pk]).update(validation_status="approved")
+    cursor = Change.objects.order_by("-id").values_list("id", flat=True).first()
+
+    response = api_client.delete(url, {"ids": [str(ipadds[0].pk), str(ipadds[1].pk), str(ipadds[2].pk)]}, format="json", headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert IpAdd.objects.count() == 2, "Deletion depends on the response being read"
+    assert get_progress(response) == [
+        {"deleted": 2, "total": 3},
+        {"deleted": 3, "total": 3},
+        {"deleted": 3, "total": 3, "done": True},
+    ], "Unexpected progress"
+    assert IpAdd.objects.count() == 2, "Objects not deleted"
+    assert Change.objects.filter(id__gt=cursor, model="ipadd", action="delete").count() == 3, "Tombstones not logged"
+
+    response = api_client.delete(url, {"filter": {"validation_status": "new"}}, format="json", headers=headers)
+    assert get_progress(response)[-1] == {"deleted": 0, "total": 0, "done": True}, "Unexpected deletion"
+    response = api_client.delete(url, {"filter": {"validation_status": "approved"}}, format="json", headers=headers)
+    assert get_progress(response)[-1]["deleted"] == 2, "Filtered objects not deleted"
+    response = api_client.delete(url, {"filter": {"unknown": "x"}}, format="json", headers=headers)
+    assert response.status_code == 400, "Expected 400 for unknown filter"
+
+    # Events are deleted after their attributes
+    FQDN.objects.create(fqdn="evil.com", **attributes)
+    IpAdd.objects.create(ip_address="192.0.2.10", **attributes)
+    response = api_client.delete(reverse("event-bulk"), {"ids": [str(event.pk)]}, format="json", headers=headers)
+    assert get_progress(response)[-1] == {"deleted": 1, "total": 1, "done": True}, "Event not deleted"
+    assert not Event.objects.filter(pk=event.pk).exists(), "Event not deleted"
+    assert not FQDN.objects.exists() and not IpAdd.objects.exists(), "Attributes not deleted"
+
+
+@pytest.mark.django_db
+def test_ioc_management_bulk_delete_api_guest(api_client, user_set_group1):
+    """Test DRF (API) bulk deletion by guest user."""
+    response = api_client.delete(reverse("ipadd-bulk"), {"filter": {"validation_status": "new"}}, format="json")
+    assert response.status_code == 401, "Expected 401 for guest user"
+
+
+@pytest.mark.django_db
+def test_ioc_management_bulk_delete_html_user(client, user_set_group1, monkeypatch):
+    """Test HTML (UI) bulk deletion with capped preview."""
+    monkeypatch.setattr(EventBulkDeleteView, "preview_size", 2)
+    user = user_set_group1["user"]
+    client.force_login(user)
+    events = [Event.objects.create(name=f"Event {i}", author=user, description="Event.") for i in range(3)]
+    ids = [str(event.pk) for event in events]
+    url = reverse("event_bulkdelete")
+
+    response = client.post(url, {"selected_ids": ids})
+    assert response.status_code == 200, "Confirmation page not rendered"
+    assert response.context["object_count"] == 3, "Unexpected object count"
+    assert len(response.context["object_list"]) == 2, "Preview not capped"
+    assert "2 of 3 objects shown" in response.content.decode(), "Capped preview not shown"
+    assert set(response.context["selected_ids"]) == set(ids), "Selection not kept"
+
+    response = client.post(url, {"selected_ids": ids, "confirm": "1"})
+    assert response.status_code == 302, "Expected redirect after deletion"
+    assert not Event.objects.filter(pk__in=ids).exists(), "Events not deleted"
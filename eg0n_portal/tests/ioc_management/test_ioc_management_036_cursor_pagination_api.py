@@ -0,0 +1,44 @@
+"""Test DRF (API) cursor pagination."""
+
+import pytest
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import IpAdd
+
+
+@pytest.mark.django_db
+def test_ioc_management_cursor_pagination_api_user(api_client, user_set_group1):
+    """Test DRF (API) keyset pages on (created_at, id), including created_at ties."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01"}
+    for i in range(7):
+        IpAdd.objects.create(ip_address=f"192.0.2.{i}", **attributes)
+    # Same created_at for some objects: the id breaks ties
+    created_at = IpAdd.objects.order_by("created_at").first().created_at
+    IpAdd.objects.filter(ip_address__in=["192.0.2.1", "192.0.2.2", "192.0.2.3"]).update(created_at=created_at)
+    expected = [str(pk) for pk in IpAdd.objects.order_by("-created_at", "-id").values_list("id", flat=True)]
+
+    url = reverse("ipadd-list")
+    response = api_client.get(url, {"cursor": "", "per_page": 3}, headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert "count" not in response.data, "Count computed in cursor mode"
+    seen = [item["id"] for item in response.data["results"]]
+    while response.data["next"]:
+        response = api_client.get(response.data["next"], headers=headers)
+        assert response.status_code == 200, "Next page failed"
+        seen += [item["id"] for item in response.data["results"]]
+    assert seen == expected, "Pages skipped or repeated objects"
+
+    # Filters apply
+    IpAdd.objects.filter(ip_address="192.0.2.3").update(validation_status="approved")
+    response = api_client.get(url, {"cursor": "", "validation_status": "approved"}, headers=headers)
+    assert [item["ip_address"] for item in response.data["results"]] == ["192.0.2.3"], "Filter not applied"
+    response = api_client.get(url, {"cursor": "invalid"}, headers=headers)
+    assert response.status_code == 404, "Expected 404 for invalid cursor"
+
+    # Page numbers stay the default
+    response = api_client.get(url, {"per_page": 3, "page": 3}, headers=headers)
+    assert response.data["count"] == 7, "Page number mode changed"
@@ -0,0 +1,45 @@
+"""Test DRF (API) sparse fieldsets."""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import IpAdd
+
+
+@pytest.mark.django_db
+def test_ioc_management_sparse_fields_api_user(api_client, user_set_group1):
+    """Test DRF (API) fields and exclude parameters, in responses and in SQL."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    attributes = {"author": user, "event": event, "description": "Long description.", "expired_at": "2099-01-01"}
+    ipadd = IpAdd.objects.create(ip_address="192.0.2.10", **attributes)
+    url = reverse("ipadd-list")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url, {"fields": "id,ip_address"}, headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert response.data["results"] == [{"id": str(ipadd.pk), "ip_address": "192.0.2.10"}], "Unexpected fields"
+    sql = [query["sql"] for query in queries.captured_queries if '"ipadd"."ip_address"' in query["sql"]]
+    assert sql and '"description"' not in sql[0], "Dropped column read"
+    assert not any("contributors" in query["sql"] for query in queries.captured_queries), "Dropped relation read"
+
+    response = api_client.get(url, {"exclude": "description,contributors"}, headers=headers)
+    item = response.data["results"][0]
+    assert "description" not in item and "contributors" not in item, "Excluded fields returned"
+    assert item["ip_address"] == "192.0.2.10" and "confidence" in item, "Other fields not returned"
+
+    response = api_client.get(reverse("ipadd-detail", args=[ipadd.pk]), {"fields": "ip_address"}, headers=headers)
+    assert response.data == {"ip_address": "192.0.2.10"}, "Unexpected detail fields"
+
+    # Events prefetch their contributors, unless excluded
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(reverse("event-list"), {"fields": "id,name"}, headers=headers)
+    assert set(response.data["results"][0]) == {"id", "name"}, "Unexpected event fields"
+    assert not any("contributors" in query["sql"] for query in queries.captured_queries), "Prefetch not skipped"
+
+    response = api_client.get(url, {"fields": "ip_address,unknown"}, headers=headers)
+    assert response.status_code == 400, "Expected 400 for unknown field"
@@ -0,0 +1,77 @@
+"""Test DRF (API) fast JSON rendering and values() list serialization."""
+
+import json
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import Event, IpAdd
+from ioc_management.serializers import EventSerializer, IpAddSerializer
+from ui import renderers
+from ui.include.serializers import ValuesListSerializer
+
+
+@pytest.mark.django_db
+def test_ioc_management_fast_json_api_user(api_client, user_set_group1, monkeypatch):
+    """Test DRF (API) values() lists return the ModelSerializer data, with and without orjson."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    attributes = {"author": user, "event": event, "description": "Café C2.", "expired_at": "2099-01-01"}
+    for i in range(3):
+        ipadd = IpAdd.objects.create(ip_address=f"192.0.2.{i}", **attributes)
+        ipadd.contributors.add(user)
+    IpAdd.objects.create(ip_address="198.51.100.0", prefix_length=24, **attributes)
+
+    url = reverse("ipadd-list")
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(url, headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    expected = IpAddSerializer(IpAdd.objects.filter(event__in=user.events.all()), many=True).data
+    assert response.data["results"] == expected, "values() rows serialized differently"
+    assert response.data["results"][0]["contributors"] in ([], [user.pk]), "Unexpected contributors"
+    sql = [query["sql"] for query in queries.captured_queries]
+    assert not any('FROM "auth_user"' in query for query in sql), "Contributors fetched as objects"
+    assert len([query for query in sql if 'FROM "ipadd_contributors"' in query]) == 1, "Contributors not fetched once"
+    content = response.content
+
+    # Without orjson, the same JSON is rendered by DRF
+    monkeypatch.setattr(renderers, "orjson", None)
+    response = api_client.get(url, headers=headers)
+    assert json.loads(response.content) == json.loads(content), "Renderers disagree"
+
+    # Events and sparse fieldsets
+    response = api_client.get(reverse("event-list"), headers=headers)
+    expected = EventSerializer(Event.objects.filter(pk__in=[item["id"] for item in response.data["results"]]), many=True).data
+    assert response.data["results"] == expected, "Events serialized differently"
+    response = api_client.get(url, {"fields": "id,contributors"}, headers=headers)
+    assert all(set(item) == {"id", "contributors"} for item in response.data["results"]), "Unexpected fields"
+
+    # Plans of client-chosen field sets are evicted past the cache size
+    monkeypatch.setattr(ValuesListSerializer, "plans", type(ValuesListSerializer.plans)())
+    monkeypatch.setattr(ValuesListSerializer, "max_plans", 2)
+    for fields in ("id", "id,ip_address", "id,description", "id,contributors"):
+        response = api_client.get(url, {"fields": fields}, headers=headers)
+        assert all(set(item) == set(fields.split(",")) for item in response.data["results"]), "Unexpected fields"
+    assert len(ValuesListSerializer.plans) == 2, "Plan cache not bounded"
+
+
+@pytest.mark.django_db
+def test_ioc_management_fast_json_cursor_api_user(api_client, user_set_group1):
+    """Test DRF (API) keyset pages on values() rows."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01"}
+    for i in range(5):
+        IpAdd.objects.create(ip_address=f"192.0.2.{i}", **attributes)
+
+    response = api_client.get(reverse("ipadd-list"), {"cursor": "", "per_page": 2, "fields": "ip_address"}, headers=headers)
+    seen = [item["ip_address"] for item in response.data["results"]]
+    while response.data["next"]:
+        response = api_client.get(response.data["next"], headers=headers)
+        seen += [item["ip_address"] for item in response.data["results"]]
+    assert sorted(seen) == [f"192.0.2.{i}" for i in range(5)], "Pages skipped or repeated objects"
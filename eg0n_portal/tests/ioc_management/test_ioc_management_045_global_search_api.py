@@ -0,0 +1,105 @@
+"""Test DRF (API) and HTML (UI) global searches across all indicator types."""
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from ioc_management import search
+from ioc_management.models import FQDN, CodeSnippet, Event, Hash, IpAdd, Vuln
+
+MD5 = "44d88612fea8a8f36de82e1278abb02f"
+
+
+def get_results(response):
+    """Return the (model, id) of the listed objects, in order."""
+    return [(item["model"], item["id"]) for item in response.data["results"]]
+
+
+@pytest.mark.django_db
+def test_ioc_management_global_search_api_user(api_client, client, user_set_group1):
+    """Test DRF (API) global searches detect the observable type and use its index."""
+    user = user_set_group1["user"]
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    event = Event.objects.create(author=user, name="Campaign", description="Mimikatz campaign.")
+    attributes = {"author": user, "event": event, "description": "C2.", "expired_at": "2099-01-01"}
+    address = IpAdd.objects.create(ip_address="192.0.2.1", **attributes)
+    network = IpAdd.objects.create(ip_address="192.0.2.0", prefix_length=24, **attributes)
+    IpAdd.objects.create(ip_address="198.51.100.1", **attributes)
+    domain = FQDN.objects.create(fqdn="evil.com", **attributes)
+    subdomain = FQDN.objects.create(fqdn="cdn.evil.com", **attributes)
+    FQDN.objects.create(fqdn="notevil.com", **attributes)
+    digest = Hash.objects.create(filename="a.exe", md5=MD5, **attributes)
+    vuln = Vuln.objects.create(cve="CVE-2024-0001", cvss=9.8, name="Vuln", event=event, author=user, description="Vuln.")
+    snippet = CodeSnippet.objects.create(name="Loader", code="Invoke-Mimikatz", **attributes)
+
+    url = reverse("search-list")
+    cases = [
+        ("192.0.2.1", "ip", {("ipadd", str(address.pk)), ("ipadd", str(network.pk))}),
+        ("192.0.2.128/25", "network", {("ipadd", str(network.pk))}),
+        ("hxxp://cdn.evil[.]com/payload", "fqdn", {("fqdn", str(domain.pk)), ("fqdn", str(subdomain.pk))}),
+        ("evil.com", "fqdn", {("fqdn", str(domain.pk)), ("fqdn", str(subdomain.pk))}),
+        (MD5.upper(), "hash", {("hash", str(digest.pk))}),
+        ("cve-2024-0001", "cve", {("vuln", str(vuln.pk))}),
+    ]
+    for value, observable, expected in cases:
+        with CaptureQueriesContext(connection) as context:
+            response = api_client.get(url, {"q": value}, headers=headers)
+        assert response.status_code == 200, f"Failed for user {user.username}"
+        assert response.data["observable"] == observable, f"Wrong type detected for {value}"
+        assert response.data["fulltext"] is False, f"Full-text used for {value}"
+        assert set(get_results(response)) == expected, f"Unexpected results for {value}"
+        sql = " ".join(query["sql"] for query in context.captured_queries)
+        assert "LIKE" not in sql and "MATCH" not in sql, f"Index not used for {value}"
+
+    # Free text: a single ranked full-text query across all models
+    with CaptureQueriesContext(connection) as context:
+        response = api_client.get(url, {"q": "mimikatz"}, headers=headers)
+    assert response.data["observable"] == "text"
+    assert response.data["fulltext"] is True
+    assert set(get_results(response)) == {("codesnippet", str(snippet.pk)), ("event", str(event.pk))}, "Unexpected results"
+    assert len([query for query in context.captured_queries if "MATCH" in query["sql"]]) == 1, "Not a single full-text query"
+
+    # Typed observables without a typed match fall back to full-text
+    CodeSnippet.objects.create(name="Dropper", code="curl http://203.0.113.7/x", **attributes)
+    response = api_client.get(url, {"q": "203.0.113.7"}, headers=headers)
+    assert response.data["observable"] == "ip"
+    assert response.data["fulltext"] is True
+    assert [item["name"] for item in response.data["results"]] == ["Dropper"], "No full-text fallback"
+
+    # Limits
+    response = api_client.get(url, {"q": "evil.com", "limit": 1}, headers=headers)
+    assert response.data["count"] == 1, "Limit not applied"
+    response = api_client.get(url, {"q": "evil.com", "limit": 0}, headers=headers)
+    assert response.status_code == 400, "Invalid limit accepted"
+    response = api_client.get(url, headers=headers)
+    assert response.status_code == 400, "Missing query accepted"
+
+    # HTML page
+    client.force_login(user)
+    response = client.get(reverse("search"), {"q": "192.0.2.1"})
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert reverse("ipadd_detail", args=[address.pk]) in response.text, "Result not linked"
+    assert reverse("ipadd_detail", args=[network.pk]) in response.text, "Result not linked"
+
+
+@pytest.mark.django_db
+def test_ioc_management_global_search_fallback_api_user(api_client, monkeypatch, user_set_group1):
+    """Test DRF (API) global searches fall back to icontains without full-text index."""
+    user = user_set_group1["user"]
+    token, _ = Token.objects.get_or_create(user=user)
+    headers = {"Authorization": f"Token {token}"}
+    event = Event.objects.create(author=user, name="Campaign", description="Dump.")
+    CodeSnippet.objects.create(name="Loader", code="Invoke-Mimikatz", author=user, event=event)
+    monkeypatch.setitem(search.backends, connection.alias, None)
+    response = api_client.get(reverse("search-list"), {"q": "mikat"}, headers=headers)
+    assert response.status_code == 200, f"Failed for user {user.username}"
+    assert [item["name"] for item in response.data["results"]] == ["Loader"], "Substring not matched"
+
+
+@pytest.mark.django_db
+def test_ioc_management_global_search_api_guest(api_client):
+    """Test DRF (API) global searches are denied to guests."""
+    response = api_client.get(reverse("search-list"), {"q": "192.0.2.1"})
+    assert response.status_code == 401, "Expected 401 for guest user"
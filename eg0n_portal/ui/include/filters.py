@@ -41,10 +41,22 @@ class SearchFilterSet(django_filters.FilterSet):
                         break
 
     def filter_search(self, queryset, name, value):
-        """Apply a case-insensitive `icontains` filter across all search fields."""
+        """
+        Search value across all search fields.
+
+        Use the full-text index of search_queryset() if any, else apply a
+        case-insensitive `icontains` filter on each field.
+        """
         if not self.search_fields:
             return queryset
+        result = self.search_queryset(queryset, value)
+        if result is not None:
+            return result
         q_objects = Q()
         for field in self.search_fields:
             q_objects |= Q(**{f'{field}__icontains': value})
         return queryset.filter(q_objects)
+
+    def search_queryset(self, queryset, value):
+        """Return the queryset searched with a full-text index, None if unavailable."""
+        return None
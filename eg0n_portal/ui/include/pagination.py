@@ -1,12 +1,99 @@
 """Custom pagination class for REST API using Django REST Framework."""
 
+import base64
+import json
+from types import SimpleNamespace
 from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPagination(PageNumberPagination):
-    """Flexible pagination for REST API."""
+    """
+    Flexible pagination for REST API.
+
+    Pages are numbered by default. Passing cursor (empty for the first page)
+    switches to keyset pagination on (created_at, id), newest first like the
+    models ordering: a page is a range scan on the (created_at, id) index
+    whatever its depth, and the total count is not computed.
+    """
 
     page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
     page_size_query_param = 'per_page'
     max_page_size = settings.REST_FRAMEWORK['MAX_PAGE_SIZE']
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def get_cursor_fields(self, model):
+        """Return the key fields of a model, (created_at, pk) or (pk,) without created_at."""
+        try:
+            model._meta.get_field('created_at')
+        except FieldDoesNotExist:
+            return [model._meta.pk]
+        return [model._meta.get_field('created_at'), model._meta.pk]
+
+    def encode_cursor(self, obj):
+        """Return the opaque cursor resuming after an object (or values() row)."""
+        if isinstance(obj, dict):
+            obj = SimpleNamespace(**obj)
+        values = [field.value_to_string(obj) for field in self.cursor_fields]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        """Return the key values encoded by encode_cursor(), raise NotFound if invalid."""
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if not isinstance(values, list) or len(values) != len(self.cursor_fields):
+                raise ValueError('Invalid cursor')
+            values = [field.to_python(value) for field, value in zip(self.cursor_fields, values)]
+        except (TypeError, UnicodeDecodeError, ValidationError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if None in values:
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def paginate_queryset(self, queryset, request, view=None):
+        """Return a page of the queryset, by number or by cursor."""
+        self.cursor_mode = self.cursor_query_param in request.query_params
+        if not self.cursor_mode:
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.cursor_fields = self.get_cursor_fields(queryset.model)
+        names = [field.attname for field in self.cursor_fields]
+        queryset = queryset.order_by(*['-' + name for name in names])
+        cursor = request.query_params[self.cursor_query_param]
+        if cursor:
+            # Rows strictly after the cursor in (name1 DESC, name2 DESC) order
+            values = self.decode_cursor(cursor)
+            condition = Q()
+            for index, name in enumerate(names):
+                equal = {names[i]: values[i] for i in range(index)}
+                condition |= Q(**equal, **{name + '__lt': values[index]})
+            queryset = queryset.filter(condition)
+
+        page_size = self.get_page_size(request)
+        page = list(queryset[:page_size + 1])
+        self.next_cursor = self.encode_cursor(page[page_size - 1]) if len(page) > page_size else None
+        return page[:page_size]
+
+    def get_next_link(self):
+        """Return the URL of the next page."""
+        if not self.cursor_mode:
+            return super().get_next_link()
+        if self.next_cursor is None:
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        """Return the page, without count in cursor mode."""
+        if not self.cursor_mode:
+            return super().get_paginated_response(data)
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
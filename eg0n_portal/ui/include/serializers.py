@@ -1,5 +1,9 @@
 """Generic serializer for REST API views."""
 
+import threading
+from collections import OrderedDict
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
 from rest_framework import serializers
 
 
@@ -11,3 +15,138 @@ class ObjectSerializer(serializers.ModelSerializer):
 
         model = None
         fields = '__all__'
+
+
+class ValuesListSerializer:
+    """
+    Read-only list serializer working on values() rows.
+
+    Returns the same data as a ModelSerializer with many=True, without
+    building model instances nor running the field machinery per row: a
+    plan (column, converter) is computed once per serializer class and field
+    set (kept in a bounded LRU cache, field sets coming from ?fields= and
+    ?exclude=), plain values are copied as is and many-to-many primary keys are read
+    from the through table with one query per page. Serializers with fields
+    not backed by a column (methods, nested serializers, dotted sources) or
+    with a custom to_representation() are not supported.
+    """
+
+    plans = OrderedDict()
+    plans_lock = threading.Lock()
+    max_plans = 256
+
+    def __init__(self, serializer, plan):
+        """Create the list serializer, serializer being the (child) ModelSerializer."""
+        self.model = serializer.Meta.model
+        self.plan = plan
+
+    @classmethod
+    def for_serializer(cls, serializer):
+        """Return the values list serializer of a ModelSerializer instance, None if not supported."""
+        key = (type(serializer), tuple(serializer.fields))
+        with cls.plans_lock:
+            found = key in cls.plans
+            if found:
+                cls.plans.move_to_end(key)
+                plan = cls.plans[key]
+        if not found:
+            plan = cls.get_plan(serializer)
+            with cls.plans_lock:
+                cls.plans[key] = plan
+                while len(cls.plans) > cls.max_plans:
+                    cls.plans.popitem(last=False)
+        return None if plan is None else cls(serializer, plan)
+
+    @classmethod
+    def get_plan(cls, serializer):
+        """Return [(name, kind, column, converter)] for the fields of a serializer, None if not supported."""
+        if not isinstance(serializer, serializers.ModelSerializer) or (
+            type(serializer).to_representation is not serializers.Serializer.to_representation
+        ):
+            return None
+        model = serializer.Meta.model
+        plan = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            try:
+                model_field = model._meta.get_field(field.source)
+            except FieldDoesNotExist:
+                return None
+            if isinstance(field, serializers.ManyRelatedField):
+                if not model_field.many_to_many or not cls.is_pk_field(field.child_relation):
+                    return None
+                plan.append((name, 'many', model_field, None))
+            elif isinstance(field, serializers.RelatedField):
+                if not model_field.many_to_one or not cls.is_pk_field(field):
+                    return None
+                plan.append((name, 'value', model_field.name, None))
+            elif model_field.concrete and not model_field.is_relation:
+                plan.append((name, 'value', model_field.name, cls.get_converter(field, model_field)))
+            else:
+                return None
+        return plan
+
+    @staticmethod
+    def is_pk_field(field):
+        """Return True if a related field renders the bare primary key of the related object."""
+        return type(field) is serializers.PrimaryKeyRelatedField and field.pk_field is None
+
+    @staticmethod
+    def get_converter(field, model_field):
+        """Return the function converting a column value as the field does, None if unchanged."""
+        if type(field) in (serializers.CharField, serializers.IPAddressField, serializers.URLField) and isinstance(
+            model_field, (models.CharField, models.GenericIPAddressField, models.TextField)
+        ):
+            return None
+        if type(field) is serializers.ChoiceField and all(isinstance(key, str) for key in field.choices):
+            return None
+        if (type(field), type(model_field)) in (
+            (serializers.BooleanField, models.BooleanField),
+            (serializers.FloatField, models.FloatField),
+            (serializers.IntegerField, models.IntegerField),
+            (serializers.IntegerField, models.PositiveIntegerField),
+            (serializers.IntegerField, models.PositiveSmallIntegerField),
+            (serializers.IntegerField, models.SmallIntegerField),
+        ):
+            return None
+        if type(field) is serializers.UUIDField and field.uuid_format == 'hex_verbose':
+            return str
+        return field.to_representation
+
+    def get_queryset(self, queryset, *columns):
+        """Return the values() queryset of a queryset, including extra columns (pagination keys)."""
+        names = {column for _, kind, column, _ in self.plan if kind == 'value'}
+        names.update((self.model._meta.pk.name, *columns))
+        return queryset.select_related(None).prefetch_related(None).values(*names)
+
+    def to_representation(self, rows):
+        """Return the serialized data of values() rows."""
+        pk_name = self.model._meta.pk.name
+        related = {}
+        for name, kind, model_field, _ in self.plan:
+            if kind == 'many':
+                related[name] = self.get_many_related(model_field, [row[pk_name] for row in rows])
+        data = []
+        for row in rows:
+            item = {}
+            for name, kind, column, converter in self.plan:
+                if kind == 'many':
+                    item[name] = related[name].get(row[pk_name], [])
+                else:
+                    value = row[column]
+                    item[name] = value if value is None or converter is None else converter(value)
+            data.append(item)
+        return data
+
+    @staticmethod
+    def get_many_related(model_field, pks):
+        """Return {pk: [related pks]} of a many-to-many field, with one query."""
+        through = model_field.remote_field.through
+        source = through._meta.get_field(model_field.m2m_field_name()).attname
+        target = through._meta.get_field(model_field.m2m_reverse_field_name()).attname
+        result = {}
+        rows = through.objects.filter(**{source + '__in': pks}).order_by(target).values_list(source, target)
+        for pk, related_pk in rows:
+            result.setdefault(pk, []).append(related_pk)
+        return result
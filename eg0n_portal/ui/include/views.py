@@ -1,10 +1,15 @@
 """Generic base views and API viewsets."""
 
+import csv
+import hashlib
+from itertools import islice
 from django.conf import settings
-from django.core.exceptions import PermissionDenied
-from django.http import HttpResponse, HttpResponseRedirect
+from django.core.exceptions import FieldDoesNotExist, PermissionDenied
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseRedirect, StreamingHttpResponse
 from django.shortcuts import redirect, render
 from django.urls import reverse, reverse_lazy
+from django.utils.cache import get_conditional_response
 from django.utils.translation import gettext_lazy as _
 from django.views.generic import DeleteView, TemplateView
 from django.views.generic.detail import DetailView
@@ -14,9 +19,17 @@ from django_tables2 import SingleTableView
 from django_tables2.columns import Column
 from django_tables2 import RequestConfig
 import django_tables2 as tables
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import GenericAPIView
 from rest_framework.mixins import DestroyModelMixin, ListModelMixin, RetrieveModelMixin
+from rest_framework.response import Response
+from rest_framework.serializers import ListSerializer
+from rest_framework.settings import api_settings
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
+from ioc_management.files import table_validator
 from ui.include.permissions import ObjectPermission
+from ui.include.serializers import ValuesListSerializer
+from ui.renderers import NDJSONRenderer, json_dumps
 
 
 #############################################################################
@@ -24,7 +37,194 @@ from ui.include.permissions import ObjectPermission
 #############################################################################
 
 
-class APICRUDViewSet(ModelViewSet):
+class ConditionalListMixin:
+    """
+    Answer unchanged polls with 304 Not Modified.
+
+    The validator of a filtered queryset is its row count and max(updated_at),
+    computed with a single aggregate query: deletions change the count, any
+    other write moves updated_at. ETag also depends on the URL, the Accept
+    header and the user, as the response body does.
+
+    No Last-Modified is sent, and If-Modified-Since is ignored: max(updated_at)
+    does not move when rows are deleted or leave a date-based filter (e.g. the
+    feeds expired_at__gt=today), so a date alone would answer stale 304s.
+    """
+
+    def get_conditional_response(self, request, queryset):
+        """Return (304 response or None, validator headers) for a filtered queryset."""
+        if not hasattr(queryset.model, "updated_at"):
+            return None, {}
+        count, updated_at = table_validator(queryset)
+        validator = "|".join([
+            request.get_full_path(),
+            request.headers.get("Accept", ""),
+            str(request.user.pk),
+            str(count),
+            updated_at or "",
+        ])
+        etag = '"{}"'.format(hashlib.blake2b(validator.encode(), digest_size=16).hexdigest())
+        headers = {"ETag": etag}
+        response = get_conditional_response(request, etag=etag)
+        if response is not None:
+            for name, value in headers.items():
+                response[name] = value
+        return response, headers
+
+    def list(self, request, *args, **kwargs):
+        """Return the list, or 304 if unchanged since the client copy."""
+        not_modified, headers = self.get_conditional_response(request, self.filter_queryset(self.get_queryset()))
+        if not_modified is not None:
+            return not_modified
+        response = super().list(request, *args, **kwargs)
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+
+class SparseFieldsMixin:
+    """
+    Sparse fieldsets on REST API reads.
+
+    ?fields=a,b returns only the listed fields, ?exclude=a,b all fields but
+    the listed ones. Columns of the dropped fields are deferred, and their
+    prefetches skipped, so they are not read from the database either.
+    """
+
+    def get_sparse_fields(self):
+        """Return the serializer fields to drop for this request, by name."""
+        if hasattr(self, '_sparse_fields'):
+            return self._sparse_fields
+        self._sparse_fields = {}
+        params = self.request.query_params
+        if self.request.method not in ('GET', 'HEAD') or not (params.get('fields') or params.get('exclude')):
+            return self._sparse_fields
+        fields = self.get_serializer_class()(context=self.get_serializer_context()).fields
+        selection = {}
+        for param in ('fields', 'exclude'):
+            names = {name.strip() for name in params.get(param, '').split(',') if name.strip()}
+            unknown = names - set(fields)
+            if unknown:
+                raise ValidationError({param: [_('Unknown fields: %(names)s.') % {'names': ', '.join(sorted(unknown))}]})
+            selection[param] = names
+        dropped = set(fields) - selection['fields'] if selection['fields'] else set()
+        dropped |= selection['exclude']
+        self._sparse_fields = {name: fields[name] for name in dropped}
+        return self._sparse_fields
+
+    def filter_queryset(self, queryset):
+        """Filter the queryset, deferring the columns of dropped fields."""
+        queryset = super().filter_queryset(queryset)
+        dropped = self.get_sparse_fields()
+        if not dropped:
+            return queryset
+        sources = {field.source for field in dropped.values()}
+        columns = []
+        for source in sources:
+            try:
+                model_field = queryset.model._meta.get_field(source)
+            except FieldDoesNotExist:
+                continue
+            if model_field.concrete and not model_field.many_to_many and not model_field.primary_key:
+                columns.append(model_field.name)
+        lookups = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if getattr(lookup, 'prefetch_to', lookup).split('__')[0] not in sources
+        ]
+        if len(lookups) != len(queryset._prefetch_related_lookups):
+            queryset = queryset.prefetch_related(None).prefetch_related(*lookups)
+        if isinstance(queryset.query.select_related, dict) and sources & set(queryset.query.select_related):
+            # A deferred foreign key cannot be followed
+            related = self.get_select_related_lookups(queryset.query.select_related)
+            related = [lookup for lookup in related if lookup.split('__')[0] not in sources]
+            queryset = queryset.select_related(None)
+            if related:
+                queryset = queryset.select_related(*related)
+        return queryset.defer(*columns)
+
+    def get_select_related_lookups(self, related, prefix=''):
+        """Return the select_related() lookups of a Query.select_related tree."""
+        lookups = []
+        for name, children in related.items():
+            lookups.extend(self.get_select_related_lookups(children, prefix + name + '__') or [prefix + name])
+        return lookups
+
+    def get_serializer(self, *args, **kwargs):
+        """Return the serializer without the dropped fields."""
+        serializer = super().get_serializer(*args, **kwargs)
+        dropped = self.get_sparse_fields()
+        if dropped:
+            fields = serializer.child.fields if isinstance(serializer, ListSerializer) else serializer.fields
+            for name in dropped:
+                fields.pop(name, None)
+        return serializer
+
+
+class ValuesListMixin:
+    """
+    Serialize REST API lists from values() rows.
+
+    When the serializer supports it (see ValuesListSerializer), list requests
+    skip model instances and the serializer field machinery; the response is
+    the same.
+    """
+
+    def list(self, request, *args, **kwargs):
+        """Return the list, serialized from values() rows if supported."""
+        values_serializer = ValuesListSerializer.for_serializer(self.get_serializer(many=True).child)
+        if values_serializer is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Keyset pagination reads its keys from the rows
+        get_cursor_fields = getattr(self.paginator, 'get_cursor_fields', None)
+        columns = [field.attname for field in get_cursor_fields(queryset.model)] if get_cursor_fields else []
+        queryset = values_serializer.get_queryset(queryset, *columns)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(values_serializer.to_representation(page))
+        return Response(values_serializer.to_representation(list(queryset)))
+
+
+class NDJSONListMixin:
+    """
+    Stream REST API lists as NDJSON.
+
+    With Accept: application/x-ndjson or ?format=ndjson, the filtered list is
+    not paginated: one JSON object per line is streamed while rows are
+    fetched by chunks from a database cursor, so the first lines are sent at
+    once and memory usage does not depend on the number of rows.
+    """
+
+    chunk_size = 2000
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, NDJSONRenderer]
+
+    def iter_ndjson(self, queryset):
+        """Yield the NDJSON lines of a queryset, a chunk of rows at a time."""
+        serializer = self.get_serializer(many=True).child
+        values_serializer = ValuesListSerializer.for_serializer(serializer)
+        if values_serializer is not None:
+            rows = values_serializer.get_queryset(queryset).iterator(chunk_size=self.chunk_size)
+        else:
+            rows = queryset.iterator(chunk_size=self.chunk_size)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            if values_serializer is not None:
+                data = values_serializer.to_representation(chunk)
+            else:
+                data = [serializer.to_representation(obj) for obj in chunk]
+            yield b''.join(json_dumps(item) + b'\n' for item in data)
+
+    def list(self, request, *args, **kwargs):
+        """Return the list, or stream it as NDJSON if requested."""
+        if request.accepted_renderer.format != NDJSONRenderer.format:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(self.iter_ndjson(queryset), content_type=NDJSONRenderer.media_type)
+
+
+class APICRUDViewSet(SparseFieldsMixin, ConditionalListMixin, NDJSONListMixin, ValuesListMixin, ModelViewSet):
     """Base ModelViewSet for full CRUD REST API."""
 
     filterset_class = None
@@ -34,7 +234,14 @@ class APICRUDViewSet(ModelViewSet):
 
 
 class APIRDViewSet(
-    DestroyModelMixin, ListModelMixin, RetrieveModelMixin, GenericViewSet
+    SparseFieldsMixin,
+    ConditionalListMixin,
+    NDJSONListMixin,
+    ValuesListMixin,
+    DestroyModelMixin,
+    ListModelMixin,
+    RetrieveModelMixin,
+    GenericViewSet,
 ):
     """Read and delete only REST API viewset."""
 
@@ -44,7 +251,15 @@ class APIRDViewSet(
     serializer_class = None
 
 
-class APIRViewSet(ListModelMixin, RetrieveModelMixin, GenericViewSet):
+class APIRViewSet(
+    SparseFieldsMixin,
+    ConditionalListMixin,
+    NDJSONListMixin,
+    ValuesListMixin,
+    ListModelMixin,
+    RetrieveModelMixin,
+    GenericViewSet,
+):
     """Read only REST API viewset."""
 
     filterset_class = None
@@ -53,6 +268,70 @@ class APIRViewSet(ListModelMixin, RetrieveModelMixin, GenericViewSet):
     serializer_class = None
 
 
+class EchoBuffer:
+    """File-like object returning what is written, used to stream CSV rows."""
+
+    def write(self, value):
+        """Return the written value instead of storing it."""
+        return value
+
+
+class APIFeedView(ConditionalListMixin, GenericAPIView):
+    """
+    Base view streaming a filtered queryset as a plain text or CSV feed.
+
+    Rows are fetched with values() and QuerySet.iterator(), then rendered
+    line by line into a StreamingHttpResponse: memory usage does not depend
+    on the number of rows.
+    """
+
+    chunk_size = 2000
+    feed_format = "txt"  # txt: one value per line, csv: header and rows
+    fields = ()  # values() fields passed to get_feed_rows()
+    filterset_class = None
+    header = ()  # CSV column names
+    pagination_class = None
+    permission_classes = [ObjectPermission]  # Required for API
+    queryset = None
+
+    def perform_content_negotiation(self, request, force=False):
+        """Accept any client, the feed is not rendered by DRF renderers."""
+        return super().perform_content_negotiation(request, force=True)
+
+    def get_feed_rows(self, record):
+        """Return the feed rows (lists of values) of a record."""
+        return [[record[field] for field in self.fields]]
+
+    def get_feed_queryset(self):
+        """Return the filtered queryset, without ordering to avoid sorting the whole table."""
+        return self.filter_queryset(self.get_queryset()).order_by()
+
+    def iter_feed(self, records):
+        """Yield the feed content chunk by chunk."""
+        if self.feed_format == "csv":
+            writer = csv.writer(EchoBuffer())
+            yield writer.writerow(self.header or self.fields)
+            for record in records:
+                for row in self.get_feed_rows(record):
+                    yield writer.writerow(row)
+        else:
+            for record in records:
+                for row in self.get_feed_rows(record):
+                    yield "{}\n".format(row[0])
+
+    def get(self, request, *args, **kwargs):
+        """Stream the feed, or return 304 if unchanged since the client copy."""
+        queryset = self.get_feed_queryset()
+        not_modified, headers = self.get_conditional_response(request, queryset)
+        if not_modified is not None:
+            return not_modified
+        records = queryset.values(*self.fields).iterator(chunk_size=self.chunk_size)
+        content_type = "text/csv" if self.feed_format == "csv" else "text/plain"
+        return StreamingHttpResponse(
+            self.iter_feed(records), content_type=f"{content_type}; charset=utf-8", headers=headers,
+        )
+
+
 #############################################################################
 # Models
 #############################################################################
@@ -141,7 +420,9 @@ class ObjectMixin:
 class ObjectBulkDeleteView(ObjectMixin, TemplateView):
     """Generic view to delete multiple objects selected via checkboxes."""
 
+    batch_size = 1000  # Objects deleted by a single transaction
     model = None
+    preview_size = 100  # Objects listed in the confirmation page
     template_name = 'ui/object_confirm_delete.html'
 
     def get_success_url(self):
@@ -162,18 +443,23 @@ class ObjectBulkDeleteView(ObjectMixin, TemplateView):
             return redirect(self.get_success_url())
 
         queryset = self.model.objects.filter(pk__in=ids)
-        if not queryset:
+        if not queryset.exists():
             # Objects do not exist, there is nothing to delete
             return redirect(self.get_success_url())
 
         if 'confirm' in request.POST:
             # Last step: the form has passed confirm, we proceed with the cancellation
-            queryset.delete()
+            # Short transactions: do not lock the database for the whole selection
+            for start in range(0, len(ids), self.batch_size):
+                with transaction.atomic():
+                    self.model.objects.filter(pk__in=ids[start:start + self.batch_size]).delete()
             return redirect(self.get_success_url())
 
         # Penultimate step: the user must confirm the list of objects to be deleted
         context = self.get_context_data()
-        context['object_list'] = queryset
+        context['object_list'] = queryset[:self.preview_size]
+        context['object_count'] = queryset.count()
+        context['selected_ids'] = ids
         return render(
             request,
             self.template_name,
@@ -1,10 +1,33 @@
 """Renderers for UI app."""
 
+import json
 from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_dumps(data):
+    """Return the compact JSON encoding (bytes) of data, with orjson when installed."""
+    if orjson is None:
+        return json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')).encode()
+    return orjson.dumps(data, default=CustomJSONRenderer.encoder.default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
 
 
 class CustomJSONRenderer(JSONRenderer):
-    """Return DRF data in a standard JSON format."""
+    """
+    Return DRF data in a standard JSON format.
+
+    The envelope is encoded with orjson when installed: datetimes, dates and
+    UUIDs are encoded natively, as DRF encoder does, other types (lazy
+    strings, decimals...) fall back to DRF encoder. Without orjson, or when
+    an indented output is requested, DRF JSONRenderer is used.
+    """
+
+    encoder = JSONEncoder()
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         """Render DRF output."""
@@ -27,4 +50,23 @@ class CustomJSONRenderer(JSONRenderer):
         }
         if data:
             wrapped['data'] = data
-        return super().render(wrapped, accepted_media_type, renderer_context)
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context) is not None:
+            return super().render(wrapped, accepted_media_type, renderer_context)
+        return json_dumps(wrapped)
+
+
+class NDJSONRenderer(CustomJSONRenderer):
+    """
+    Render DRF data as a single NDJSON line.
+
+    Lists are streamed by the views (see NDJSONListMixin), this renderer only
+    handles other responses, such as errors, requested as NDJSON.
+    """
+
+    format = 'ndjson'
+    media_type = 'application/x-ndjson'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """Render DRF output on one line."""
+        renderer_context = dict(renderer_context or {}, indent=None)
+        return super().render(data, None, renderer_context) + b'\n'